@@ -1,188 +1,698 @@
 import os
+import json
+import math
+import contextlib
+import wave
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple, Union
 import subprocess
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
 from tqdm import tqdm
 from datetime import datetime
 import argparse
 
+import grpc
+
+from clients.asr.client import cache_from_settings, STTClient
+from clients.asr.utils.definitions import (
+    CHUNK_LEN_MS,
+    DEFAULT_VAD_S_MIN_SILENCE_MS,
+    DEFAULT_VAD_S_MIN_SPEECH_MS,
+    DEFAULT_VAD_S_SPEECH_PAD_MS,
+    DEFAULT_VAD_S_THRESHOLD,
+)
+from clients.asr.utils.request import RecognitionOptions
+from clients.asr.utils.response import (
+    format_utterance,
+    print_recognize_response,
+    print_recognize_response_jsonl,
+    read_jsonl_records,
+)
+from clients.common_utils.audio import AudioFile, ffmpeg_pcm_chunks
+from clients.common_utils.config import load_settings
+from clients.common_utils.metrics import span
+from clients.genproto import stt_pb2
+
+from .job import DONE, FAILED, MANIFEST_NAME, ChunkRecord, ConversionRecord, JobManifest, pcm_hash
+from .merge import ChunkTranscript, merge_chunks
+from .silence import find_split_points
+
+# Recognition parameters used for every chunk
+RECOGNITION_OPTIONS = RecognitionOptions(model="e2e-v3", enable_punctuator=True,
+                                         enable_word_time_offsets=True)
+RECOGNITION_TIMEOUT = 120
+# Same parameters with VAD tuned for stream recognition
+STREAM_RECOGNITION_OPTIONS = RecognitionOptions(
+    model="e2e-v3",
+    enable_punctuator=True,
+    vad_threshold=DEFAULT_VAD_S_THRESHOLD,
+    vad_min_silence_ms=DEFAULT_VAD_S_MIN_SILENCE_MS,
+    vad_speech_pad_ms=DEFAULT_VAD_S_SPEECH_PAD_MS,
+    vad_min_speech_ms=DEFAULT_VAD_S_MIN_SPEECH_MS,
+)
+
+# Chunk retry policy: transient server errors are retried with exponential backoff
+MAX_RETRIES = 3
+RETRY_BACKOFF_S = 2.0
+RETRYABLE_CODES = frozenset({
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.ABORTED,
+})
+
+# Format of PCM produced by decode_audio
+SAMPLE_RATE = 16000
+CHANNEL_COUNT = 1
+SAMPLE_SIZE = 2
+
+@dataclass
+class AudioChunk:
+    """Piece of the recording sent in one recognition request.
+    
+    Chunk audio is either kept in memory (pcm) or read from a WAV file (path).
+    """
+    index: int
+    offset_ms: int = 0
+    path: Optional[str] = None
+    pcm: Optional[Union[bytes, memoryview]] = None
+    sample_rate: int = SAMPLE_RATE
+    channel_count: int = CHANNEL_COUNT
+
+    def load(self) -> Tuple[bytes, int, int]:
+        """Return PCM payload, sample rate and channel count."""
+        if self.pcm is not None:
+            return bytes(self.pcm), self.sample_rate, self.channel_count
+        
+        with AudioFile(self.path) as audio:
+            return audio.blob, audio.sample_rate, audio.channel_count
+
+    def window(self) -> Tuple[int, int]:
+        """Start and end of the chunk in the recording, ms."""
+        if self.pcm is not None:
+            frames = len(self.pcm) // (SAMPLE_SIZE * self.channel_count)
+            return self.offset_ms, self.offset_ms + frames * 1000 // self.sample_rate
+        
+        with AudioFile(self.path) as audio:
+            return self.offset_ms, self.offset_ms + audio.duration_ms
+
+def _write_wav(path: str, pcm: Union[bytes, memoryview], sample_rate: int, channel_count: int,
+               sample_size: int = SAMPLE_SIZE) -> None:
+    """Write PCM to a WAV file."""
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(channel_count)
+        wav.setsampwidth(sample_size)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+
+def _shift_timestamps(response: stt_pb2.RecognizeResponse, offset_ms: int) -> None:
+    """Move all times of a chunk response from chunk-relative to recording-absolute."""
+    if not offset_ms:
+        return
+    
+    hypothesis = response.hypothesis
+    if hypothesis.start_time_ms or hypothesis.end_time_ms:
+        hypothesis.start_time_ms += offset_ms
+        hypothesis.end_time_ms += offset_ms
+    for word in list(hypothesis.words) + list(hypothesis.normalized_words):
+        word.start_time_ms += offset_ms
+        word.end_time_ms += offset_ms
+    for mark in response.va_marks:
+        mark.offset_ms += offset_ms
+    for result in response.spoofing_result:
+        result.start_time_ms += offset_ms
+        result.end_time_ms += offset_ms
+
+def split_offsets(pcm: Union[bytes, memoryview], sample_rate: int, channel_count: int,
+                  sample_size: int, num_chunks: int) -> List[int]:
+    """Find silence-aware start frames of num_chunks chunks."""
+    tolerance_ms = int(float(os.getenv('SPLIT_TOLERANCE_SEC', '10')) * 1000)
+    total_frames = len(pcm) // (sample_size * channel_count)
+    
+    if num_chunks == 1:
+        return [0]
+    if sample_size == 2:
+        return find_split_points(pcm, sample_rate, channel_count, num_chunks, tolerance_ms)
+    return [total_frames * i // num_chunks for i in range(num_chunks)]
+
+def plan_split(pcm: Union[bytes, memoryview], sample_rate: int = SAMPLE_RATE,
+               channel_count: int = CHANNEL_COUNT, sample_size: int = SAMPLE_SIZE) -> List[int]:
+    """Start frames of chunks of at most MAX_CHUNK_SIZE_MB (environment, default 20MB)."""
+    max_size_mb = int(os.getenv('MAX_CHUNK_SIZE_MB', '20'))
+    num_chunks = max(1, math.ceil(len(pcm) / (max_size_mb * 1024 * 1024)))
+    return split_offsets(pcm, sample_rate, channel_count, sample_size, num_chunks)
+
+def chunk_overlap_frames(sample_rate: int) -> int:
+    """Frames every chunk runs into the next one (CHUNK_OVERLAP_SEC environment, default 2).
+    
+    Words on a cut are heard whole by at least one of the chunks, the merge keeps
+    every word of the overlap once.
+    """
+    return int(float(os.getenv('CHUNK_OVERLAP_SEC', '2')) * sample_rate)
+
+def convert_to_wav(input_path: str, output_path: str) -> None:
+    """Convert video/audio to 16kHz mono 16-bit WAV."""
+    try:
+        cmd = [
+            'ffmpeg', '-i', input_path,
+            '-acodec', 'pcm_s16le',  # 16-bit PCM
+            '-ac', '1',              # mono
+            '-ar', '16000',          # 16kHz sample rate
+            '-y',                    # overwrite output
+            output_path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode == 0:
+            print(f"Converted to: {output_path}")
+        else:
+            print(f"Error during conversion: {result.stderr}")
+            raise Exception(result.stderr)
+    except Exception as e:
+        print(f'Error during conversion: {str(e)}')
+        raise e
+
 class AudioProcessor:
-    def __init__(self, input_file: str, output_dir: str = "output"):
+    def __init__(self, input_file: Optional[str], output_dir: str = "output", config_file: str = "config.ini",
+                 keep_intermediate: bool = False, use_cache: bool = True, resume_job: Optional[str] = None):
         self.input_file = input_file
         self.output_dir = output_dir
-        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.transcription_dir = os.path.join(output_dir, f"transcription_{self.timestamp}")
+        self.config_file = config_file
+        # Persist decoded input.wav and chunk_N.wav files of the in-memory pipeline
+        self.keep_intermediate = keep_intermediate
+        # Reuse recognition results of already transcribed audio (see cache_dir in config)
+        self.use_cache = use_cache
+        # Start of every chunk in the source recording, used to keep timestamps absolute
+        self.chunk_offsets_ms: Dict[str, int] = {}
+        # Result of the last merge_transcriptions call
+        self.merged_file: Optional[str] = None
+        # Progress of the job, saved after every chunk so it can be resumed
+        self.manifest: Optional[JobManifest] = None
+        
+        if resume_job:
+            # Job is either a path or a transcription_<timestamp> directory name in output_dir
+            job_dir = resume_job if os.path.isdir(resume_job) else os.path.join(output_dir, resume_job)
+            if not os.path.isfile(os.path.join(job_dir, MANIFEST_NAME)):
+                raise FileNotFoundError(f"No job manifest found in {job_dir}")
+            self.manifest = JobManifest.load(job_dir)
+            self.transcription_dir = job_dir
+            self.timestamp = os.path.basename(os.path.normpath(job_dir)).replace("transcription_", "", 1)
+            if self.input_file is None:
+                self.input_file = self.manifest.input_file
+        else:
+            self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.transcription_dir = os.path.join(output_dir, f"transcription_{self.timestamp}")
         Path(output_dir).mkdir(parents=True, exist_ok=True)
         Path(self.transcription_dir).mkdir(parents=True, exist_ok=True)
         
+    @span('convert')
     def _convert_to_wav(self, input_path: str, output_path: str) -> None:
         """Convert video/audio to WAV format."""
-        try:
-            cmd = [
-                'ffmpeg', '-i', input_path,
-                '-acodec', 'pcm_s16le',  # 16-bit PCM
-                '-ac', '1',              # mono
-                '-ar', '16000',          # 16kHz sample rate
-                '-y',                    # overwrite output
-                output_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                print(f"Converted to: {output_path}")
-            else:
-                print(f"Error during conversion: {result.stderr}")
-                raise Exception(result.stderr)
-        except Exception as e:
-            print(f'Error during conversion: {str(e)}')
-            raise e
+        convert_to_wav(input_path, output_path)
 
+    @span('split')
     def split_audio(self, audio_path: str) -> List[str]:
         """Split audio into chunks if larger than max_size_mb.
         
         The maximum size in MB is read from the MAX_CHUNK_SIZE_MB environment variable.
         If not set, defaults to 20MB.
+        
+        Cuts are moved to the quietest point within SPLIT_TOLERANCE_SEC seconds
+        (default 10) of the equal-duration position, so words are not chopped.
+        Start offset of every chunk is stored in chunk_offsets_ms.
         """
         max_size_mb = int(os.getenv('MAX_CHUNK_SIZE_MB', '20'))
             
         file_size = os.path.getsize(audio_path) / (1024 * 1024)  # Convert to MB
         
         if file_size <= max_size_mb:
+            self.chunk_offsets_ms[audio_path] = 0
             return [audio_path]
 
         print(f"File size ({file_size:.2f}MB) exceeds {max_size_mb}MB. Splitting into chunks...")
         
-        # Get audio duration using ffprobe
-        cmd = ['ffprobe', '-i', audio_path, '-show_entries', 'format=duration', '-v', 'quiet', '-of', 'csv=p=0']
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        # Calculate number of chunks needed
+        num_chunks = math.ceil(file_size / max_size_mb)
+        
+        with AudioFile(audio_path) as audio:
+            offsets = split_offsets(
+                audio.pcm, audio.sample_rate, audio.channel_count, audio.sample_size, num_chunks
+            )
+            chunks = self._split_frames(
+                audio.pcm, audio.sample_rate, audio.channel_count, audio.sample_size,
+                offsets, persist=True
+            )
+            for chunk in chunks:
+                chunk.pcm = None  # Chunk is read back from its file
+                self.chunk_offsets_ms[chunk.path] = chunk.offset_ms
+        
+        print(f"Split into {len(chunks)} chunks")
+        return [chunk.path for chunk in chunks]
+
+    @span('convert')
+    def decode_audio(self, input_path: str) -> bytes:
+        """Decode any ffmpeg-supported input to raw 16kHz mono 16-bit PCM in memory.
+        
+        The decoded audio is also written to input.wav when keep_intermediate is set.
+        """
+        cmd = [
+            'ffmpeg', '-i', input_path,
+            '-f', 's16le',           # raw PCM, no container
+            '-acodec', 'pcm_s16le',  # 16-bit PCM
+            '-ac', str(CHANNEL_COUNT),
+            '-ar', str(SAMPLE_RATE),
+            'pipe:1'
+        ]
+        result = subprocess.run(cmd, capture_output=True)
         if result.returncode != 0:
-            raise Exception(f"Error getting duration: {result.stderr}")
-        duration = float(result.stdout.strip())
+            stderr = result.stderr.decode('utf-8', errors='replace')
+            print(f"Error during conversion: {stderr}")
+            raise Exception(stderr)
         
-        # Calculate number of chunks needed
-        num_chunks = int((file_size / max_size_mb) + 0.5)  # Round up
-        chunk_duration = duration / num_chunks
+        print(f"Decoded {len(result.stdout) / (1024 * 1024):.2f}MB of PCM from: {input_path}")
+        if self.keep_intermediate:
+            wav_path = os.path.join(self.output_dir, "input.wav")
+            _write_wav(wav_path, result.stdout, SAMPLE_RATE, CHANNEL_COUNT)
+            print(f"Converted to: {wav_path}")
+        return result.stdout
+
+    @span('split')
+    def split_pcm(self, pcm: Union[bytes, memoryview], sample_rate: int = SAMPLE_RATE,
+                  channel_count: int = CHANNEL_COUNT, offsets: Optional[List[int]] = None) -> List[AudioChunk]:
+        """Split 16-bit PCM into in-memory chunks of at most MAX_CHUNK_SIZE_MB.
+        
+        Chunks reference pcm without copying. They are also written to chunk_N.wav
+        files when keep_intermediate is set. Start frames of chunks can be given in
+        offsets (e.g. recorded in a job manifest) instead of being searched again.
+        """
+        if offsets is None:
+            offsets = plan_split(pcm, sample_rate, channel_count)
+        chunks = self._split_frames(
+            memoryview(pcm), sample_rate, channel_count, SAMPLE_SIZE,
+            offsets, persist=self.keep_intermediate
+        )
+        if len(chunks) > 1:
+            print(f"Split into {len(chunks)} chunks")
+        return chunks
+
+    def _split_frames(self, pcm: memoryview, sample_rate: int, channel_count: int, sample_size: int,
+                      offsets: List[int], persist: bool) -> List[AudioChunk]:
+        """Cut PCM into chunks starting at the given frame offsets, overlapping by chunk_overlap_frames."""
+        frame_size = sample_size * channel_count
+        total_frames = len(pcm) // frame_size
+        overlap_frames = chunk_overlap_frames(sample_rate)
         
+        # Slice PCM frames directly: one linear pass, no re-decoding per chunk
         chunks = []
-        for i in range(num_chunks):
-            start_time = i * chunk_duration
-            end_time = min((i + 1) * chunk_duration, duration)
+        for i, start_frame in enumerate(offsets):
+            end_frame = min(offsets[i + 1] + overlap_frames, total_frames) \
+                if i + 1 < len(offsets) else total_frames
+            chunk = AudioChunk(
+                index=i + 1,
+                offset_ms=start_frame * 1000 // sample_rate,
+                pcm=pcm[start_frame * frame_size:end_frame * frame_size],
+                sample_rate=sample_rate,
+                channel_count=channel_count,
+            )
             
-            chunk_path = os.path.join(self.output_dir, f"chunk_{i+1}.wav")
+            if persist:
+                chunk.path = os.path.join(self.output_dir, f"chunk_{i+1}.wav")
+                try:
+                    _write_wav(chunk.path, chunk.pcm, sample_rate, channel_count, sample_size)
+                except Exception as e:
+                    print(f"Error splitting chunk {i+1}: {str(e)}")
+                    raise
             
-            try:
-                cmd = [
-                    'ffmpeg',
-                    '-i', audio_path,
-                    '-ss', str(start_time),
-                    '-t', str(end_time - start_time),
-                    '-acodec', 'pcm_s16le',
-                    '-ac', '1',
-                    '-ar', '16000',
-                    '-y',
-                    chunk_path
-                ]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                    chunks.append(chunk_path)
-                else:
-                    print(f"Error splitting chunk {i+1}: {result.stderr}")
-                    raise Exception(result.stderr)
-            except Exception as e:
-                print(f"Error splitting chunk {i+1}: {str(e)}")
-                raise
+            chunks.append(chunk)
         
-        print(f"Split into {len(chunks)} chunks")
         return chunks
 
-    def transcribe_audio(self, audio_paths: List[str]) -> None:
-        """Transcribe audio files using clients.main."""
+    def _chunk_output_file(self, index: int) -> str:
+        """Structured (JSONL) recognition results of one chunk."""
+        return os.path.join(self.transcription_dir, f"transcription_{index}.jsonl")
+
+    @span('recognize')
+    def _recognize_chunk(self, client: STTClient, chunk: AudioChunk) -> list:
+        """Recognize one chunk, retrying transient gRPC failures."""
+        blob, sample_rate, channel_count = chunk.load()
+        config = RECOGNITION_OPTIONS.recognition_config(sample_rate, channel_count)
+        
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return client.file_recognize(blob, config)
+            except grpc.RpcError as e:
+                if e.code() not in RETRYABLE_CODES or attempt == MAX_RETRIES:
+                    raise
+                delay = RETRY_BACKOFF_S * 2 ** attempt
+                print(f"Chunk {chunk.index} failed with {e.code().name}, retrying in {delay:.0f}s")
+                time.sleep(delay)
+
+    def _transcribe_chunk(self, client: STTClient, chunk: AudioChunk, total: int) -> bool:
+        """Transcribe one chunk into transcription_<index>.jsonl."""
+        output_file = self._chunk_output_file(chunk.index)
+        print(f"Processing chunk {chunk.index}/{total}")
+        
+        try:
+            responses = self._recognize_chunk(client, chunk)
+            for response in responses:
+                _shift_timestamps(response, chunk.offset_ms)
+            with open(output_file, 'w', encoding='utf-8') as f:
+                for response in responses:
+                    print_recognize_response_jsonl(response, True, file=f)
+            print(f"Transcription saved to {output_file}")
+            if self.manifest is not None:
+                self.manifest.set_status(chunk.index, DONE)
+            return True
+        except Exception as e:
+            print(f"Error during transcription of chunk {chunk.index}: {str(e)}")
+            print(f"Error type: {type(e)}")
+            if self.manifest is not None:
+                self.manifest.set_status(chunk.index, FAILED, str(e))
+            return False
+
+    def _is_transcribed(self, chunk: AudioChunk) -> bool:
+        """Check whether the job manifest has a finished transcription of this exact chunk."""
+        if self.manifest is None or chunk.pcm is None:
+            return False
+        record = self.manifest.chunk(chunk.index)
+        output_file = self._chunk_output_file(chunk.index)
+        return (
+            record is not None and record.status == DONE
+            and os.path.exists(output_file)
+            and record.sha256 == pcm_hash(chunk.pcm)
+        )
+
+    def _update_records(self, chunks: List[AudioChunk]) -> None:
+        """Record current boundaries and hashes of chunks about to be transcribed again.
+        
+        Chunk PCM may differ from the recorded one (for example after CHUNK_OVERLAP_SEC
+        change), and an outdated record would make every later resume redo the chunk.
+        """
+        if self.manifest is None:
+            return
+        changed = False
+        for chunk in chunks:
+            record = self.manifest.chunk(chunk.index)
+            if record is None or chunk.pcm is None:
+                continue
+            sha256 = pcm_hash(chunk.pcm)
+            end_frame = record.start_frame + len(chunk.pcm) // (SAMPLE_SIZE * chunk.channel_count)
+            if record.sha256 != sha256 or record.end_frame != end_frame:
+                record.sha256 = sha256
+                record.end_frame = end_frame
+                changed = True
+        if changed:
+            self.manifest.save()
+
+    def transcribe_audio(self, audio_paths: List[str], parallel: int = 1) -> None:
+        """Transcribe audio files through a single STT client connection.
+        
+        Args:
+            audio_paths: Chunk files in playback order
+            parallel: Number of chunks recognized concurrently over the shared channel
+        """
+        chunks = [
+            AudioChunk(index=i, offset_ms=self.chunk_offsets_ms.get(path, 0), path=path)
+            for i, path in enumerate(audio_paths, 1)
+        ]
+        self.transcribe_chunks(chunks, parallel)
+
+    def transcribe_chunks(self, chunks: List[AudioChunk], parallel: int = 1,
+                          client: Optional[STTClient] = None, executor: Optional[Executor] = None) -> int:
+        """Transcribe chunks through a single STT client connection and merge results.
+        
+        Args:
+            chunks: Chunks in playback order
+            parallel: Number of chunks recognized concurrently over the shared channel
+            client: Client shared with other processors (a new one is opened if not given)
+            executor: Pool shared with other processors, bounds total number of requests
+                in flight (a new one of parallel workers is created if not given)
+        
+        Returns:
+            Number of chunks that failed to transcribe
+        """
         print("Transcribing audio...")
         
-        for i, audio_path in enumerate(audio_paths, 1):
-            output_file = os.path.join(self.transcription_dir, f"transcription_{i}.txt")
-            print(f"Processing chunk {i}/{len(audio_paths)}")
-            
-            env = os.environ.copy()
-            env["PYTHONIOENCODING"] = "utf-8"
+        settings = load_settings(self.config_file)
+        cache = cache_from_settings(settings) if self.use_cache else None
+        total = len(chunks)
+        pending = [chunk for chunk in chunks if not self._is_transcribed(chunk)]
+        if len(pending) < total:
+            print(f"Skipping {total - len(pending)} of {total} chunks transcribed in previous run")
+        self._update_records(pending)
+        
+        with contextlib.ExitStack() as stack:
+            if client is None:
+                client = stack.enter_context(
+                    STTClient(settings, timeout=RECOGNITION_TIMEOUT, cache=cache)
+                )
+            if executor is None:
+                executor = stack.enter_context(ThreadPoolExecutor(max_workers=max(1, parallel)))
+            futures = [
+                executor.submit(self._transcribe_chunk, client, chunk, total)
+                for chunk in pending
+            ]
+            results = [future.result() for future in futures]
+        
+        failed = results.count(False)
+        if failed:
+            print(f"{failed} of {total} chunks failed to transcribe")
+            if self.manifest is not None:
+                job = os.path.basename(os.path.normpath(self.transcription_dir))
+                print(f"Rerun with --resume {job} to retry only the failed chunks")
+        
+        # After all transcriptions are done, merge them
+        self.merge_transcriptions({chunk.index: chunk.window() for chunk in chunks})
+        return failed
+
+    def process(self, parallel: int = 1) -> None:
+        """Run the in-memory pipeline: decode, split and transcribe input_file.
+        
+        16-bit WAV input is memory-mapped as is, anything else is decoded by ffmpeg
+        straight into memory. No intermediate files are written unless
+        keep_intermediate is set.
+        
+        Progress is checkpointed to job.json in transcription_dir after every chunk,
+        so a job created with resume_job only transcribes chunks that are not done yet.
+        """
+        wav_path = self.input_file if self.input_file.lower().endswith('.wav') else None
+        conversion = self.manifest.conversion if self.manifest is not None else None
+        if wav_path is None and conversion is not None and conversion.wav_path \
+                and os.path.exists(conversion.wav_path):
+            # Decoded audio was kept by the previous run, no need to run ffmpeg again
+            wav_path = conversion.wav_path
+        
+        if wav_path:
+            with AudioFile(wav_path) as audio:
+                if audio.sample_size == SAMPLE_SIZE:
+                    digest = pcm_hash(audio.pcm)
+                    if wav_path == self.input_file or digest == conversion.sha256:
+                        self._process_pcm(audio.pcm, audio.sample_rate, audio.channel_count,
+                                          digest, parallel)
+                        return
+                    print(f"Converted audio {wav_path} has changed, decoding input again")
+        
+        pcm = self.decode_audio(self.input_file)
+        self._process_pcm(pcm, SAMPLE_RATE, CHANNEL_COUNT, pcm_hash(pcm), parallel)
+
+    def process_converted(self, wav_path: str, offsets: Optional[List[int]] = None,
+                          client: Optional[STTClient] = None, executor: Optional[Executor] = None) -> int:
+        """Transcribe 16-bit WAV already converted from input_file (e.g. by a batch worker).
+        
+        Args:
+            wav_path: Converted audio
+            offsets: Start frames of chunks, if already planned
+            client: Client shared with other processors
+            executor: Pool shared with other processors
+        
+        Returns:
+            Number of chunks that failed to transcribe
+        """
+        with AudioFile(wav_path) as audio:
+            return self._process_pcm(audio.pcm, audio.sample_rate, audio.channel_count,
+                                     pcm_hash(audio.pcm), offsets=offsets,
+                                     client=client, executor=executor)
+
+    def _process_pcm(self, pcm: Union[bytes, memoryview], sample_rate: int, channel_count: int,
+                     digest: str, parallel: int = 1, offsets: Optional[List[int]] = None,
+                     client: Optional[STTClient] = None, executor: Optional[Executor] = None) -> int:
+        """Split PCM at offsets recorded in the manifest (or new ones) and transcribe it."""
+        manifest = self.manifest
+        resumed = False
+        if manifest is not None and manifest.conversion is not None:
+            if manifest.conversion.sha256 == digest:
+                offsets = [chunk.start_frame for chunk in manifest.chunks]
+                resumed = True
+            else:
+                print("Audio differs from the one recorded in job manifest, starting job over")
+                for record in manifest.chunks:
+                    stale_file = self._chunk_output_file(record.index)
+                    if os.path.exists(stale_file):
+                        os.remove(stale_file)
+        
+        if offsets is None:
+            offsets = plan_split(pcm, sample_rate, channel_count)
+        chunks = self.split_pcm(pcm, sample_rate, channel_count, offsets)
+        
+        if not resumed:
+            frame_size = SAMPLE_SIZE * channel_count
+            wav_path = None
+            if self.keep_intermediate and not self.input_file.lower().endswith('.wav'):
+                wav_path = os.path.join(self.output_dir, "input.wav")
             
-            cmd = ["python", "-m", "clients.main", "recognize", "file",
-                  "--audio-file", audio_path, "--config", "config.ini",
-                  "--model", "e2e-v3", "--enable-punctuator", "--timeout", "120"]
+            records = [
+                ChunkRecord(
+                    index=chunk.index,
+                    start_frame=start_frame,
+                    end_frame=start_frame + len(chunk.pcm) // frame_size,
+                    offset_ms=chunk.offset_ms,
+                    sha256=pcm_hash(chunk.pcm),
+                )
+                for chunk, start_frame in zip(chunks, offsets)
+            ]
             
-            try:
-                result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', env=env)
-                if result.returncode == 0:
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        f.write(result.stdout)
-                    print(f"Transcription saved to {output_file}")
-                else:
-                    print(f"Error during transcription: {result.stderr}")
-                    print(f"Command output: {result.stdout}")
-            except Exception as e:
-                print(f"Error during transcription: {str(e)}")
-                print(f"Error type: {type(e)}")
+            self.manifest = JobManifest(
+                input_file=os.path.abspath(self.input_file),
+                job_dir=self.transcription_dir,
+                conversion=ConversionRecord(
+                    sample_rate=sample_rate,
+                    channel_count=channel_count,
+                    frames=len(pcm) // frame_size,
+                    sha256=digest,
+                    wav_path=os.path.abspath(wav_path) if wav_path else None,
+                ),
+                chunks=records,
+            )
+            self.manifest.save()
         
-        # After all transcriptions are done, merge them
+        return self.transcribe_chunks(chunks, parallel, client, executor)
+
+    def stream_transcribe(self) -> None:
+        """Transcribe input_file while it is being decoded.
+        
+        ffmpeg output is read incrementally and sent to the Recognize stream,
+        so recognition overlaps decoding and results appear as soon as the
+        first utterance is recognized. Responses are written to the transcript
+        as they arrive.
+        """
+        print("Streaming audio to recognition...")
+        
+        settings = load_settings(self.config_file)
+        config = stt_pb2.StreamRecognitionConfig(
+            config=STREAM_RECOGNITION_OPTIONS.recognition_config(SAMPLE_RATE, CHANNEL_COUNT),
+        )
+        audio_chunks = ffmpeg_pcm_chunks(self.input_file, SAMPLE_RATE, CHANNEL_COUNT, CHUNK_LEN_MS)
+        output_file = self._chunk_output_file(1)
+        
+        with STTClient(settings) as client, open(output_file, 'w', encoding='utf-8') as f:
+            for response in client.recognize(audio_chunks, config):
+                print_recognize_response_jsonl(response, file=f)
+                f.flush()
+                if response.is_final:
+                    print_recognize_response(response)
+        
+        print(f"Transcription saved to {output_file}")
         self.merge_transcriptions()
 
-    def merge_transcriptions(self) -> None:
-        """Merge all transcription files into one with proper formatting."""
+    def _manifest_windows(self) -> Dict[int, Tuple[int, int]]:
+        """Chunk boundaries recorded in the job manifest, ms."""
+        if self.manifest is None or self.manifest.conversion is None:
+            return {}
+        
+        rate = self.manifest.conversion.sample_rate
+        return {
+            chunk.index: (chunk.start_frame * 1000 // rate, chunk.end_frame * 1000 // rate)
+            for chunk in self.manifest.chunks
+        }
+
+    @span('merge')
+    def merge_transcriptions(self, windows: Optional[Dict[int, Tuple[int, int]]] = None) -> str:
+        """Merge chunk results into one continuous timeline.
+        
+        Utterances of all chunks are sorted by their (recording-absolute) time,
+        speech recognized twice around a chunk boundary is kept once and speaker
+        labels are reconciled across chunks, see merge_chunks. The timeline is
+        written as text and as JSON Lines (merged_transcription_<ts>.jsonl).
+        
+        Args:
+            windows: Start and end (ms) of every chunk by index, taken from the
+                job manifest if not given
+        
+        Returns:
+            Path of the merged transcription, also kept in merged_file
+        """
         print("Merging transcriptions...")
+        if windows is None:
+            windows = self._manifest_windows()
         
-        # Get all transcription files sorted by number
+        # Get all chunk results sorted by number
         transcription_files = sorted(
-            [f for f in os.listdir(self.transcription_dir) if f.startswith("transcription_")],
+            [f for f in os.listdir(self.transcription_dir)
+             if f.startswith("transcription_") and f.endswith(".jsonl")],
             key=lambda x: int(x.split("_")[1].split(".")[0])
         )
+        chunks = []
+        for fname in transcription_files:
+            index = int(fname.split("_")[1].split(".")[0])
+            start_ms, end_ms = windows.get(index, (None, None))
+            with open(os.path.join(self.transcription_dir, fname), 'r', encoding='utf-8') as infile:
+                chunks.append(ChunkTranscript.from_records(index, read_jsonl_records(infile),
+                                                           start_ms, end_ms))
+        timeline = merge_chunks(chunks)
         
         # Create merged file name with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         merged_file = os.path.join(self.output_dir, f"merged_transcription_{timestamp}.txt")
         
         with open(merged_file, 'w', encoding='utf-8') as outfile:
-            for i, fname in enumerate(transcription_files, 1):
-                file_path = os.path.join(self.transcription_dir, fname)
-                with open(file_path, 'r', encoding='utf-8') as infile:
-                    content = infile.read()
-                    
-                    # Extract only the relevant parts (speaker lines)
-                    cleaned_lines = []
-                    for line in content.split('\n'):
-                        # Skip technical lines and empty lines
-                        if "Speaker labeling enabled:" in line:
-                            continue
-                        if "Speaker" in line and ":" in line:
-                            cleaned_lines.append(line.strip())
-                    
-                    if cleaned_lines:
-                        outfile.write(f"Part {i}\n")
-                        outfile.write('\n'.join(cleaned_lines))
-                        outfile.write('\n\n')
+            for utterance in timeline:
+                outfile.write(format_utterance(utterance.transcript, utterance.start_ms,
+                                               utterance.end_ms, utterance.speaker_id))
+                outfile.write('\n')
+        with open(os.path.splitext(merged_file)[0] + '.jsonl', 'w', encoding='utf-8') as outfile:
+            for utterance in timeline:
+                outfile.write(json.dumps(utterance.to_record(), ensure_ascii=False))
+                outfile.write('\n')
         
         print(f"Merged transcription saved to: {merged_file}")
+        self.merged_file = merged_file
+        return merged_file
 
 def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='Process and transcribe audio/video files')
-    parser.add_argument('--input-file', type=str, required=True,
-                       help='Path to the input audio/video file')
+    parser.add_argument('--input-file', type=str,
+                       help='Path to the input audio/video file (optional with --resume)')
+    parser.add_argument('--config', default='config.ini',
+                       help='Path to the configuration file')
+    parser.add_argument('--parallel', type=int, default=1,
+                       help='Number of chunks to transcribe concurrently')
+    parser.add_argument('--keep-intermediate', action='store_true',
+                       help='Save decoded input.wav and chunk_N.wav files for debugging')
+    parser.add_argument('--stream', action='store_true',
+                       help='Stream audio to recognition while ffmpeg decodes it')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always send audio to the server, ignoring cached results')
+    parser.add_argument('--resume', metavar='JOB',
+                       help='Continue an interrupted job (transcription_<timestamp> directory)')
     args = parser.parse_args()
+    
+    if not args.input_file and not args.resume:
+        parser.error("--input-file is required unless --resume is given")
+    if args.stream and args.resume:
+        parser.error("--stream jobs can not be resumed")
 
-    processor = AudioProcessor(args.input_file)
+    processor = AudioProcessor(args.input_file, config_file=args.config,
+                               keep_intermediate=args.keep_intermediate,
+                               use_cache=not args.no_cache, resume_job=args.resume)
     
-    # Convert to WAV if needed
-    if not args.input_file.endswith('.wav'):
-        output_path = os.path.join(processor.output_dir, "input.wav")
-        processor._convert_to_wav(args.input_file, output_path)
-        input_file = output_path
+    if args.stream:
+        # Decode and recognize concurrently through one Recognize stream
+        processor.stream_transcribe()
     else:
-        input_file = args.input_file
-    
-    # Split if necessary
-    audio_chunks = processor.split_audio(input_file)
-    
-    # Transcribe and save results
-    processor.transcribe_audio(audio_chunks)
+        # Decode, split and transcribe in memory, then save results
+        processor.process(parallel=args.parallel)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,314 @@
+import os
+import json
+import hashlib
+import argparse
+import multiprocessing
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from clients.asr.client import cache_from_settings, STTClient
+from clients.common_utils.audio import AudioFile
+from clients.common_utils.config import load_settings
+
+from .audio_processor import (
+    AudioProcessor,
+    RECOGNITION_TIMEOUT,
+    SAMPLE_SIZE,
+    convert_to_wav,
+    plan_split,
+)
+from .pipeline import Pipeline, Stage, StageStats
+from .summarization import TranscriptionSummarizer
+
+# Files picked up when a directory is given
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.mp4', '.m4a', '.aac', '.ogg', '.opus', '.flac',
+                    '.webm', '.mkv', '.mov', '.avi')
+
+@dataclass
+class FileResult:
+    input_file: str
+    output_dir: str
+    duration_s: float = 0.0
+    failed_chunks: int = 0
+    merged_file: Optional[str] = None
+    summary_file: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.failed_chunks
+
+@dataclass
+class BatchSummary:
+    files: List[FileResult]
+    wall_s: float
+    stages: List[StageStats] = field(default_factory=list)
+
+    @property
+    def audio_s(self) -> float:
+        return sum(result.duration_s for result in self.files)
+
+    @property
+    def failed(self) -> int:
+        return sum(not result.ok for result in self.files)
+
+    @property
+    def audio_hours_per_wall_hour(self) -> float:
+        """Throughput: hours of audio transcribed per hour of wall time."""
+        return self.audio_s / self.wall_s if self.wall_s else 0.0
+
+@dataclass
+class _FileJob:
+    """File moving through pipeline stages."""
+    result: FileResult
+    processor: Optional[AudioProcessor] = None
+    wav_path: Optional[str] = None
+    # WAV was written by the convert stage and is removed after recognition
+    temporary: bool = False
+    offsets: Optional[List[int]] = None
+
+def convert_audio(input_file: str, wav_path: str) -> Tuple[str, float, bool]:
+    """CPU stage, runs in a worker process: convert input to 16-bit WAV unless it already is one.
+
+    Returns:
+        WAV path, audio duration in seconds and whether the WAV was written here
+    """
+    if input_file.lower().endswith('.wav'):
+        with AudioFile(input_file) as audio:
+            if audio.sample_size == SAMPLE_SIZE:
+                return input_file, audio.duration_ms / 1000, False
+
+    convert_to_wav(input_file, wav_path)
+    with AudioFile(wav_path) as audio:
+        return wav_path, audio.duration_ms / 1000, True
+
+def plan_chunks(wav_path: str) -> List[int]:
+    """CPU stage, runs in a worker process: find start frames of chunks in pauses."""
+    with AudioFile(wav_path) as audio:
+        return plan_split(audio.pcm, audio.sample_rate, audio.channel_count)
+
+def _output_name(path: Path, root: Path) -> str:
+    """Per-file output directory name, unique for files of one batch."""
+    try:
+        relative = path.resolve().relative_to(root.resolve())
+    except ValueError:
+        # Outside of root: same-named files of different directories must not share a directory
+        digest = hashlib.sha256(str(path.resolve()).encode('utf-8')).hexdigest()[:8]
+        relative = Path(f"{path.name}_{digest}")
+    # Keep extension, so call.mp3 and call.wav do not share a directory
+    return str(relative.parent / relative.name.replace('.', '_'))
+
+def collect_inputs(source: str) -> List[Tuple[str, str]]:
+    """List input files of a batch with their output directory names.
+
+    Source is either a directory (searched recursively for AUDIO_EXTENSIONS) or
+    a manifest: text file with one input path per line. Relative manifest paths
+    are resolved against the manifest directory, blank lines and lines starting
+    with # are skipped, as are repeated paths.
+    """
+    source_path = Path(source)
+    if source_path.is_dir():
+        paths = sorted(
+            path for path in source_path.rglob('*')
+            if path.is_file() and path.suffix.lower() in AUDIO_EXTENSIONS
+        )
+        root = source_path
+    else:
+        root = source_path.parent
+        paths = []
+        seen = set()
+        with open(source_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                path = Path(line).expanduser()
+                path = path if path.is_absolute() else root / path
+                if path.resolve() not in seen:
+                    seen.add(path.resolve())
+                    paths.append(path)
+
+    return [(str(path), _output_name(path, root)) for path in paths]
+
+class BatchTranscriber:
+    """Transcribe many files in a pipeline of convert, split, recognize and summarize stages.
+
+    Stages are connected by bounded queues, so the server recognizes file N while
+    ffmpeg converts file N+1 and the LLM summarizes file N-1. Conversion and chunk
+    planning run in a process pool, recognition requests of all files share one
+    STT client and one I/O thread pool.
+    Global limits:
+        cpu_workers: Processes converting and splitting files at the same time
+        max_requests: Recognition requests in flight across all files
+        max_files: Files being recognized at the same time
+        queue_size: Files waiting between two stages (bounds disk and memory used
+            by converted audio waiting for recognition)
+    """
+
+    def __init__(self, output_dir: str = "output", config_file: str = "config.ini",
+                 cpu_workers: Optional[int] = None, max_requests: int = 8,
+                 max_files: int = 2, queue_size: int = 2, keep_intermediate: bool = False,
+                 use_cache: bool = True, add_summarization: bool = False, summary_workers: int = 2):
+        self.output_dir = output_dir
+        self.config_file = config_file
+        self.cpu_workers = cpu_workers or os.cpu_count() or 1
+        self.max_requests = max_requests
+        self.max_files = max_files
+        self.queue_size = queue_size
+        self.keep_intermediate = keep_intermediate
+        self.use_cache = use_cache
+        self.add_summarization = add_summarization
+        self.summary_workers = summary_workers
+
+    def _stage(self, name: str, func: Callable[[_FileJob], None], workers: int) -> Stage:
+        """Wrap func so that failed files skip the rest of the stages."""
+        def run(job: _FileJob) -> _FileJob:
+            if job.result.error is None:
+                try:
+                    func(job)
+                except Exception as e:
+                    print(f"Error during {name} of {job.result.input_file}: {str(e)}")
+                    job.result.error = f"{name}: {str(e)}"
+            return job
+
+        return Stage(name, run, workers)
+
+    def _convert(self, job: _FileJob, cpu_pool: Executor) -> None:
+        job.processor = AudioProcessor(job.result.input_file, output_dir=job.result.output_dir,
+                                       config_file=self.config_file,
+                                       keep_intermediate=self.keep_intermediate,
+                                       use_cache=self.use_cache)
+        wav_path = os.path.join(job.processor.output_dir, "input.wav")
+        job.wav_path, job.result.duration_s, job.temporary = cpu_pool.submit(
+            convert_audio, job.result.input_file, wav_path
+        ).result()
+
+    def _split(self, job: _FileJob, cpu_pool: Executor) -> None:
+        job.offsets = cpu_pool.submit(plan_chunks, job.wav_path).result()
+
+    def _recognize(self, job: _FileJob, io_pool: Executor, client: STTClient) -> None:
+        try:
+            job.result.failed_chunks = job.processor.process_converted(
+                job.wav_path, job.offsets, client, io_pool
+            )
+            job.result.merged_file = job.processor.merged_file
+        finally:
+            if job.temporary and not self.keep_intermediate:
+                os.remove(job.wav_path)
+
+    def _summarize(self, job: _FileJob) -> None:
+        summarizer = TranscriptionSummarizer(job.result.merged_file, job.result.output_dir,
+                                             self.config_file)
+        job.result.summary_file = summarizer.summarize()
+
+    def _report(self, job: _FileJob) -> _FileJob:
+        result = job.result
+        status = "done" if result.ok else "FAILED"
+        print(f"[{status}] {result.input_file} ({result.duration_s / 60:.1f} min of audio)")
+        return job
+
+    def run(self, inputs: List[Tuple[str, str]]) -> BatchSummary:
+        """Transcribe (input file, output name) pairs, see collect_inputs."""
+        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+        settings = load_settings(self.config_file)
+        cache = cache_from_settings(settings) if self.use_cache else None
+
+        # Workers are spawned, not forked: forking a process with live gRPC threads is unsafe
+        cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers,
+                                       mp_context=multiprocessing.get_context('spawn'))
+        with cpu_pool, \
+                ThreadPoolExecutor(max_workers=self.max_requests) as io_pool, \
+                STTClient(settings, timeout=RECOGNITION_TIMEOUT, cache=cache) as client:
+            stages = [
+                self._stage("convert", lambda job: self._convert(job, cpu_pool), self.cpu_workers),
+                self._stage("split", lambda job: self._split(job, cpu_pool), self.cpu_workers),
+                self._stage("recognize", lambda job: self._recognize(job, io_pool, client),
+                            self.max_files),
+            ]
+            if self.add_summarization:
+                stages.append(self._stage("summarize", self._summarize, self.summary_workers))
+            stages.append(Stage("report", self._report))
+
+            pipeline = Pipeline(stages, self.queue_size)
+            jobs = pipeline.run(
+                _FileJob(FileResult(input_file, os.path.join(self.output_dir, name)))
+                for input_file, name in inputs
+            )
+
+        # Keep input order in the summary
+        order = {input_file: i for i, (input_file, _) in enumerate(inputs)}
+        results = sorted((job.result for job in jobs), key=lambda result: order[result.input_file])
+        summary = BatchSummary(results, pipeline.wall_s, pipeline.stats)
+        pipeline.print_stats()
+        self._save_summary(summary)
+        return summary
+
+    def _save_summary(self, summary: BatchSummary) -> None:
+        summary_file = os.path.join(self.output_dir, "batch_summary.json")
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'files': [asdict(result) for result in summary.files],
+                'failed': summary.failed,
+                'audio_s': summary.audio_s,
+                'wall_s': summary.wall_s,
+                'audio_hours_per_wall_hour': summary.audio_hours_per_wall_hour,
+                'stages': [
+                    dict(asdict(stats), utilization=stats.utilization(summary.wall_s))
+                    for stats in summary.stages
+                ],
+            }, f, ensure_ascii=False, indent=2)
+
+        print(f"\nTranscribed {len(summary.files) - summary.failed} of {len(summary.files)} files "
+              f"({summary.audio_s / 3600:.2f}h of audio) in {summary.wall_s / 60:.1f} min")
+        print(f"Throughput: {summary.audio_hours_per_wall_hour:.1f} audio-hours per wall-hour")
+        print(f"Summary saved to: {summary_file}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Transcribe all audio/video files of a directory or manifest')
+    parser.add_argument('source', type=str,
+                       help='Directory to search for audio/video files, or manifest file with one path per line')
+    parser.add_argument('--output-dir', default='output',
+                       help='Directory to save the transcription results (one subdirectory per file)')
+    parser.add_argument('--config', default='config.ini',
+                       help='Path to the configuration file')
+    parser.add_argument('--cpu-workers', type=int, default=None,
+                       help='Processes converting and splitting files (default: number of CPUs)')
+    parser.add_argument('--max-requests', type=int, default=8,
+                       help='Recognition requests in flight across all files')
+    parser.add_argument('--max-files', type=int, default=2,
+                       help='Files recognized at the same time, their chunks share --max-requests')
+    parser.add_argument('--queue-size', type=int, default=2,
+                       help='Files waiting between two pipeline stages')
+    parser.add_argument('--add-summarization', action='store_true',
+                       help='Generate a summary of every transcription using GPT-4o')
+    parser.add_argument('--keep-intermediate', action='store_true',
+                       help='Save converted input.wav and chunk_N.wav files for debugging')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always send audio to the server, ignoring cached results')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        parser.error(f"Source does not exist: {args.source}")
+
+    inputs = collect_inputs(args.source)
+    if not inputs:
+        parser.error(f"No audio/video files found in {args.source}")
+    print(f"Found {len(inputs)} files")
+
+    transcriber = BatchTranscriber(args.output_dir, args.config,
+                                   cpu_workers=args.cpu_workers,
+                                   max_requests=args.max_requests,
+                                   max_files=args.max_files,
+                                   queue_size=args.queue_size,
+                                   keep_intermediate=args.keep_intermediate,
+                                   use_cache=not args.no_cache,
+                                   add_summarization=args.add_summarization)
+    summary = transcriber.run(inputs)
+
+    if summary.failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
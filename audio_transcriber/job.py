@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional, Union
+
+MANIFEST_NAME = "job.json"
+
+# Chunk statuses
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+def pcm_hash(pcm: Union[bytes, memoryview]) -> str:
+    """SHA-256 of a PCM buffer."""
+    return hashlib.sha256(pcm).hexdigest()
+
+
+@dataclass
+class ConversionRecord:
+    """Decoded PCM the job was split from."""
+    sample_rate: int
+    channel_count: int
+    frames: int
+    sha256: str
+    wav_path: Optional[str] = None
+
+
+@dataclass
+class ChunkRecord:
+    """Boundaries and transcription status of one chunk."""
+    index: int
+    start_frame: int
+    end_frame: int
+    offset_ms: int
+    sha256: str
+    status: str = PENDING
+    error: Optional[str] = None
+
+
+@dataclass
+class JobManifest:
+    """Progress of one transcription job, saved as job.json in its transcription directory.
+
+    Records conversion, split offsets and per-chunk status, so an interrupted or
+    partially failed job can be resumed from the first incomplete chunk.
+    """
+    input_file: str
+    job_dir: str
+    conversion: Optional[ConversionRecord] = None
+    chunks: List[ChunkRecord] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.job_dir, MANIFEST_NAME)
+
+    @classmethod
+    def load(cls, job_dir: str) -> "JobManifest":
+        """Load manifest of an existing job."""
+        with open(os.path.join(job_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        conversion = data.get('conversion')
+        return cls(
+            input_file=data['input_file'],
+            job_dir=job_dir,
+            conversion=ConversionRecord(**conversion) if conversion else None,
+            chunks=[ChunkRecord(**chunk) for chunk in data.get('chunks', [])],
+        )
+
+    def save(self) -> None:
+        """Atomically write manifest to job directory."""
+        with self._lock:
+            data = {
+                'input_file': self.input_file,
+                'conversion': asdict(self.conversion) if self.conversion else None,
+                'chunks': [asdict(chunk) for chunk in self.chunks],
+            }
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def chunk(self, index: int) -> Optional[ChunkRecord]:
+        for record in self.chunks:
+            if record.index == index:
+                return record
+        return None
+
+    def set_status(self, index: int, status: str, error: Optional[str] = None) -> None:
+        """Update chunk status and persist the manifest right away."""
+        record = self.chunk(index)
+        if record is None:
+            return
+        record.status = status
+        record.error = error
+        self.save()
+
+    def incomplete(self) -> List[ChunkRecord]:
+        return [chunk for chunk in self.chunks if chunk.status != DONE]
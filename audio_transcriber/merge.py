@@ -0,0 +1,267 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from clients.asr.utils.response import record_transcript
+
+# Utterances of two chunks are the same speech if they share this part of the shorter one
+DUPLICATE_OVERLAP = 0.5
+
+@dataclass
+class Utterance:
+    """Final hypothesis of one chunk, times are recording-absolute."""
+    start_ms: int
+    end_ms: int
+    transcript: str
+    speaker_id: Optional[int] = None
+    channel: int = 0
+    confidence: float = 0.0
+    words: List[Dict[str, Any]] = field(default_factory=list)
+    chunk: int = 0
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any], chunk: int = 0) -> 'Utterance':
+        """Utterance of a record written by print_recognize_response_jsonl."""
+        return cls(
+            start_ms=record.get('start_time_ms', 0),
+            end_ms=record.get('end_time_ms', 0),
+            transcript=record_transcript(record),
+            speaker_id=record.get('speaker_id'),
+            channel=record.get('channel', 0),
+            confidence=record.get('confidence', 0.0),
+            # Words of the same form as the transcript
+            words=record.get('normalized_words') or record.get('words') or [],
+            chunk=chunk,
+        )
+
+    def to_record(self) -> Dict[str, Any]:
+        return {
+            'start_time_ms': self.start_ms,
+            'end_time_ms': self.end_ms,
+            'speaker_id': self.speaker_id,
+            'channel': self.channel,
+            'transcript': self.transcript,
+            'confidence': self.confidence,
+            'words': self.words,
+            'chunk': self.chunk,
+        }
+
+@dataclass
+class ChunkTranscript:
+    """Utterances recognized in one chunk.
+
+    start_ms and end_ms are the chunk boundaries in the recording, if unknown the
+    span of its utterances is used.
+    """
+    index: int
+    utterances: List[Utterance]
+    start_ms: Optional[int] = None
+    end_ms: Optional[int] = None
+
+    @classmethod
+    def from_records(cls, index: int, records: Iterable[Dict[str, Any]],
+                     start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> 'ChunkTranscript':
+        """Chunk of final records that have a transcript, interim results are dropped."""
+        utterances = [
+            Utterance.from_record(record, index) for record in records
+            if record.get('is_final') and record_transcript(record)
+        ]
+        return cls(index, utterances, start_ms, end_ms)
+
+    def window(self) -> Tuple[int, int]:
+        start_ms, end_ms = self.start_ms, self.end_ms
+        if start_ms is None:
+            start_ms = min((u.start_ms for u in self.utterances), default=0)
+        if end_ms is None:
+            end_ms = max((u.end_ms for u in self.utterances), default=start_ms)
+        return start_ms, end_ms
+
+def _intersection_ms(a: Utterance, b: Utterance) -> int:
+    return min(a.end_ms, b.end_ms) - max(a.start_ms, b.start_ms)
+
+def _duplicates(previous: List[Utterance], current: List[Utterance],
+                overlap_start_ms: int, overlap_end_ms: int) -> List[Tuple[int, Utterance, Utterance]]:
+    """Pairs of utterances of two neighbouring chunks that are the same speech.
+
+    Only utterances around the boundary are compared: ones of the previous chunk
+    ending after the next one starts and ones of the next chunk starting before
+    the previous one ends.
+
+    Returns:
+        (shared time, previous utterance, current utterance), longest shared time first
+    """
+    tail = [u for u in previous if u.end_ms > overlap_start_ms]
+    head = [u for u in current if u.start_ms < overlap_end_ms]
+
+    pairs = []
+    for a in tail:
+        for b in head:
+            shorter_ms = min(a.end_ms - a.start_ms, b.end_ms - b.start_ms)
+            shared_ms = _intersection_ms(a, b)
+            if a.channel == b.channel and shorter_ms > 0 \
+                    and shared_ms >= DUPLICATE_OVERLAP * shorter_ms:
+                pairs.append((shared_ms, a, b))
+    pairs.sort(key=lambda pair: pair[0], reverse=True)
+    return pairs
+
+def _match_speakers(pairs: List[Tuple[int, Utterance, Utterance]], local_ids: Set[int],
+                    known_ids: Set[int]) -> Dict[int, int]:
+    """Map speaker labels of a chunk to labels of the timeline so far.
+
+    Diarization labels are assigned per chunk, so "Speaker 1" of two chunks may be
+    different people. Speech recognized by both neighbouring chunks tells who is who:
+    labels are matched greedily by the time they are heard saying the same thing.
+    Labels without such evidence keep their number if it is not taken, otherwise
+    get the first free known label or a new one.
+    """
+    scores: Dict[Tuple[int, int], int] = {}
+    for shared_ms, a, b in pairs:
+        if a.speaker_id is not None and b.speaker_id is not None:
+            key = (b.speaker_id, a.speaker_id)
+            scores[key] = scores.get(key, 0) + shared_ms
+
+    mapping: Dict[int, int] = {}
+    for (local_id, global_id), _ in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+        if local_id not in mapping and global_id not in mapping.values():
+            mapping[local_id] = global_id
+
+    taken = set(mapping.values())
+    for local_id in sorted(local_ids - set(mapping)):
+        if local_id not in taken:
+            global_id = local_id
+        else:
+            free = sorted(known_ids - taken)
+            global_id = free[0] if free else max(known_ids | taken) + 1
+        mapping[local_id] = global_id
+        taken.add(global_id)
+    return mapping
+
+def _margin_ms(utterance: Utterance, window: Tuple[int, int]) -> int:
+    """Distance to the closest chunk edge: utterances cut by an edge have none."""
+    return min(utterance.start_ms - window[0], window[1] - utterance.end_ms)
+
+def _shared_ms(a: Dict[str, Any], b: Dict[str, Any]) -> int:
+    return min(a['end_time_ms'], b['end_time_ms']) - max(a['start_time_ms'], b['start_time_ms'])
+
+def _is_same_word(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    shorter_ms = min(a['end_time_ms'] - a['start_time_ms'], b['end_time_ms'] - b['start_time_ms'])
+    return shorter_ms > 0 and _shared_ms(a, b) >= DUPLICATE_OVERLAP * shorter_ms
+
+def _word_texts(utterances: Iterable[Utterance]) -> Dict[int, str]:
+    """Transcript form of words (by id), for utterances whose transcript matches them one to one.
+
+    Normalized transcript has punctuation and capitals the words may lack.
+    """
+    texts: Dict[int, str] = {}
+    for utterance in utterances:
+        tokens = utterance.transcript.split()
+        if len(tokens) == len(utterance.words):
+            for word, token in zip(utterance.words, tokens):
+                texts[id(word)] = token
+    return texts
+
+def _set_words(utterance: Utterance, words: List[Dict[str, Any]], texts: Dict[int, str]) -> None:
+    """Replace words of an utterance, transcript (in the form of texts) and times follow them."""
+    utterance.words = words
+    utterance.transcript = ' '.join(texts.get(id(word), word['word']) for word in words)
+    if words:
+        utterance.start_ms = words[0]['start_time_ms']
+        utterance.end_ms = words[-1]['end_time_ms']
+
+def _splice_words(previous: List[Utterance], current: List[Utterance], cut_ms: int) -> Set[int]:
+    """Keep every word heard in the overlap of two chunks once.
+
+    Words are taken from the previous chunk before cut_ms (middle of the overlap)
+    and from the next one after it, so each side keeps the words it heard with
+    context on both sides. A word recognized by both chunks right at the cut is
+    kept once, with the higher confidence. Utterance of one speaker split by the
+    cut is joined back.
+
+    Returns:
+        ids of utterances left without words
+    """
+    texts = _word_texts(previous + current)
+    tails, heads = [], []
+    for utterance in previous:
+        words = [w for w in utterance.words if (w['start_time_ms'] + w['end_time_ms']) // 2 < cut_ms]
+        if utterance.words and len(words) < len(utterance.words):
+            tails.append(utterance)
+            utterance.words = words
+    for utterance in current:
+        words = [w for w in utterance.words if (w['start_time_ms'] + w['end_time_ms']) // 2 >= cut_ms]
+        if utterance.words and len(words) < len(utterance.words):
+            heads.append(utterance)
+            utterance.words = words
+    heads.sort(key=lambda u: u.start_ms)
+
+    for a in tails:
+        for b in heads:
+            if a.channel != b.channel or not a.words or not b.words:
+                continue
+            if _is_same_word(a.words[-1], b.words[0]):
+                if b.words[0].get('confidence', 0.0) > a.words[-1].get('confidence', 0.0):
+                    a.words.pop()
+                else:
+                    b.words.pop(0)
+            if a.words and b.words and a.speaker_id == b.speaker_id:
+                a.words.extend(b.words)
+                b.words = []
+
+    emptied = set()
+    for utterance in tails + heads:
+        _set_words(utterance, utterance.words, texts)
+        if not utterance.words:
+            emptied.add(id(utterance))
+    return emptied
+
+def merge_chunks(chunks: List[ChunkTranscript]) -> List[Utterance]:
+    """Merge chunk transcripts into one timeline sorted by time.
+
+    Speaker labels are reconciled across chunks. In the overlap of two chunks
+    utterances with word times are spliced word by word (see _splice_words),
+    others recognized by both chunks are kept once - from the chunk where they
+    are farther from the edge, i.e. recognized with more context and not cut.
+    """
+    timeline: List[Utterance] = []
+    known_ids: Set[int] = set()
+    previous: List[Utterance] = []
+    previous_window: Optional[Tuple[int, int]] = None
+
+    for chunk in sorted(chunks, key=lambda c: c.index):
+        window = chunk.window()
+        utterances = [
+            Utterance(u.start_ms, u.end_ms, u.transcript, u.speaker_id, u.channel,
+                      u.confidence, list(u.words), chunk.index)
+            for u in chunk.utterances
+        ]
+        pairs = []
+        if previous_window is not None:
+            pairs = _duplicates(previous, utterances, window[0], previous_window[1])
+
+        local_ids = {u.speaker_id for u in utterances if u.speaker_id is not None}
+        mapping = _match_speakers(pairs, local_ids, known_ids) if known_ids else {}
+        for utterance in utterances:
+            utterance.speaker_id = mapping.get(utterance.speaker_id, utterance.speaker_id)
+        known_ids |= set(mapping.values()) or local_ids
+
+        dropped: Set[int] = set()
+        if previous_window is not None and window[0] < previous_window[1]:
+            dropped = _splice_words(previous, utterances, (window[0] + previous_window[1]) // 2)
+
+        # Keep one utterance of every duplicate pair not spliced by words
+        for _, a, b in pairs:
+            if id(a) in dropped or id(b) in dropped or (a.words and b.words):
+                continue
+            if _margin_ms(a, previous_window) >= _margin_ms(b, window):
+                dropped.add(id(b))
+            else:
+                dropped.add(id(a))
+        if dropped:
+            timeline = [u for u in timeline if id(u) not in dropped]
+        kept = [u for u in utterances if id(u) not in dropped]
+
+        timeline.extend(kept)
+        previous, previous_window = kept, window
+
+    # Stable: untimed utterances keep chunk order
+    timeline.sort(key=lambda u: (u.start_ms, u.end_ms))
+    return timeline
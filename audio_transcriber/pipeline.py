@@ -0,0 +1,126 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional
+
+# End-of-input marker passed between stages
+_DONE = object()
+
+@dataclass
+class StageStats:
+    """Work done by one stage during a pipeline run."""
+    name: str
+    workers: int
+    items: int = 0
+    busy_s: float = 0.0
+
+    def utilization(self, wall_s: float) -> float:
+        """Share of worker time spent processing items (1.0 - all workers always busy)."""
+        return self.busy_s / (self.workers * wall_s) if wall_s else 0.0
+
+class Stage:
+    """Pipeline step: func is applied to every item by a number of worker threads.
+
+    func must return the item for the next stage. It should not raise - errors are
+    expected to be recorded on the item. If it does raise, the item is dropped and
+    the exception is re-raised by Pipeline.run after all other items are processed.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+
+class Pipeline:
+    """Stages connected by bounded queues, so different items are in different stages at once.
+
+    E.g. file N is recognized while file N+1 is converted and file N-1 is summarized.
+    A full queue blocks the stage before it, so fast stages never run more than
+    queue_size items ahead of slow ones. Per-stage utilization of the last run is
+    kept in stats, the stage with the highest one is the bottleneck.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 2):
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.stats: List[StageStats] = []
+        self.wall_s = 0.0
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """Pass items through all stages, return them in completion order."""
+        self.stats = [StageStats(stage.name, stage.workers) for stage in self.stages]
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results: queue.Queue = queue.Queue()
+        errors: List[BaseException] = []
+        lock = threading.Lock()
+        remaining_workers = [stage.workers for stage in self.stages]
+
+        def worker(index: int) -> None:
+            stage, stats = self.stages[index], self.stats[index]
+            is_last = index + 1 == len(self.stages)
+            next_queue = results if is_last else queues[index + 1]
+            while True:
+                item = queues[index].get()
+                if item is _DONE:
+                    break
+
+                started = time.perf_counter()
+                try:
+                    item = stage.func(item)
+                except BaseException as e:
+                    with lock:
+                        errors.append(e)
+                    continue
+                finally:
+                    with lock:
+                        stats.busy_s += time.perf_counter() - started
+                        stats.items += 1
+                next_queue.put(item)
+
+            # Last worker of a stage tells every worker of the next stage to stop
+            with lock:
+                remaining_workers[index] -= 1
+                finished = remaining_workers[index] == 0
+            if finished:
+                for _ in range(1 if is_last else self.stages[index + 1].workers):
+                    next_queue.put(_DONE)
+
+        threads = [
+            threading.Thread(target=worker, args=(index,), name=f"{stage.name}-{n}", daemon=True)
+            for index, stage in enumerate(self.stages)
+            for n in range(stage.workers)
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+
+        for item in items:
+            queues[0].put(item)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_DONE)
+
+        output = []
+        while (item := results.get()) is not _DONE:
+            output.append(item)
+        for thread in threads:
+            thread.join()
+        self.wall_s = time.monotonic() - started
+
+        if errors:
+            raise errors[0]
+        return output
+
+    def bottleneck(self) -> Optional[StageStats]:
+        if not self.stats:
+            return None
+        return max(self.stats, key=lambda stats: stats.utilization(self.wall_s))
+
+    def print_stats(self) -> None:
+        print(f"\n{'Stage':<12} {'Workers':>7} {'Items':>6} {'Busy, s':>9} {'Utilization':>12}")
+        for stats in self.stats:
+            print(f"{stats.name:<12} {stats.workers:>7} {stats.items:>6} {stats.busy_s:>9.1f} "
+                  f"{stats.utilization(self.wall_s):>11.0%}")
+        bottleneck = self.bottleneck()
+        if bottleneck is not None:
+            print(f"Bottleneck: {bottleneck.name}")
@@ -0,0 +1,68 @@
+"""Silence-aware placement of chunk boundaries."""
+from typing import List
+
+import numpy as np
+
+# Length of a window whose mean energy is compared when looking for a pause
+ENERGY_WINDOW_MS = 50
+# How far from the nominal (equal-duration) boundary a cut may move
+DEFAULT_TOLERANCE_MS = 10_000
+
+
+def window_energy(samples: np.ndarray, window: int) -> np.ndarray:
+    """Mean signal energy of consecutive windows.
+    
+    Args:
+        samples: int16 PCM samples shaped (frames, channels)
+        window: Window length in frames, trailing incomplete window is ignored
+        
+    Returns:
+        Array with one energy value per window
+    """
+    count = len(samples) // window
+    frames = samples[:count * window].astype(np.float32)
+    return np.square(frames).reshape(count, -1).mean(axis=1)
+
+
+def find_split_points(
+    pcm: memoryview,
+    sample_rate: int,
+    channel_count: int,
+    num_chunks: int,
+    tolerance_ms: int = DEFAULT_TOLERANCE_MS,
+    window_ms: int = ENERGY_WINDOW_MS,
+) -> List[int]:
+    """Find chunk start offsets placed in the quietest region near equal-duration cuts.
+    
+    Args:
+        pcm: 16-bit little-endian PCM payload
+        sample_rate: Sample rate in Hz
+        channel_count: Number of interleaved channels
+        num_chunks: Number of chunks to produce
+        tolerance_ms: Max distance between a cut and its equal-duration position
+        window_ms: Energy window length
+        
+    Returns:
+        Start offset of every chunk in frames, the first one is always 0
+    """
+    samples = np.frombuffer(pcm, dtype='<i2').reshape(-1, channel_count)
+    total = len(samples)
+    window = max(1, sample_rate * window_ms // 1000)
+    # NB: Limiting tolerance to half a chunk keeps cuts ordered and chunks non-empty
+    tolerance = min(sample_rate * tolerance_ms // 1000, total // num_chunks // 2)
+    
+    offsets = [0]
+    for i in range(1, num_chunks):
+        nominal = total * i // num_chunks
+        start = max(offsets[-1] + window, nominal - tolerance)
+        end = min(total, nominal + tolerance)
+        
+        if end - start < window:
+            offsets.append(nominal)
+            continue
+        
+        energy = window_energy(samples[start:end], window)
+        quietest = int(np.argmin(energy))
+        offsets.append(start + quietest * window + window // 2)
+    
+    return offsets
@@ -1,9 +1,102 @@
 import os
 import configparser
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import List, TextIO
 from openai import OpenAI
 from pathlib import Path
 
+SYSTEM_PROMPT = "You are a helpful assistant specializing in summarizing conversations in Russian."
+
+# Prompt of a transcript short enough to be summarized in one request
+SUMMARY_PROMPT = """Create a summary highlighting the key points from a conversation transcription divided by speaker roles.
+
+The text is in Russian. Focus on extracting the main ideas exchanged in the discussion, highlighting any significant decisions, insights, or action items.
+
+# Steps
+
+1. **Review the transcription:** Carefully read through the entire transcription to understand the context of the conversation.
+2. **Identify Key Points:** Look for recurring themes, important decisions, challenges discussed, strategies proposed, or any conclusions reached.
+3. **Summarize by Speaker:** Briefly summarize each speaker's contribution, focusing on their main points and how they relate to the overall conversation.
+4. **Synthesize Information:** Combine the speakers' contributions into a cohesive summary, ensuring it conveys the essential elements of the conversation without losing critical details.
+
+# Output Format
+
+The output should be a concise paragraph summarizing the key points of the conversation. It should include:
+- A clear overview of the discussion context.
+- Main themes and insights.
+- Any decisions or conclusions made.
+- Important details mentioned by the speakers.
+
+# Notes
+
+- Focus on clarity and conciseness, avoiding excessive detail.
+- Ensure the summary reflects the Russian context and nuances accurately.
+- Avoid using colloquial language or overly complex sentences for readability.
+
+Here is the transcription to summarize:
+
+"""
+
+# Map step of long transcripts: one section at a time
+SECTION_PROMPT = """Summarize this section of a longer conversation transcription divided by speaker roles.
+
+The text is in Russian. Keep every key point, decision, insight and action item with the speaker it came from, and keep the summary in the order of the conversation. It will be combined with summaries of the other sections, so do not add an introduction or conclusion.
+
+Here is the section to summarize:
+
+"""
+
+# Reduce step: combine section summaries into one
+REDUCE_PROMPT = """Below are summaries of consecutive sections of one conversation transcription, in order.
+
+The text is in Russian. Combine them into one summary highlighting the key points of the whole conversation: a clear overview of the discussion context, main themes and insights, decisions or conclusions made, and important details mentioned by the speakers. Merge points repeated across sections.
+
+The output should be a concise summary, avoiding excessive detail and colloquial language.
+
+Here are the section summaries:
+
+"""
+
+# Rough token count of Russian text without a tokenizer: errs on the side of more tokens
+CHARS_PER_TOKEN = 3
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def _pack(parts: List[str], max_tokens: int, separator: str) -> List[str]:
+    """Join consecutive parts into as few groups of at most max_tokens as possible."""
+    groups = []
+    current: List[str] = []
+    current_tokens = 0
+    for part in parts:
+        tokens = estimate_tokens(part)
+        if current and current_tokens + tokens > max_tokens:
+            groups.append(separator.join(current))
+            current, current_tokens = [], 0
+        current.append(part)
+        current_tokens += tokens
+    if current:
+        groups.append(separator.join(current))
+    return groups
+
+def split_sections(transcription: str, max_tokens: int) -> List[str]:
+    """Split transcription into sections of at most max_tokens.
+    
+    Sections end on speaker turns (lines of the merged transcription), only a turn
+    longer than max_tokens is itself split between words.
+    """
+    turns = []
+    for line in transcription.splitlines():
+        if not line.strip():
+            continue
+        if estimate_tokens(line) <= max_tokens:
+            turns.append(line)
+        else:
+            turns.extend(_pack(line.split(), max_tokens, ' '))
+    return _pack(turns, max_tokens, '\n')
+
+
 class NoSectionConfigParser(configparser.ConfigParser):
     """A ConfigParser that doesn't require section headers and auto-strips quotes."""
     
@@ -76,11 +169,27 @@ class TranscriptionSummarizer:
             print(f"Invalid temperature value: {temp_str}, using default 0.3")
             self.temperature = 0.3
             
+        # Any OpenAI-compatible endpoint, e.g. a local one
+        self.base_url = self._get_config_value("openai_base_url", "OPENAI_BASE_URL")
+        # Longer transcriptions are summarized by sections (map-reduce)
+        self.section_tokens = self._get_int_value("summary_section_tokens", "SUMMARY_SECTION_TOKENS", 12000)
+        # Sections summarized concurrently
+        self.max_parallel = self._get_int_value("summary_parallel", "SUMMARY_PARALLEL", 4)
+            
         if not self.api_key:
             raise ValueError("OpenAI API key is not set. Set it in config.ini or OPENAI_API_KEY environment variable.")
         
         Path(output_dir).mkdir(parents=True, exist_ok=True)
     
+    def _get_int_value(self, config_key: str, env_var: str, default: int) -> int:
+        """Get a positive integer configuration value, see _get_config_value."""
+        value = self._get_config_value(config_key, env_var, str(default))
+        try:
+            return max(1, int(value))
+        except ValueError:
+            print(f"Invalid {config_key} value: {value}, using default {default}")
+            return default
+    
     def _get_config_value(self, config_key: str, env_var: str, default: str = None) -> str:
         """Get a configuration value from config file or environment variable.
         
@@ -117,70 +226,104 @@ class TranscriptionSummarizer:
             
         return value
     
-    def summarize(self) -> str:
-        """Summarize the transcription using OpenAI GPT."""
+    def _complete(self, client: OpenAI, prompt: str) -> str:
+        """Run one chat completion and return its text."""
+        response = client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature
+        )
+        return response.choices[0].message.content
+    
+    def _complete_stream(self, client: OpenAI, prompt: str, output: TextIO) -> str:
+        """Run one chat completion, writing its text to output and console as it arrives."""
+        stream = client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature,
+            stream=True
+        )
+        parts = []
+        for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            text = chunk.choices[0].delta.content
+            parts.append(text)
+            # Flushed right away, so an interrupted summary keeps everything received
+            output.write(text)
+            output.flush()
+            print(text, end='', flush=True)
+        print()
+        return ''.join(parts)
+    
+    def _map_reduce(self, client: OpenAI, transcription_text: str) -> str:
+        """Summarize sections concurrently and return the prompt combining their summaries.
+        
+        Summaries that do not fit into one request together are combined in
+        groups first, until one request is enough.
+        """
+        sections = split_sections(transcription_text, self.section_tokens)
+        print(f"Summarizing {len(sections)} sections, {self.max_parallel} at a time...")
+        
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            summaries = list(executor.map(
+                lambda section: self._complete(client, SECTION_PROMPT + section), sections
+            ))
+            groups = _pack(summaries, self.section_tokens, '\n\n')
+            # Stop if summaries can not be packed any tighter, one long request is the best left
+            while 1 < len(groups) < len(summaries):
+                print(f"Combining {len(summaries)} section summaries in {len(groups)} groups...")
+                summaries = list(executor.map(
+                    lambda group: self._complete(client, REDUCE_PROMPT + group), groups
+                ))
+                groups = _pack(summaries, self.section_tokens, '\n\n')
+        return REDUCE_PROMPT + '\n\n'.join(summaries)
+    
+    def summarize(self, stream: bool = False) -> str:
+        """Summarize the transcription using OpenAI GPT.
+        
+        Transcriptions longer than section_tokens are summarized with map-reduce:
+        sections split by speaker turns are summarized max_parallel at a time,
+        then their summaries are combined.
+        
+        Args:
+            stream: Write the summary to its file and console as it is generated,
+                an interrupted summary keeps the part received so far
+        """
         # Read the transcription file
         with open(self.transcription_file, 'r', encoding='utf-8') as f:
             transcription_text = f.read()
             
         # Create OpenAI client
-        client = OpenAI(api_key=self.api_key)
-        
-        # The prompt for summarization
-        prompt = """Create a summary highlighting the key points from a conversation transcription divided by speaker roles.
-
-The text is in Russian. Focus on extracting the main ideas exchanged in the discussion, highlighting any significant decisions, insights, or action items.
-
-# Steps
-
-1. **Review the transcription:** Carefully read through the entire transcription to understand the context of the conversation.
-2. **Identify Key Points:** Look for recurring themes, important decisions, challenges discussed, strategies proposed, or any conclusions reached.
-3. **Summarize by Speaker:** Briefly summarize each speaker's contribution, focusing on their main points and how they relate to the overall conversation.
-4. **Synthesize Information:** Combine the speakers' contributions into a cohesive summary, ensuring it conveys the essential elements of the conversation without losing critical details.
-
-# Output Format
-
-The output should be a concise paragraph summarizing the key points of the conversation. It should include:
-- A clear overview of the discussion context.
-- Main themes and insights.
-- Any decisions or conclusions made.
-- Important details mentioned by the speakers.
-
-# Notes
-
-- Focus on clarity and conciseness, avoiding excessive detail.
-- Ensure the summary reflects the Russian context and nuances accurately.
-- Avoid using colloquial language or overly complex sentences for readability.
-
-Here is the transcription to summarize:
-
-"""
+        client = OpenAI(api_key=self.api_key, base_url=self.base_url or None)
+        summary_file = os.path.join(self.output_dir, f"summary_{self.timestamp}.txt")
         
-        # Complete the prompt with the transcription
-        full_prompt = prompt + transcription_text
+        # Call the OpenAI API
+        print(f"Using OpenAI model: {self.model}, temperature: {self.temperature}")
+        if estimate_tokens(transcription_text) <= self.section_tokens:
+            prompt = SUMMARY_PROMPT + transcription_text
+        else:
+            prompt = self._map_reduce(client, transcription_text)
         
-        try:
-            # Call the OpenAI API
-            print(f"Using OpenAI model: {self.model}, temperature: {self.temperature}")
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant specializing in summarizing conversations in Russian."},
-                    {"role": "user", "content": full_prompt}
-                ],
-                temperature=self.temperature
-            )
-            
-            summary = response.choices[0].message.content
+        if stream:
+            with open(summary_file, 'w', encoding='utf-8') as f:
+                try:
+                    self._complete_stream(client, prompt, f)
+                except BaseException:
+                    print(f"\nSummary interrupted, partial summary saved to: {summary_file}")
+                    raise
+        else:
+            summary = self._complete(client, prompt)
             
             # Save summary to file
-            summary_file = os.path.join(self.output_dir, f"summary_{self.timestamp}.txt")
             with open(summary_file, 'w', encoding='utf-8') as f:
                 f.write(summary)
-                
-            print(f"Summary saved to: {summary_file}")
-            return summary_file
             
-        except Exception as e:
-            print(f"Error during summarization: {str(e)}")
-            raise 
\ No newline at end of file
+        print(f"Summary saved to: {summary_file}")
+        return summary_file
@@ -0,0 +1,76 @@
+"""Microbenchmark for AudioFile.chunks() used by stream recognition.
+
+Compares the current memoryview-based chunking against the previous
+byte-by-byte itertools.islice implementation on a generated WAV file.
+
+Usage:
+    python benchmarks/bench_audio_chunks.py --minutes 10 --chunk-len 1000
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from clients.common_utils.audio import AudioFile  # noqa: E402
+
+
+def _legacy_chunks(audio: AudioFile, chunk_len_ms: int, sample_size: int = 2):
+    sample_rate_ms = audio.sample_rate // 1000
+    chunk_len = chunk_len_ms * sample_rate_ms * sample_size
+
+    it = iter(audio.blob)
+    while True:
+        chunk = bytes(itertools.islice(it, chunk_len))
+        if not chunk:
+            break
+        yield chunk
+
+
+def _write_wav(path: str, minutes: float, sample_rate: int) -> None:
+    frames = int(minutes * 60 * sample_rate)
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(os.urandom(frames * 2))
+
+
+def _measure(name: str, chunks) -> float:
+    start = time.perf_counter()
+    count = 0
+    size = 0
+    for chunk in chunks:
+        count += 1
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>12}: {elapsed * 1000:10.1f} ms  ({count} chunks, {size / 2**20:.1f} MiB)")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=10, help="generated audio length")
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--chunk-len", type=int, default=1000, help="chunk length in ms")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "bench.wav")
+        _write_wav(path, args.minutes, args.sample_rate)
+        audio = AudioFile(path)
+
+        legacy = _measure("islice", _legacy_chunks(audio, args.chunk_len))
+        current = _measure("memoryview", audio.chunks(args.chunk_len))
+
+    print(f"{'speedup':>12}: {legacy / current:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
+from .bench import bench_stream
 from .file_recognize import file_recognize
 from .get_models_info import get_models_info
 from .recognize import recognize
 
 __all__ = [
+    "bench_stream",
     "get_models_info",
     "file_recognize",
     "recognize",
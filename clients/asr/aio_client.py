@@ -0,0 +1,169 @@
+import asyncio
+import itertools
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from types import TracebackType
+from typing import Self
+
+import grpc
+
+from clients.common_utils.auth import SSOAuthMetadataPlugin, make_auth_plugin
+from clients.common_utils.config import SettingsProtocol
+from clients.common_utils.grpc import create_aio_channel, split_api_address, ssl_creds_from_settings
+from clients.genproto import stt_pb2, stt_pb2_grpc
+
+from .utils.cache import RecognitionCache
+from .utils.request import PacingStats, async_stream_request_iterator
+
+
+class AsyncSTTClient:
+    """asyncio counterpart of STTClient built on grpc.aio.
+
+    Any number of concurrent requests and streams are multiplexed over one
+    channel per API endpoint (several endpoints in api_address are used in
+    round-robin order), without a thread per stream.
+
+    Channels are bound to the event loop of the first request - client must be
+    used and closed in that loop.
+    """
+
+    def __init__(
+        self,
+        settings: SettingsProtocol,
+        timeout: float | None = None,
+        cache: RecognitionCache | None = None,
+    ) -> None:
+        self._settings = settings
+        self._timeout = timeout or settings.timeout
+        self._cache = cache
+
+        self._auth_plugin: SSOAuthMetadataPlugin | None = None
+        self._channels: list[grpc.aio.Channel] = []
+        self._stubs: itertools.cycle[stt_pb2_grpc.STTStub] | None = None
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        channels, self._channels = self._channels, []
+        self._stubs = None
+        for channel in channels:
+            await channel.close()
+
+    def _connect(self) -> stt_pb2_grpc.STTStub:
+        """Return stub on the next API endpoint channel."""
+        # NB: No lock needed - there is no await between check and assignment
+        if self._stubs is None:
+            settings = self._settings
+            self._auth_plugin = make_auth_plugin(
+                settings.sso_url,
+                settings.realm,
+                settings.client_id,
+                settings.client_secret,
+                settings.iam_account,
+                settings.iam_workspace,
+                settings.verify_sso,
+                settings.sso_token_cache_path,
+            )
+            ssl_creds = ssl_creds_from_settings(settings)
+            self._channels = [
+                create_aio_channel(address, ssl_creds)
+                for address in split_api_address(settings.api_address)
+            ]
+            self._stubs = itertools.cycle(
+                [stt_pb2_grpc.STTStub(channel) for channel in self._channels]
+            )
+
+        return next(self._stubs)
+
+    async def _call_metadata(self) -> tuple[tuple[str, str], ...]:
+        if self._auth_plugin is None:
+            return ()
+
+        # NB: Token refresh is a blocking HTTP request - keep it off the event loop
+        return await asyncio.to_thread(self._auth_plugin.metadata)
+
+    async def file_recognize_with_call(
+        self,
+        audio: bytes,
+        config: stt_pb2.RecognitionConfig,
+    ) -> tuple[stt_pb2.FileRecognizeResponse, grpc.aio.Call | None]:
+        """Recognize audio with FileRecognize.
+
+        Call is None if response was taken from cache.
+        """
+        cache = self._cache
+        cache_key = ""
+        if cache is not None:
+            # NB: Hashing and file reads are blocking - keep them off the event loop
+            cache_key = await asyncio.to_thread(cache.make_key, audio, config)
+            cached_response = await asyncio.to_thread(cache.get, cache_key)
+            if cached_response is not None:
+                return cached_response, None
+
+        stub = self._connect()
+        request = stt_pb2.FileRecognizeRequest(
+            config=config,
+            audio=audio,
+        )
+
+        call = stub.FileRecognize(
+            request,
+            metadata=await self._call_metadata(),
+            timeout=self._timeout,
+        )
+        response: stt_pb2.FileRecognizeResponse = await call
+
+        if cache is not None:
+            await asyncio.to_thread(cache.put, cache_key, response)
+
+        return response, call
+
+    async def file_recognize(
+        self,
+        audio: bytes,
+        config: stt_pb2.RecognitionConfig,
+    ) -> list[stt_pb2.RecognizeResponse]:
+        response, _ = await self.file_recognize_with_call(audio, config)
+        return list(response.response)
+
+    async def recognize(
+        self,
+        audio_chunks: Iterable[bytes] | AsyncIterable[bytes],
+        config: stt_pb2.StreamRecognitionConfig,
+        wait_ms: int = 0,
+        timeout: float | None = None,
+        speed: float = 1.0,
+        stats: PacingStats | None = None,
+    ) -> AsyncIterator[stt_pb2.RecognizeResponse]:
+        """Stream audio chunks to Recognize and yield responses as they arrive.
+
+        Stream is not limited by client timeout unless it is passed explicitly,
+        since its duration depends on the length of the audio. Chunks of wait_ms
+        are paced at speed times real time, with lag recorded in stats (see
+        stream_request_iterator).
+        """
+        stub = self._connect()
+        request_iterator = async_stream_request_iterator(
+            config, audio_chunks, wait_ms, speed, stats
+        )
+
+        call = stub.Recognize(
+            request_iterator,
+            metadata=await self._call_metadata(),
+            timeout=timeout,
+        )
+
+        try:
+            async for response in call:
+                yield response
+        finally:
+            # NB: Consumer may stop early - do not leave the stream open on the server
+            call.cancel()
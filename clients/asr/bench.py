@@ -0,0 +1,267 @@
+import contextlib
+import json
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import click
+import grpc
+from tabulate import tabulate
+
+from clients.common_utils.arguments import common_options_in_settings
+from clients.common_utils.audio import AudioFile
+from clients.common_utils.config import SettingsProtocol
+from clients.common_utils.errors import errors_handler
+from clients.common_utils.grpc import ChannelManager
+from clients.genproto import stt_pb2
+
+from .client import STTClient
+from .fake_server import serve_fake_stt
+from .utils.definitions import CHUNK_LEN_MS
+from .utils.request import PacingStats, RecognitionOptions, percentile
+
+# NB: --api-address value that runs the benchmark against an in-process fake server
+FAKE_API_ADDRESS = "fake"
+
+
+@dataclass
+class StreamResult:
+    """Latencies of one Recognize stream, in seconds."""
+
+    audio_s: float = 0.0
+    # From the first audio message to the first response (interim or final)
+    first_response_s: float | None = None
+    # From the moment the end of an utterance was sent to its final response
+    final_latencies_s: list[float] = field(default_factory=list)
+    # From the last audio message to the end of the response stream
+    end_of_stream_s: float | None = None
+    pacing: PacingStats = field(default_factory=PacingStats)
+    error: str | None = None
+
+
+@dataclass
+class BenchReport:
+    streams: list[StreamResult]
+    wall_s: float
+
+    @property
+    def failed(self) -> int:
+        return sum(result.error is not None for result in self.streams)
+
+    def metrics(self) -> dict[str, list[float]]:
+        ok = [result for result in self.streams if result.error is None]
+        return {
+            "time to first response": [
+                r.first_response_s for r in ok if r.first_response_s is not None
+            ],
+            "time to final": [latency for r in ok for latency in r.final_latencies_s],
+            "end of stream": [r.end_of_stream_s for r in ok if r.end_of_stream_s is not None],
+            "pacing lag": [lag_ms / 1000 for r in ok for lag_ms in r.pacing.lags_ms],
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "streams": len(self.streams),
+            "failed": self.failed,
+            "errors": sorted({r.error for r in self.streams if r.error is not None}),
+            "audio_s": sum(result.audio_s for result in self.streams),
+            "wall_s": self.wall_s,
+            "latency_ms": {
+                name: {
+                    "count": len(values),
+                    "p50": percentile(values, 50) * 1000,
+                    "p90": percentile(values, 90) * 1000,
+                    "p99": percentile(values, 99) * 1000,
+                    "max": max(values, default=0.0) * 1000,
+                }
+                for name, values in self.metrics().items()
+            },
+        }
+
+
+class _StreamTiming:
+    """Send times of the first and the last audio message of a stream."""
+
+    def __init__(self) -> None:
+        self.started: float | None = None
+        self.audio_sent: float | None = None
+
+    def wrap(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        for chunk in chunks:
+            if self.started is None:
+                self.started = time.monotonic()
+            yield chunk
+        # NB: Next chunk is requested only after the last one is taken by gRPC
+        self.audio_sent = time.monotonic()
+
+
+def run_stream(
+    client: STTClient,
+    chunks: list[bytes],
+    config: stt_pb2.StreamRecognitionConfig,
+    chunk_len_ms: int,
+    speed: float,
+    audio_s: float,
+) -> StreamResult:
+    """Replay audio chunks as one paced Recognize stream and measure its latencies."""
+    result = StreamResult(audio_s=audio_s)
+    timing = _StreamTiming()
+
+    try:
+        responses = client.recognize(
+            timing.wrap(chunks), config, chunk_len_ms, speed=speed, stats=result.pacing
+        )
+        for response in responses:
+            now = time.monotonic()
+            started = timing.started if timing.started is not None else now
+            if result.first_response_s is None:
+                result.first_response_s = now - started
+            if response.is_final:
+                # NB: Utterance end was sent when the stream reached its audio timestamp
+                end_sent = started + response.hypothesis.end_time_ms / 1000 / speed
+                result.final_latencies_s.append(max(0.0, now - end_sent))
+
+        if timing.audio_sent is not None:
+            result.end_of_stream_s = time.monotonic() - timing.audio_sent
+
+    except grpc.RpcError as err:
+        result.error = err.code().name
+
+    return result
+
+
+def run_bench(
+    settings: SettingsProtocol,
+    audio_files: list[str],
+    streams: int,
+    speed: float = 1.0,
+    chunk_len_ms: int = CHUNK_LEN_MS,
+    interim_results: bool = False,
+    model: str = "e2e-v3",
+) -> BenchReport:
+    """Run streams concurrent Recognize streams, replaying audio_files in turn."""
+    audios = []
+    for audio_file in audio_files:
+        with AudioFile(audio_file) as audio:
+            config = stt_pb2.StreamRecognitionConfig(
+                config=RecognitionOptions(model=model).recognition_config(
+                    audio.sample_rate, audio.channel_count
+                ),
+                interim_results=interim_results,
+            )
+            audios.append((list(audio.chunks(chunk_len_ms)), config, audio.duration_ms / 1000))
+
+    channels = ChannelManager(instrument=True)
+    started = time.monotonic()
+    # NB: Sync streams block a thread each until all audio is sent
+    with STTClient(settings, channels=channels) as client, ThreadPoolExecutor(streams) as pool:
+        futures = [
+            pool.submit(run_stream, client, chunks, config, chunk_len_ms, speed, audio_s)
+            for chunks, config, audio_s in (audios[i % len(audios)] for i in range(streams))
+        ]
+        results = [future.result() for future in futures]
+    wall_s = time.monotonic() - started
+    channels.close()
+
+    return BenchReport(results, wall_s)
+
+
+def print_bench_report(report: BenchReport) -> None:
+    data = report.to_dict()
+    click.echo(
+        f"Streams: {data['streams']} ({data['failed']} failed), "
+        f"audio: {data['audio_s']:.1f}s, wall time: {data['wall_s']:.1f}s"
+    )
+    for error in data["errors"]:
+        click.echo(f"Stream error: {error}")
+
+    table = [{"Latency, ms": name, **stats} for name, stats in data["latency_ms"].items()]
+    click.echo(tabulate(table, headers="keys", floatfmt=".1f"))
+
+
+@click.command(
+    help="Load test of stream recognition: replay audio as concurrent Recognize streams",
+)
+@errors_handler
+@common_options_in_settings
+@click.option(
+    "--audio-file",
+    "audio_files",
+    required=True,
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="WAV file to replay, may be repeated - streams use the files in turn (required)",
+    metavar="<.wav path>",
+)
+@click.option(
+    "--streams",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="number of concurrent streams",
+)
+@click.option(
+    "--speed",
+    type=click.FloatRange(min=0, min_open=True),
+    default=1.0,
+    show_default=True,
+    help="replay audio this many times faster than real time",
+)
+@click.option(
+    "--chunk-len",
+    "chunk_len_ms",
+    type=click.IntRange(100, 2000),
+    default=CHUNK_LEN_MS,
+    show_default=True,
+    help="audio chunk length in milliseconds",
+)
+@click.option(
+    "--model",
+    default="e2e-v3",
+    show_default=True,
+    help="ASR model name",
+)
+@click.option(
+    "--interim-results",
+    is_flag=True,
+    default=False,
+    help="request interim results (time to first response is then time to first partial)",
+)
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    default=False,
+    help="print report as JSON",
+)
+def bench_stream(
+    settings: SettingsProtocol,
+    audio_files: tuple[str, ...],
+    streams: int,
+    speed: float,
+    chunk_len_ms: int,
+    model: str,
+    interim_results: bool,
+    as_json: bool,
+) -> None:
+    with contextlib.ExitStack() as stack:
+        if settings.api_address == FAKE_API_ADDRESS:
+            settings.api_address = stack.enter_context(serve_fake_stt(max_workers=max(64, streams)))
+            settings.use_ssl = False
+
+        if not as_json:
+            click.echo(
+                f"Running {streams} streams at {speed:g}x real time against {settings.api_address}\n"
+            )
+        report = run_bench(
+            settings, list(audio_files), streams, speed, chunk_len_ms, interim_results, model
+        )
+
+    if as_json:
+        click.echo(json.dumps(report.to_dict(), indent=2))
+    else:
+        print_bench_report(report)
+
+    if report.failed:
+        raise SystemExit(1)
@@ -0,0 +1,210 @@
+import threading
+from collections.abc import Iterable, Iterator
+from types import TracebackType
+from typing import Self
+
+import grpc
+from google.protobuf.empty_pb2 import Empty
+
+from clients.common_utils.auth import SSOAuthMetadataPlugin, make_auth_plugin
+from clients.common_utils.config import SettingsProtocol
+from clients.common_utils.grpc import (
+    ChannelManager,
+    SSLCreds,
+    channel_manager,
+    ssl_creds_from_settings,
+)
+from clients.genproto import stt_pb2, stt_pb2_grpc
+
+from .utils.cache import RecognitionCache
+from .utils.request import PacingStats, stream_request_iterator
+
+
+class STTClient:
+    """Library-level client for STT API.
+
+    Channels are taken from a shared ChannelManager (process-wide by default), so
+    any number of requests - from this or other clients - reuse established
+    connections without per-request process and connection setup. With several
+    endpoints in api_address, requests are distributed between them. SSO token is
+    cached and refreshed shortly before it expires, so long-lived clients and
+    streams stay authorized without extra SSO round trips.
+
+    If cache is given, file recognition results are looked up there first and
+    cache hits do not touch the network at all.
+    """
+
+    def __init__(
+        self,
+        settings: SettingsProtocol,
+        timeout: float | None = None,
+        cache: RecognitionCache | None = None,
+        channels: ChannelManager | None = None,
+    ) -> None:
+        self._settings = settings
+        self._timeout = timeout or settings.timeout
+        self._cache = cache
+        self._channels = channels or channel_manager
+
+        self._connect_lock = threading.Lock()
+        self._connected = False
+        self._ssl_creds: SSLCreds | None = None
+        self._auth_plugin: SSOAuthMetadataPlugin | None = None
+        self._call_credentials: grpc.CallCredentials | None = None
+        self._stubs: dict[grpc.Channel, stt_pb2_grpc.STTStub] = {}
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # NB: Channels belong to channel manager and stay open for other clients
+        with self._connect_lock:
+            self._stubs.clear()
+
+    def _connect(self) -> stt_pb2_grpc.STTStub:
+        """Return stub on the next API endpoint channel."""
+        with self._connect_lock:
+            settings = self._settings
+            if not self._connected:
+                self._ssl_creds = ssl_creds_from_settings(settings)
+                self._auth_plugin = make_auth_plugin(
+                    settings.sso_url,
+                    settings.realm,
+                    settings.client_id,
+                    settings.client_secret,
+                    settings.iam_account,
+                    settings.iam_workspace,
+                    settings.verify_sso,
+                    settings.sso_token_cache_path,
+                )
+                # NB: Credentials are attached per call, so channel can be shared between clients
+                if self._auth_plugin is not None and self._ssl_creds is not None:
+                    self._call_credentials = grpc.metadata_call_credentials(self._auth_plugin)
+                self._connected = True
+
+            channel = self._channels.next_channel(settings.api_address, self._ssl_creds)
+            stub = self._stubs.get(channel)
+            if stub is None:
+                stub = self._stubs[channel] = stt_pb2_grpc.STTStub(channel)
+
+            return stub
+
+    def _call_metadata(self) -> tuple[tuple[str, str], ...]:
+        # NB: gRPC does not send call credentials over insecure channel - pass metadata directly.
+        # It is taken per call, not once per client, so tokens of long jobs are refreshed
+        if self._auth_plugin is None or self._call_credentials is not None:
+            return ()
+
+        return self._auth_plugin.metadata()
+
+    def file_recognize_with_call(
+        self,
+        audio: bytes,
+        config: stt_pb2.RecognitionConfig,
+    ) -> tuple[stt_pb2.FileRecognizeResponse, grpc.Call | None]:
+        """Recognize audio with FileRecognize.
+
+        Call is None if response was taken from cache.
+        """
+        cache_key = ""
+        if self._cache is not None:
+            cache_key = self._cache.make_key(audio, config)
+            cached_response = self._cache.get(cache_key)
+            if cached_response is not None:
+                return cached_response, None
+
+        stub = self._connect()
+        request = stt_pb2.FileRecognizeRequest(
+            config=config,
+            audio=audio,
+        )
+
+        response: stt_pb2.FileRecognizeResponse
+        call: grpc.Call
+        response, call = stub.FileRecognize.with_call(
+            request,
+            metadata=self._call_metadata(),
+            credentials=self._call_credentials,
+            timeout=self._timeout,
+        )
+
+        if self._cache is not None:
+            self._cache.put(cache_key, response)
+
+        return response, call
+
+    def file_recognize(
+        self,
+        audio: bytes,
+        config: stt_pb2.RecognitionConfig,
+    ) -> list[stt_pb2.RecognizeResponse]:
+        response, _ = self.file_recognize_with_call(audio, config)
+        return list(response.response)
+
+    def recognize(
+        self,
+        audio_chunks: Iterable[bytes],
+        config: stt_pb2.StreamRecognitionConfig,
+        wait_ms: int = 0,
+        timeout: float | None = None,
+        speed: float = 1.0,
+        stats: PacingStats | None = None,
+    ) -> Iterator[stt_pb2.RecognizeResponse]:
+        """Stream audio chunks to Recognize and yield responses as they arrive.
+
+        Stream is not limited by client timeout unless it is passed explicitly,
+        since its duration depends on the length of the audio. Chunks of wait_ms
+        are paced at speed times real time, with lag recorded in stats (see
+        stream_request_iterator).
+        """
+        yield from self.recognize_call(audio_chunks, config, wait_ms, timeout, speed, stats)
+
+    def recognize_call(
+        self,
+        audio_chunks: Iterable[bytes],
+        config: stt_pb2.StreamRecognitionConfig,
+        wait_ms: int = 0,
+        timeout: float | None = None,
+        speed: float = 1.0,
+        stats: PacingStats | None = None,
+    ) -> grpc.Call:
+        """Start Recognize stream, see recognize().
+
+        Returned call is the iterator of responses, which also gives access to
+        response metadata.
+        """
+        stub = self._connect()
+        request_iterator = stream_request_iterator(config, audio_chunks, wait_ms, speed, stats)
+
+        call: grpc.Call = stub.Recognize(
+            request_iterator,
+            metadata=self._call_metadata(),
+            credentials=self._call_credentials,
+            timeout=timeout,
+        )
+        return call
+
+    def get_models_info_with_call(self) -> tuple[stt_pb2.ModelsInfo, grpc.Call]:
+        stub = self._connect()
+
+        response: stt_pb2.ModelsInfo
+        call: grpc.Call
+        response, call = stub.GetModelsInfo.with_call(
+            Empty(),
+            metadata=self._call_metadata(),
+            credentials=self._call_credentials,
+            timeout=self._timeout,
+        )
+        return response, call
+
+
+def cache_from_settings(settings: SettingsProtocol) -> RecognitionCache:
+    return RecognitionCache(settings.cache_dir, settings.cache_max_size_mb)
@@ -0,0 +1,163 @@
+import contextlib
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+from google.protobuf.empty_pb2 import Empty
+
+from clients.common_utils.grpc import CHANNEL_OPTIONS
+from clients.genproto import stt_pb2, stt_pb2_grpc
+
+_SAMPLE_SIZE = 2  # NB: Fake server only understands 16-bit PCM
+
+
+class FakeSTTServicer(stt_pb2_grpc.STTServicer):
+    """In-process stand-in for STT API, for tests and load generation.
+
+    Audio is not recognized: every utterance_ms of it becomes one final hypothesis
+    "utterance <N>" with correct start/end times (and words, if word time offsets
+    are enabled). Stream interim results are sent after every audio message.
+    Responses are delayed by latency_s to imitate server processing time.
+
+    Metadata of every call is kept in call_metadata.
+    """
+
+    def __init__(self, utterance_ms: int = 1000, latency_s: float = 0.0) -> None:
+        self.utterance_ms = utterance_ms
+        self.latency_s = latency_s
+
+        self._lock = threading.Lock()
+        self.call_metadata: list[dict[str, str]] = []
+
+    def _record_call(self, context: grpc.ServicerContext) -> None:
+        with self._lock:
+            self.call_metadata.append(dict(context.invocation_metadata()))
+
+    def _response(
+        self,
+        config: stt_pb2.RecognitionConfig,
+        index: int,
+        start_time_ms: int,
+        end_time_ms: int,
+        is_final: bool = True,
+    ) -> stt_pb2.RecognizeResponse:
+        transcript = f"utterance {index}"
+        words = []
+        if config.enable_word_time_offsets:
+            words = [
+                stt_pb2.SpeechRecognitionHypothesis.WordInfo(
+                    start_time_ms=start_time_ms,
+                    end_time_ms=(start_time_ms + end_time_ms) // 2,
+                    word="utterance",
+                    confidence=1.0,
+                ),
+                stt_pb2.SpeechRecognitionHypothesis.WordInfo(
+                    start_time_ms=(start_time_ms + end_time_ms) // 2,
+                    end_time_ms=end_time_ms,
+                    word=str(index),
+                    confidence=1.0,
+                ),
+            ]
+
+        return stt_pb2.RecognizeResponse(
+            hypothesis=stt_pb2.SpeechRecognitionHypothesis(
+                transcript=transcript,
+                normalized_transcript=transcript,
+                confidence=1.0,
+                start_time_ms=start_time_ms,
+                end_time_ms=end_time_ms,
+                words=words,
+                normalized_words=words,
+            ),
+            is_final=is_final,
+        )
+
+    @staticmethod
+    def _duration_ms(config: stt_pb2.RecognitionConfig, audio_size: int) -> int:
+        bytes_per_second = (
+            config.sample_rate_hertz * max(1, config.audio_channel_count) * _SAMPLE_SIZE
+        )
+        if not bytes_per_second:
+            return 0
+
+        return audio_size * 1000 // bytes_per_second
+
+    def FileRecognize(
+        self,
+        request: stt_pb2.FileRecognizeRequest,
+        context: grpc.ServicerContext,
+    ) -> stt_pb2.FileRecognizeResponse:
+        self._record_call(context)
+        time.sleep(self.latency_s)
+
+        duration_ms = self._duration_ms(request.config, len(request.audio))
+        return stt_pb2.FileRecognizeResponse(
+            response=[
+                self._response(
+                    request.config,
+                    index,
+                    start_time_ms,
+                    min(start_time_ms + self.utterance_ms, duration_ms),
+                )
+                for index, start_time_ms in enumerate(range(0, duration_ms, self.utterance_ms), 1)
+            ]
+        )
+
+    def Recognize(
+        self,
+        request_iterator: Iterator[stt_pb2.RecognizeRequest],
+        context: grpc.ServicerContext,
+    ) -> Iterator[stt_pb2.RecognizeResponse]:
+        self._record_call(context)
+
+        first_request = next(request_iterator, None)
+        if first_request is None or not first_request.HasField("config"):
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "First message must contain config")
+            return
+
+        stream_config = first_request.config
+        config = stream_config.config
+        received_ms = 0
+        utterance_start_ms = 0
+        index = 1
+        for request in request_iterator:
+            received_ms += self._duration_ms(config, len(request.audio))
+            time.sleep(self.latency_s)
+
+            while received_ms - utterance_start_ms >= self.utterance_ms:
+                utterance_end_ms = utterance_start_ms + self.utterance_ms
+                yield self._response(config, index, utterance_start_ms, utterance_end_ms)
+                if stream_config.single_utterance:
+                    return
+                index += 1
+                utterance_start_ms = utterance_end_ms
+
+            if stream_config.interim_results and received_ms > utterance_start_ms:
+                yield self._response(config, index, utterance_start_ms, received_ms, is_final=False)
+
+        if received_ms > utterance_start_ms:
+            yield self._response(config, index, utterance_start_ms, received_ms)
+
+    def GetModelsInfo(self, request: Empty, context: grpc.ServicerContext) -> stt_pb2.ModelsInfo:
+        self._record_call(context)
+        return stt_pb2.ModelsInfo(
+            models=[stt_pb2.ModelInfo(name="e2e-v3", sample_rate_hertz=16000, language_code="ru")]
+        )
+
+
+@contextlib.contextmanager
+def serve_fake_stt(
+    servicer: FakeSTTServicer | None = None,
+    max_workers: int = 64,
+) -> Iterator[str]:
+    """Run fake STT server on a free local port and yield its address."""
+    server = grpc.server(ThreadPoolExecutor(max_workers=max_workers), options=CHANNEL_OPTIONS)
+    stt_pb2_grpc.add_STTServicer_to_server(servicer or FakeSTTServicer(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    try:
+        yield f"127.0.0.1:{port}"
+    finally:
+        server.stop(grace=None)
@@ -1,14 +1,12 @@
 import click
-import grpc
 
 from clients.common_utils.arguments import common_options_in_settings
 from clients.common_utils.audio import AudioFile
-from clients.common_utils.auth import get_auth_metadata
 from clients.common_utils.config import SettingsProtocol
 from clients.common_utils.errors import errors_handler
-from clients.common_utils.grpc import open_grpc_channel, print_metadata, ssl_creds_from_settings
-from clients.genproto import stt_pb2, stt_pb2_grpc
+from clients.common_utils.grpc import print_metadata
 
+from .client import cache_from_settings, STTClient
 from .utils.arguments import common_asr_options
 from .utils.definitions import (
     DEFAULT_VAD_F_MIN_SILENCE_MS,
@@ -17,14 +15,8 @@ from .utils.definitions import (
     DEFAULT_VAD_F_THRESHOLD,
 )
 from .utils.option_types import ASAttackType, VADAlgo, VADMode, VAResponseMode
-from .utils.request import (
-    make_antispoofing_config,
-    make_context_dictionary_config,
-    make_recognition_config,
-    make_speaker_labeling_config,
-    make_va_config,
-)
-from .utils.response import print_recognize_response
+from .utils.request import RecognitionOptions
+from .utils.response import ResponseRenderer
 
 
 @click.command(
@@ -44,6 +36,12 @@ from .utils.response import print_recognize_response
     default=False,
     help="recognize audio channels as separate speech tracks",
 )
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="always send audio to the server, ignoring cached recognition results",
+)
 def file_recognize(
     settings: SettingsProtocol,
     audio_file: str,
@@ -72,17 +70,8 @@ def file_recognize(
     wfst_dictionary_name: str,
     wfst_dictionary_weight: float,
     split_by_channel: bool,
+    no_cache: bool,
 ) -> None:
-    auth_metadata = get_auth_metadata(
-        settings.sso_url,
-        settings.realm,
-        settings.client_id,
-        settings.client_secret,
-        settings.iam_account,
-        settings.iam_workspace,
-        settings.verify_sso,
-    )
-
     audio = AudioFile(audio_file)
 
     click.echo(
@@ -99,70 +88,48 @@ def file_recognize(
         f"Split by channel: {split_by_channel}\n"
     )
 
-    va_config = make_va_config(
-        vad_algo,
-        vad_mode,
-        vad_threshold,
-        vad_min_silence_ms,
-        vad_speech_pad_ms,
-        vad_min_speech_ms,
-        dep_smoothed_window_threshold,
-        dep_smoothed_window_ms,
-    )
-    as_config = make_antispoofing_config(
-        enable_antispoofing,
-        antispoofing_attack_type,
-        antispoofing_far,
-        antispoofing_frr,
-        antispoofing_max_duration_for_analysis,
-    )
-    sl_config = make_speaker_labeling_config(
-        enable_speaker_labeling,
-        speakers_max,
-        speakers_num,
-    )
-    wfst_config = make_context_dictionary_config(
-        wfst_dictionary_name,
-        wfst_dictionary_weight,
-    )
-    recognition_config = make_recognition_config(
-        model,
-        va_config,
-        va_response_mode,
-        audio.sample_rate,
-        audio.channel_count,
-        enable_genderage,
-        enable_word_time_offsets,
-        enable_punctuator,
-        enable_denormalization,
-        as_config,
-        sl_config,
-        wfst_config,
-        split_by_channel,
-    )
-    request = stt_pb2.FileRecognizeRequest(
-        config=recognition_config,
-        audio=audio.blob,
+    options = RecognitionOptions(
+        model=model,
+        enable_word_time_offsets=enable_word_time_offsets,
+        enable_punctuator=enable_punctuator,
+        enable_denormalization=enable_denormalization,
+        enable_speaker_labeling=enable_speaker_labeling,
+        enable_genderage=enable_genderage,
+        enable_antispoofing=enable_antispoofing,
+        va_response_mode=va_response_mode,
+        vad_algo=vad_algo,
+        vad_mode=vad_mode,
+        vad_threshold=vad_threshold,
+        vad_min_silence_ms=vad_min_silence_ms,
+        vad_speech_pad_ms=vad_speech_pad_ms,
+        vad_min_speech_ms=vad_min_speech_ms,
+        dep_smoothed_window_threshold=dep_smoothed_window_threshold,
+        dep_smoothed_window_ms=dep_smoothed_window_ms,
+        antispoofing_attack_type=antispoofing_attack_type,
+        antispoofing_far=antispoofing_far,
+        antispoofing_frr=antispoofing_frr,
+        antispoofing_max_duration_for_analysis=antispoofing_max_duration_for_analysis,
+        speakers_max=speakers_max,
+        speakers_num=speakers_num,
+        wfst_dictionary_name=wfst_dictionary_name,
+        wfst_dictionary_weight=wfst_dictionary_weight,
+        split_by_channel=split_by_channel,
     )
+    recognition_config = options.recognition_config(audio.sample_rate, audio.channel_count)
 
-    click.echo(f"Connecting to gRPC server - {settings.api_address}\n")
+    cache = None if no_cache else cache_from_settings(settings)
 
-    with open_grpc_channel(
-        settings.api_address,
-        ssl_creds_from_settings(settings),
-    ) as channel:
-        stub = stt_pb2_grpc.STTStub(channel)
+    with STTClient(settings, cache=cache) as client:
+        click.echo(f"Connecting to gRPC server - {settings.api_address}\n")
 
-        response: stt_pb2.FileRecognizeResponse
-        call: grpc.Call
-        response, call = stub.FileRecognize.with_call(
-            request,
-            metadata=auth_metadata,
-            timeout=settings.timeout,
-        )
+        response, call = client.file_recognize_with_call(audio.blob, recognition_config)
 
-        click.echo("Response metadata:")
-        print_metadata(call.initial_metadata())
+        if call is None:
+            click.echo("Response loaded from cache\n")
+        else:
+            click.echo("Response metadata:")
+            print_metadata(call.initial_metadata())
 
-        for result in response.response:
-            print_recognize_response(result, True)
+        with ResponseRenderer() as renderer:
+            for result in response.response:
+                renderer.render(result, True)
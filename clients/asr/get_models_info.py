@@ -1,14 +1,12 @@
 import click
-import grpc
-from google.protobuf.empty_pb2 import Empty
 from tabulate import tabulate
 
 from clients.common_utils.arguments import common_options_in_settings
-from clients.common_utils.auth import get_auth_metadata
 from clients.common_utils.config import SettingsProtocol
 from clients.common_utils.errors import errors_handler
-from clients.common_utils.grpc import open_grpc_channel, print_metadata, ssl_creds_from_settings
-from clients.genproto import stt_pb2, stt_pb2_grpc
+from clients.common_utils.grpc import print_metadata
+
+from .client import STTClient
 
 
 @click.command(
@@ -17,31 +15,10 @@ from clients.genproto import stt_pb2, stt_pb2_grpc
 @errors_handler
 @common_options_in_settings
 def get_models_info(settings: SettingsProtocol) -> None:
-    auth_metadata = get_auth_metadata(
-        settings.sso_url,
-        settings.realm,
-        settings.client_id,
-        settings.client_secret,
-        settings.iam_account,
-        settings.iam_workspace,
-        settings.verify_sso,
-    )
-
     click.echo(f"Connecting to gRPC server - {settings.api_address}\n")
 
-    with open_grpc_channel(
-        settings.api_address,
-        ssl_creds_from_settings(settings),
-    ) as channel:
-        stub = stt_pb2_grpc.STTStub(channel)
-
-        response: stt_pb2.ModelsInfo
-        call: grpc.Call
-        response, call = stub.GetModelsInfo.with_call(
-            Empty(),
-            metadata=auth_metadata,
-            timeout=settings.timeout,
-        )
+    with STTClient(settings) as client:
+        response, call = client.get_models_info_with_call()
 
         click.echo("Response metadata:")
         print_metadata(call.initial_metadata())
@@ -1,16 +1,13 @@
-from collections.abc import Iterable
-
 import click
-import grpc
 
 from clients.common_utils.arguments import common_options_in_settings
 from clients.common_utils.audio import AudioFile
-from clients.common_utils.auth import get_auth_metadata
 from clients.common_utils.config import SettingsProtocol
 from clients.common_utils.errors import errors_handler
-from clients.common_utils.grpc import open_grpc_channel, print_metadata, ssl_creds_from_settings
-from clients.genproto import stt_pb2, stt_pb2_grpc
+from clients.common_utils.grpc import print_metadata
+from clients.genproto import stt_pb2
 
+from .client import STTClient
 from .utils.arguments import common_asr_options
 from .utils.definitions import (
     CHUNK_LEN_MS,
@@ -18,17 +15,23 @@ from .utils.definitions import (
     DEFAULT_VAD_S_MIN_SPEECH_MS,
     DEFAULT_VAD_S_SPEECH_PAD_MS,
     DEFAULT_VAD_S_THRESHOLD,
+    INTERIM_RATE,
 )
 from .utils.option_types import ASAttackType, VADAlgo, VADMode, VAResponseMode
 from .utils.request import (
+    PacingStats,
     make_antispoofing_config,
     make_context_dictionary_config,
     make_recognition_config,
     make_speaker_labeling_config,
     make_va_config,
-    stream_request_iterator,
 )
-from .utils.response import print_recognize_response
+from .utils.response import (
+    InterimCoalescer,
+    ResponseFormatter,
+    ResponseRenderer,
+    format_recognize_response,
+)
 
 
 @click.command(
@@ -54,6 +57,20 @@ from .utils.response import print_recognize_response
     default=False,
     help="show partly recognized results (when phrase recognition is not complete)",
 )
+@click.option(
+    "--coalesce-interim",
+    is_flag=True,
+    default=False,
+    help="with --interim-results print only words changed since the previous partial result, "
+    "skipping repeated ones (final results are printed in full)",
+)
+@click.option(
+    "--interim-rate",
+    type=click.FloatRange(min=0, min_open=True),
+    default=INTERIM_RATE,
+    show_default=True,
+    help="max number of partial result updates per second with --coalesce-interim",
+)
 @click.option(
     "--rt",
     "realtime",
@@ -61,6 +78,12 @@ from .utils.response import print_recognize_response
     default=False,
     help="enable emulation of real-time audio streaming",
 )
+@click.option(
+    "--speed",
+    type=click.FloatRange(min=0, min_open=True),
+    default=1.0,
+    help="replay audio this many times faster than real time with --rt (e.g. 4 for load tests)",
+)
 @click.option(
     "--chunk-len",
     "chunk_len_ms",
@@ -97,19 +120,12 @@ def recognize(
     wfst_dictionary_weight: float,
     single_utterance: bool,
     interim_results: bool,
+    coalesce_interim: bool,
+    interim_rate: float,
     realtime: bool,
+    speed: float,
     chunk_len_ms: int,
 ) -> None:
-    auth_metadata = get_auth_metadata(
-        settings.sso_url,
-        settings.realm,
-        settings.client_id,
-        settings.client_secret,
-        settings.iam_account,
-        settings.iam_workspace,
-        settings.verify_sso,
-    )
-
     audio = AudioFile(audio_file)
 
     click.echo(
@@ -172,29 +188,37 @@ def recognize(
         single_utterance=single_utterance,
         interim_results=interim_results,
     )
-    request_iterator = stream_request_iterator(
-        stream_recognition_config,
-        audio.chunks(chunk_len_ms),
-        chunk_len_ms if realtime else 0,
-    )
+    pacing_stats = PacingStats()
 
-    click.echo(f"Connecting to gRPC server - {settings.api_address}\n")
+    coalescer = InterimCoalescer(interim_rate) if coalesce_interim and interim_results else None
 
-    with open_grpc_channel(
-        settings.api_address,
-        ssl_creds_from_settings(settings),
-    ) as channel:
-        stub = stt_pb2_grpc.STTStub(channel)
+    click.echo(f"Connecting to gRPC server - {settings.api_address}\n")
 
-        response_iterator: Iterable[stt_pb2.StreamRecognitionConfig] | grpc.Call
-        response_iterator = stub.Recognize(
-            request_iterator,
-            metadata=auth_metadata,
-            timeout=settings.timeout,
+    # NB: Client attaches SSO token per call and refreshes it, so long streams stay authorized
+    with STTClient(settings) as client:
+        response_iterator = client.recognize_call(
+            audio.chunks(chunk_len_ms),
+            stream_recognition_config,
+            chunk_len_ms if realtime else 0,
+            settings.timeout,
+            speed,
+            pacing_stats,
         )
 
         click.echo("Response metadata:")
         print_metadata(response_iterator.initial_metadata())
 
-        for response in response_iterator:
-            print_recognize_response(response)
+        formatter: ResponseFormatter = format_recognize_response
+        if coalescer is not None:
+            formatter = coalescer
+
+        # NB: Printing words and VA marks of every response must not slow down the stream
+        with ResponseRenderer(formatter=formatter, background=True) as renderer:
+            for response in response_iterator:
+                renderer.render(response)
+
+    if coalescer is not None:
+        click.echo(coalescer.summary())
+
+    if realtime:
+        click.echo(pacing_stats.summary())
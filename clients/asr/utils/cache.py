@@ -0,0 +1,100 @@
+import contextlib
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from google.protobuf.message import DecodeError
+
+from clients.common_utils.definitions import DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_SIZE_MB
+from clients.genproto import stt_pb2
+
+_ENTRY_SUFFIX = ".pb"
+
+logger = logging.getLogger(__name__)
+
+
+class RecognitionCache:
+    """On-disk cache of file recognition results.
+
+    Entries are keyed by PCM content and serialized recognition config, so the
+    same audio recognized with the same parameters is never sent twice.
+    Total size is bounded: least recently used entries (by mtime, which is
+    refreshed on every hit) are evicted first.
+
+    Cache is best effort: unreadable entries are misses and failed writes (read-only
+    or full disk) are only logged, so recognition never fails because of it.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path = DEFAULT_CACHE_DIR,
+        max_size_mb: int = DEFAULT_CACHE_MAX_SIZE_MB,
+    ) -> None:
+        self._dir = Path(cache_dir).expanduser()
+        self._max_size = max_size_mb * 1024 * 1024
+
+    @staticmethod
+    def make_key(audio: bytes, config: stt_pb2.RecognitionConfig) -> str:
+        key = hashlib.sha256(hashlib.sha256(audio).digest())
+        key.update(config.SerializeToString(deterministic=True))
+        return key.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self._dir / key[:2] / f"{key}{_ENTRY_SUFFIX}"
+
+    def get(self, key: str) -> stt_pb2.FileRecognizeResponse | None:
+        path = self._entry_path(key)
+        try:
+            data = path.read_bytes()
+            response = stt_pb2.FileRecognizeResponse.FromString(data)
+            os.utime(path)  # NB: mtime is LRU position
+        except FileNotFoundError:
+            return None
+        except (DecodeError, OSError):
+            # NB: Truncated or corrupt entry (e.g. disk full) - recognize again and overwrite it
+            with contextlib.suppress(OSError):
+                path.unlink(missing_ok=True)
+            return None
+
+        return response
+
+    def put(self, key: str, response: stt_pb2.FileRecognizeResponse) -> None:
+        try:
+            self._write(self._entry_path(key), response)
+            self._evict()
+        except OSError as err:
+            logger.warning("Failed to write recognition cache in %s: %s", self._dir, err)
+
+    @staticmethod
+    def _write(path: Path, response: stt_pb2.FileRecognizeResponse) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # NB: Write to temp file and rename, so concurrent readers never see partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(response.SerializeToString())
+            os.replace(tmp_path, path)
+        except OSError:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def _evict(self) -> None:
+        entries = []
+        total_size = 0
+        for path in self._dir.glob(f"*/*{_ENTRY_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self._max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
@@ -24,3 +24,10 @@ AUDIO_ENCODING: Final = stt_pb2.AudioEncoding.LINEAR_PCM
 LANGUAGE_CODE: Final = "ru"
 MAX_ALTERNATIVES: Final = 1
 CHUNK_LEN_MS: Final = 1000
+
+# --- Console Output ---
+# NB: Responses are printed in blocks of this many characters or at least this often
+OUTPUT_BUFFER_SIZE: Final = 64 * 1024
+OUTPUT_FLUSH_INTERVAL_S: Final = 0.1
+# NB: Max updates per second of coalesced interim results (recognize --coalesce-interim)
+INTERIM_RATE: Final = 4.0
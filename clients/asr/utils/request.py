@@ -1,10 +1,21 @@
+import asyncio
+import math
 import time
-from collections.abc import Iterable, Iterator
-from itertools import islice
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from dataclasses import dataclass, field
 
 from clients.genproto import stt_pb2
 
-from .definitions import AUDIO_ENCODING, LANGUAGE_CODE
+from .definitions import (
+    AUDIO_ENCODING,
+    DEFAULT_DEP_SMOOTHED_WINDOW_MS,
+    DEFAULT_DEP_SMOOTHED_WINDOW_THRESHOLD,
+    DEFAULT_VAD_F_MIN_SILENCE_MS,
+    DEFAULT_VAD_F_MIN_SPEECH_MS,
+    DEFAULT_VAD_F_SPEECH_PAD_MS,
+    DEFAULT_VAD_F_THRESHOLD,
+    LANGUAGE_CODE,
+)
 from .option_types import ASAttackType, VADAlgo, VADMode, VAResponseMode
 
 StreamRequestIterator = Iterator[stt_pb2.RecognizeRequest]
@@ -131,16 +142,207 @@ def make_recognition_config(
     return result
 
 
+@dataclass(frozen=True)
+class RecognitionOptions:
+    """Recognition parameters for library (non-CLI) usage.
+
+    Defaults match the defaults of "recognize file" command.
+    """
+
+    model: str = "e2e-v1"
+    enable_word_time_offsets: bool = False
+    enable_punctuator: bool = False
+    enable_denormalization: bool = False
+    enable_speaker_labeling: bool = False
+    enable_genderage: bool = False
+    enable_antispoofing: bool = False
+    va_response_mode: VAResponseMode = VAResponseMode.disable
+    vad_algo: VADAlgo = VADAlgo.vad
+    vad_mode: VADMode = VADMode.default
+    vad_threshold: float = DEFAULT_VAD_F_THRESHOLD
+    vad_min_silence_ms: int = DEFAULT_VAD_F_MIN_SILENCE_MS
+    vad_speech_pad_ms: int = DEFAULT_VAD_F_SPEECH_PAD_MS
+    vad_min_speech_ms: int = DEFAULT_VAD_F_MIN_SPEECH_MS
+    dep_smoothed_window_threshold: float = DEFAULT_DEP_SMOOTHED_WINDOW_THRESHOLD
+    dep_smoothed_window_ms: int = DEFAULT_DEP_SMOOTHED_WINDOW_MS
+    antispoofing_attack_type: ASAttackType | None = ASAttackType.logical
+    antispoofing_far: float | None = None
+    antispoofing_frr: float | None = None
+    antispoofing_max_duration_for_analysis: int | None = None
+    speakers_max: int | None = None
+    speakers_num: int | None = None
+    wfst_dictionary_name: str = ""
+    wfst_dictionary_weight: float = 0
+    split_by_channel: bool = False
+
+    def recognition_config(
+        self,
+        sample_rate: int,
+        channel_count: int,
+    ) -> stt_pb2.RecognitionConfig:
+        va_config = make_va_config(
+            self.vad_algo,
+            self.vad_mode,
+            self.vad_threshold,
+            self.vad_min_silence_ms,
+            self.vad_speech_pad_ms,
+            self.vad_min_speech_ms,
+            self.dep_smoothed_window_threshold,
+            self.dep_smoothed_window_ms,
+        )
+        as_config = make_antispoofing_config(
+            self.enable_antispoofing,
+            self.antispoofing_attack_type,
+            self.antispoofing_far,
+            self.antispoofing_frr,
+            self.antispoofing_max_duration_for_analysis,
+        )
+        sl_config = make_speaker_labeling_config(
+            self.enable_speaker_labeling,
+            self.speakers_max,
+            self.speakers_num,
+        )
+        wfst_config = make_context_dictionary_config(
+            self.wfst_dictionary_name,
+            self.wfst_dictionary_weight,
+        )
+
+        return make_recognition_config(
+            self.model,
+            va_config,
+            self.va_response_mode,
+            sample_rate,
+            channel_count,
+            self.enable_genderage,
+            self.enable_word_time_offsets,
+            self.enable_punctuator,
+            self.enable_denormalization,
+            as_config,
+            sl_config,
+            wfst_config,
+            self.split_by_channel,
+        )
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Value not exceeded by q percent of values (nearest rank)."""
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * q / 100) - 1)]
+
+
+@dataclass
+class PacingStats:
+    """Lag of stream audio messages behind their real-time schedule."""
+
+    lags_ms: list[float] = field(default_factory=list)
+
+    @property
+    def max_lag_ms(self) -> float:
+        return max(self.lags_ms, default=0.0)
+
+    @property
+    def mean_lag_ms(self) -> float:
+        return sum(self.lags_ms) / len(self.lags_ms) if self.lags_ms else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Lag not exceeded by q percent of messages."""
+        return percentile(self.lags_ms, q)
+
+    def summary(self) -> str:
+        return (
+            f"Pacing lag over {len(self.lags_ms)} chunks: mean {self.mean_lag_ms:.1f} ms, "
+            f"p95 {self.percentile(95):.1f} ms, max {self.max_lag_ms:.1f} ms"
+        )
+
+
+class StreamPacer:
+    """Schedule of stream audio messages at their absolute audio timestamps.
+
+    Chunk N is due N * chunk_ms / speed after the first one on the monotonic
+    clock. Time spent reading, serializing and sending chunks does not add up
+    to drift: a late chunk is followed by shorter waits until the stream is
+    back on schedule. Lag of every chunk is recorded in stats.
+    """
+
+    def __init__(
+        self,
+        chunk_ms: int,
+        speed: float = 1.0,
+        stats: PacingStats | None = None,
+    ) -> None:
+        if speed <= 0:
+            raise ValueError(f"Speed factor must be positive, got {speed}")
+
+        self._interval_s = chunk_ms / 1000 / speed
+        self._start: float | None = None
+        self.stats = stats if stats is not None else PacingStats()
+
+    def _due(self, index: int) -> float:
+        if self._start is None:
+            self._start = time.monotonic()
+        return self._start + index * self._interval_s
+
+    def delay_s(self, index: int) -> float:
+        """Time left until chunk index is due."""
+        return max(0.0, self._due(index) - time.monotonic())
+
+    def record(self, index: int) -> None:
+        """Record lag of chunk index sent now."""
+        lag_s = time.monotonic() - self._due(index)
+        self.stats.lags_ms.append(max(0.0, lag_s * 1000))
+
+
 def stream_request_iterator(
     recognition_config: stt_pb2.StreamRecognitionConfig,
     audio_chunks: Iterable[bytes],
     wait_ms: int,
+    speed: float = 1.0,
+    stats: PacingStats | None = None,
 ) -> StreamRequestIterator:
+    """Yield config and then audio chunks of wait_ms each, paced by StreamPacer.
+
+    wait_ms of 0 sends chunks as fast as they are consumed. speed > 1 replays
+    audio faster than real time (e.g. 4 for load tests).
+    """
     yield stt_pb2.RecognizeRequest(config=recognition_config)
 
-    for chunk in islice(audio_chunks, 1):
+    pacer = StreamPacer(wait_ms, speed, stats) if wait_ms else None
+    # NB: enumerate over one iterator - a list would otherwise be replayed from the start
+    for index, chunk in enumerate(audio_chunks):
+        if pacer is not None:
+            time.sleep(pacer.delay_s(index))
+            pacer.record(index)
         yield stt_pb2.RecognizeRequest(audio=chunk)
 
-    for chunk in audio_chunks:
-        time.sleep(wait_ms / 1000)
+
+async def async_stream_request_iterator(
+    recognition_config: stt_pb2.StreamRecognitionConfig,
+    audio_chunks: Iterable[bytes] | AsyncIterable[bytes],
+    wait_ms: int,
+    speed: float = 1.0,
+    stats: PacingStats | None = None,
+) -> AsyncIterator[stt_pb2.RecognizeRequest]:
+    """Same as stream_request_iterator, for grpc.aio stubs."""
+    yield stt_pb2.RecognizeRequest(config=recognition_config)
+
+    if isinstance(audio_chunks, AsyncIterable):
+        chunk_iterator = aiter(audio_chunks)
+    else:
+        chunk_iterator = _async_iter(audio_chunks)
+
+    pacer = StreamPacer(wait_ms, speed, stats) if wait_ms else None
+    index = 0
+    async for chunk in chunk_iterator:
+        if pacer is not None:
+            await asyncio.sleep(pacer.delay_s(index))
+            pacer.record(index)
         yield stt_pb2.RecognizeRequest(audio=chunk)
+        index += 1
+
+
+async def _async_iter(items: Iterable[bytes]) -> AsyncIterator[bytes]:
+    for item in items:
+        yield item
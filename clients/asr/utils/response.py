@@ -1,103 +1,543 @@
-from collections.abc import Iterable
+import json
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from types import TracebackType
+from typing import IO, Any, Self
 
 import click
 from google.protobuf.duration_pb2 import Duration
 
 from clients.genproto import stt_pb2
 
+from .definitions import INTERIM_RATE, OUTPUT_BUFFER_SIZE, OUTPUT_FLUSH_INTERVAL_S
+
 
 def _duration_to_str(d: Duration) -> str:
     secs = d.ToMilliseconds() / 1000
     return f"{secs:05.2f}"
 
 
-def print_va_marks(va_marks: Iterable[stt_pb2.VoiceActivityMark]) -> None:
-    click.echo("\tVoice Activity Marks:")
+def _va_marks_lines(va_marks: Iterable[stt_pb2.VoiceActivityMark]) -> list[str]:
+    lines = ["\tVoice Activity Marks:"]
     for mark_idx, mark in enumerate(va_marks, 1):
         mark_type_str = stt_pb2.VoiceActivityMark.VoiceActivityMarkType.Name(mark.mark_type)
-        click.echo(
-            f"\t\tmark #{mark_idx}: " f"mark_type: {mark_type_str}, " f"offset_ms: {mark.offset_ms}"
+        lines.append(
+            f"\t\tmark #{mark_idx}: mark_type: {mark_type_str}, offset_ms: {mark.offset_ms}"
         )
+    return lines
+
+
+def print_va_marks(
+    va_marks: Iterable[stt_pb2.VoiceActivityMark],
+    file: IO[str] | None = None,
+) -> None:
+    click.echo("\n".join(_va_marks_lines(va_marks)), file=file)
 
 
-def print_genderage_result(genderage: stt_pb2.SpeakerGenderAgePrediction) -> None:
-    click.echo("\tGenderage result:")
+def _genderage_lines(genderage: stt_pb2.SpeakerGenderAgePrediction) -> list[str]:
     gender_name = stt_pb2.SpeakerGenderAgePrediction.GenderClass.Name(genderage.gender)
-    click.echo(f"\t\tgender: {gender_name}")
     age_name = stt_pb2.SpeakerGenderAgePrediction.AgeClass.Name(genderage.age)
-    click.echo(f"\t\tage: {age_name}")
     emotions = genderage.emotion
-    click.echo(
+    return [
+        "\tGenderage result:",
+        f"\t\tgender: {gender_name}",
+        f"\t\tage: {age_name}",
         f"\t\temotion:\n"
         f"\t\t\tpositive={emotions.positive:.3f}\n"
         f"\t\t\tneutral={emotions.neutral:.3f}\n"
         f"\t\t\tnegative_angry={emotions.negative_angry:.3f}\n"
-        f"\t\t\tnegative_sad={emotions.negative_sad:.3f}"
-    )
+        f"\t\t\tnegative_sad={emotions.negative_sad:.3f}",
+    ]
 
 
-def print_hypothesis(
-    hypothesis: stt_pb2.SpeechRecognitionHypothesis,
-    is_final: bool = True,
-    speaker_id: int = None
+def print_genderage_result(
+    genderage: stt_pb2.SpeakerGenderAgePrediction,
+    file: IO[str] | None = None,
 ) -> None:
-    transcript = None
-    if hypothesis.normalized_transcript:
-        transcript = hypothesis.normalized_transcript
-    elif hypothesis.transcript:
-        transcript = hypothesis.transcript
+    click.echo("\n".join(_genderage_lines(genderage)), file=file)
+
+
+def format_utterance(
+    transcript: str,
+    start_time_ms: int,
+    end_time_ms: int,
+    speaker_id: int | None = None,
+) -> str:
+    start_end_time = ""
+    if start_time_ms or end_time_ms:
+        start_end_time = f"({start_time_ms / 1000:05.2f}s-{end_time_ms / 1000:05.2f}s)"
+
+    return f'Speaker {speaker_id}. {start_end_time}: "{transcript}"'
+
+
+def _hypothesis_lines(
+    hypothesis: stt_pb2.SpeechRecognitionHypothesis,
+    speaker_id: int | None = None,
+) -> list[str]:
+    lines = []
+    transcript = hypothesis.normalized_transcript or hypothesis.transcript
 
     if transcript:
-        start_end_time = ""
-        if hypothesis.start_time_ms or hypothesis.end_time_ms:
-            start_end_time = (
-                f"({hypothesis.start_time_ms / 1000:05.2f}s-"
-                f"{hypothesis.end_time_ms / 1000:05.2f}s)"
+        lines.append(
+            format_utterance(
+                transcript,
+                hypothesis.start_time_ms,
+                hypothesis.end_time_ms,
+                speaker_id,
             )
-
-        msg = f'Speaker {speaker_id}. {start_end_time}: "{transcript}"'
-        click.echo(msg)
+        )
 
     words = hypothesis.normalized_words or hypothesis.words
 
     for word in words:
-        click.echo(
+        lines.append(
             f"\t\t{word.start_time_ms / 1000:05.2f}s - "
             f'{word.end_time_ms / 1000:05.2f}s: "{word.word}" '
             f"confidence: {word.confidence:.4g}"
         )
 
+    return lines
+
+
+def print_hypothesis(
+    hypothesis: stt_pb2.SpeechRecognitionHypothesis,
+    is_final: bool = True,
+    speaker_id: int = None,
+    file: IO[str] | None = None,
+) -> None:
+    lines = _hypothesis_lines(hypothesis, speaker_id)
+    if lines:
+        click.echo("\n".join(lines), file=file)
+
 
-def print_spoofing_results(results: Iterable[stt_pb2.SpoofingResult]) -> None:
-    click.echo("\tSpoofing results:")
+def _spoofing_lines(results: Iterable[stt_pb2.SpoofingResult]) -> list[str]:
+    lines = ["\tSpoofing results:"]
     for result in results:
         result_type = stt_pb2.AttackType.Name(result.type)
         result_result = stt_pb2.SpoofingResult.AttackResult.Name(result.result)
-        click.echo(
+        lines.append(
             f"\t\tResult: {result_result}\n"
             f"\t\tType: {result_type}\n"
             f"\t\tConfidence: {result.confidence:.4g}\n"
             f"\t\tInterval: {result.start_time_ms / 1000}s - {result.end_time_ms / 1000}s"
         )
+    return lines
 
 
-def print_recognize_response(
+def print_spoofing_results(
+    results: Iterable[stt_pb2.SpoofingResult],
+    file: IO[str] | None = None,
+) -> None:
+    click.echo("\n".join(_spoofing_lines(results)), file=file)
+
+
+def format_recognize_response(
     result: stt_pb2.RecognizeResponse,
     consider_final: bool = False,
-) -> None:
+) -> str:
+    """Text of print_recognize_response, every line ends with a newline ("" if nothing to show)."""
+    lines = []
     speaker_id = None
     if result.HasField("speaker_info") and result.speaker_info.speaker_id:
         speaker_id = result.speaker_info.speaker_id
 
     if result.HasField("hypothesis"):
-        is_final = consider_final or result.is_final
-        print_hypothesis(result.hypothesis, is_final, speaker_id)
+        lines.extend(_hypothesis_lines(result.hypothesis, speaker_id))
 
     if result.va_marks:
-        print_va_marks(result.va_marks)
+        lines.extend(_va_marks_lines(result.va_marks))
 
     if result.HasField("genderage"):
-        print_genderage_result(result.genderage)
+        lines.extend(_genderage_lines(result.genderage))
 
     if result.spoofing_result:
-        print_spoofing_results(result.spoofing_result)
+        lines.extend(_spoofing_lines(result.spoofing_result))
+
+    if not lines:
+        return ""
+
+    lines.append("")
+    return "\n".join(lines)
+
+
+def print_recognize_response(
+    result: stt_pb2.RecognizeResponse,
+    consider_final: bool = False,
+    file: IO[str] | None = None,
+) -> None:
+    text = format_recognize_response(result, consider_final)
+    if text:
+        click.echo(text, file=file, nl=False)
+
+
+def _word_records(
+    words: Iterable[stt_pb2.SpeechRecognitionHypothesis.WordInfo],
+) -> list[dict[str, Any]]:
+    return [
+        {
+            "word": word.word,
+            "start_time_ms": word.start_time_ms,
+            "end_time_ms": word.end_time_ms,
+            "confidence": word.confidence,
+        }
+        for word in words
+    ]
+
+
+def recognize_response_record(
+    result: stt_pb2.RecognizeResponse,
+    consider_final: bool = False,
+) -> dict[str, Any]:
+    """Machine-readable form of RecognizeResponse (see print_recognize_response_jsonl).
+
+    Optional parts (hypothesis, VA marks, genderage, spoofing results) are only
+    present in the record if they are present in the response.
+    """
+    record: dict[str, Any] = {
+        "is_final": consider_final or result.is_final,
+        "channel": result.channel,
+        "speaker_id": None,
+    }
+    if result.HasField("speaker_info") and result.speaker_info.speaker_id:
+        record["speaker_id"] = result.speaker_info.speaker_id
+
+    if result.HasField("hypothesis"):
+        hypothesis = result.hypothesis
+        record.update(
+            transcript=hypothesis.transcript,
+            normalized_transcript=hypothesis.normalized_transcript,
+            confidence=hypothesis.confidence,
+            start_time_ms=hypothesis.start_time_ms,
+            end_time_ms=hypothesis.end_time_ms,
+            words=_word_records(hypothesis.words),
+            normalized_words=_word_records(hypothesis.normalized_words),
+        )
+
+    if result.va_marks:
+        record["va_marks"] = [
+            {
+                "mark_type": stt_pb2.VoiceActivityMark.VoiceActivityMarkType.Name(mark.mark_type),
+                "offset_ms": mark.offset_ms,
+            }
+            for mark in result.va_marks
+        ]
+
+    if result.HasField("genderage"):
+        genderage = result.genderage
+        emotions = genderage.emotion
+        record["genderage"] = {
+            "gender": stt_pb2.SpeakerGenderAgePrediction.GenderClass.Name(genderage.gender),
+            "age": stt_pb2.SpeakerGenderAgePrediction.AgeClass.Name(genderage.age),
+            "emotion": {
+                "positive": emotions.positive,
+                "neutral": emotions.neutral,
+                "negative_angry": emotions.negative_angry,
+                "negative_sad": emotions.negative_sad,
+            },
+        }
+
+    if result.spoofing_result:
+        record["spoofing_results"] = [
+            {
+                "type": stt_pb2.AttackType.Name(spoofing.type),
+                "result": stt_pb2.SpoofingResult.AttackResult.Name(spoofing.result),
+                "confidence": spoofing.confidence,
+                "start_time_ms": spoofing.start_time_ms,
+                "end_time_ms": spoofing.end_time_ms,
+            }
+            for spoofing in result.spoofing_result
+        ]
+
+    return record
+
+
+def format_recognize_response_jsonl(
+    result: stt_pb2.RecognizeResponse,
+    consider_final: bool = False,
+) -> str:
+    return json.dumps(recognize_response_record(result, consider_final), ensure_ascii=False) + "\n"
+
+
+def print_recognize_response_jsonl(
+    result: stt_pb2.RecognizeResponse,
+    consider_final: bool = False,
+    file: IO[str] | None = None,
+) -> None:
+    """Print response as one JSON line - structured counterpart of print_recognize_response."""
+    click.echo(format_recognize_response_jsonl(result, consider_final), file=file, nl=False)
+
+
+ResponseFormatter = Callable[[stt_pb2.RecognizeResponse, bool], str]
+
+
+def format_interim_diff(
+    keep: int,
+    tail: str,
+    start_time_ms: int,
+    end_time_ms: int,
+) -> str:
+    """Change of partial hypothesis: keep first words of the previous one, then add tail."""
+    return (
+        f"Interim ({start_time_ms / 1000:05.2f}s-{end_time_ms / 1000:05.2f}s), "
+        f'keep {keep}: "{tail}"'
+    )
+
+
+class InterimCoalescer:
+    """Response formatter that prints changes of interim results instead of every one.
+
+    Partial hypothesis of a channel is compared word by word with the last one
+    printed: only the number of words kept and the new tail are printed (see
+    format_interim_diff), repeated partials are dropped, and at most rate updates
+    per second are printed. A partial that comes too early is held back: it is
+    replaced by the next result of its channel, or printed by flush_pending() once
+    the interval has passed. Final results and responses without hypothesis are
+    printed in full right away by formatter.
+
+    Can be used as formatter of ResponseRenderer, which flushes held back partials.
+    """
+
+    def __init__(
+        self,
+        rate: float = INTERIM_RATE,
+        formatter: ResponseFormatter = format_recognize_response,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError(f"Interim update rate must be positive, got {rate}")
+
+        self._interval_s = 1 / rate
+        self._formatter = formatter
+        self._printed: dict[int, list[str]] = {}
+        self._printed_at: dict[int, float] = {}
+        self._pending: dict[int, stt_pb2.RecognizeResponse] = {}
+        self.received = 0
+        self.printed = 0
+
+    def __call__(self, result: stt_pb2.RecognizeResponse, consider_final: bool = False) -> str:
+        if result.HasField("hypothesis"):
+            # NB: Held back partial is outdated by any newer result of its channel
+            self._pending.pop(result.channel, None)
+        text = self.flush_pending()
+
+        if consider_final or result.is_final or not result.HasField("hypothesis"):
+            if result.HasField("hypothesis"):
+                # NB: Next partial belongs to the next utterance
+                self._printed.pop(result.channel, None)
+                self._printed_at.pop(result.channel, None)
+            return text + self._formatter(result, consider_final)
+
+        self.received += 1
+        hypothesis = result.hypothesis
+        words = (hypothesis.normalized_transcript or hypothesis.transcript).split()
+        if words == self._printed.get(result.channel, []):
+            return text
+
+        now = time.monotonic()
+        printed_at = self._printed_at.get(result.channel)
+        if printed_at is not None and now - printed_at < self._interval_s:
+            self._pending[result.channel] = result
+            return text
+
+        return text + self._print(result.channel, hypothesis, words, now)
+
+    def pending_due(self) -> float | None:
+        """Seconds until the next held back partial is due (None if there are none)."""
+        if not self._pending:
+            return None
+        return (
+            min(self._printed_at[channel] for channel in self._pending)
+            + self._interval_s
+            - time.monotonic()
+        )
+
+    def flush_pending(self, force: bool = False) -> str:
+        """Format held back partials which are due (all of them with force)."""
+        now = time.monotonic()
+        text = ""
+        for channel, result in list(self._pending.items()):
+            if force or now - self._printed_at[channel] >= self._interval_s:
+                del self._pending[channel]
+                hypothesis = result.hypothesis
+                words = (hypothesis.normalized_transcript or hypothesis.transcript).split()
+                text += self._print(channel, hypothesis, words, now)
+        return text
+
+    def _print(
+        self,
+        channel: int,
+        hypothesis: stt_pb2.SpeechRecognitionHypothesis,
+        words: list[str],
+        now: float,
+    ) -> str:
+        keep = 0
+        for old, new in zip(self._printed.get(channel, []), words):
+            if old != new:
+                break
+            keep += 1
+
+        self._printed[channel] = words
+        self._printed_at[channel] = now
+        self.printed += 1
+        tail = " ".join(words[keep:])
+        text = format_interim_diff(keep, tail, hypothesis.start_time_ms, hypothesis.end_time_ms)
+        return text + "\n"
+
+    def summary(self) -> str:
+        return f"Interim results printed: {self.printed} of {self.received}"
+
+
+_CLOSE = object()
+
+
+class ResponseRenderer:
+    """Buffered output of recognition responses.
+
+    Responses are formatted into a buffer written by a single click.echo once it
+    holds buffer_size characters or flush_interval_s has passed since the last
+    write, instead of one write per word and VA mark line.
+
+    With background set, formatting and writing run on a separate thread: render()
+    only queues the response, so a slow stdout (terminal, pipe) never delays reading
+    the gRPC stream, and the buffer is also flushed on timer while no responses come.
+    Without it, the interval is checked on render() and flush() only. close() writes
+    the rest. Partials held back by an InterimCoalescer formatter are printed once
+    due the same way.
+    """
+
+    def __init__(
+        self,
+        file: IO[str] | None = None,
+        formatter: ResponseFormatter = format_recognize_response,
+        buffer_size: int = OUTPUT_BUFFER_SIZE,
+        flush_interval_s: float = OUTPUT_FLUSH_INTERVAL_S,
+        background: bool = False,
+    ) -> None:
+        self._file = file
+        self._formatter = formatter
+        self._coalescer = formatter if isinstance(formatter, InterimCoalescer) else None
+        self._buffer_size = buffer_size
+        self._flush_interval_s = flush_interval_s
+        self._buffer: list[str] = []
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+        self._error: BaseException | None = None
+        self._queue: queue.SimpleQueue[Any] | None = None
+        self._thread: threading.Thread | None = None
+        if background:
+            self._queue = queue.SimpleQueue()
+            self._thread = threading.Thread(target=self._run, name="response-renderer", daemon=True)
+            self._thread.start()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def render(self, result: stt_pb2.RecognizeResponse, consider_final: bool = False) -> None:
+        if self._queue is not None:
+            self._queue.put((result, consider_final))
+            return
+
+        self._append(self._formatter(result, consider_final))
+        if self._buffered >= self._buffer_size or self._flush_due() <= 0:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered text (background renderer flushes on its own)."""
+        if self._queue is None:
+            self._append_pending()
+            self._write()
+
+    def close(self) -> None:
+        """Write everything rendered so far, re-raising error of the background writer."""
+        if self._thread is not None and self._queue is not None:
+            self._queue.put(_CLOSE)
+            self._thread.join()
+            self._thread = None
+        else:
+            self._append_pending(force=True)
+            self._write()
+
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _append(self, text: str) -> None:
+        if text:
+            self._buffer.append(text)
+            self._buffered += len(text)
+
+    def _append_pending(self, force: bool = False) -> None:
+        if self._coalescer is not None:
+            self._append(self._coalescer.flush_pending(force))
+
+    def _timeout(self) -> float | None:
+        """How long the background writer may wait for the next response."""
+        due = [self._flush_due()] if self._buffer else []
+        if self._coalescer is not None:
+            pending_due = self._coalescer.pending_due()
+            if pending_due is not None:
+                due.append(pending_due)
+        return max(0.0, min(due)) if due else None
+
+    def _flush_due(self) -> float:
+        return self._last_flush + self._flush_interval_s - time.monotonic()
+
+    def _write(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        click.echo(text, file=self._file, nl=False)
+
+    def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            try:
+                item = self._queue.get(timeout=self._timeout())
+            except queue.Empty:
+                item = None
+
+            if self._error is not None:
+                # NB: Output is broken (e.g. closed pipe) - drop the rest instead of queueing it
+                if item is _CLOSE:
+                    return
+                continue
+
+            try:
+                if item is _CLOSE:
+                    self._append_pending(force=True)
+                    self._write()
+                    return
+                if item is not None:
+                    self._append(self._formatter(*item))
+                else:
+                    self._append_pending()
+                if self._buffered >= self._buffer_size or self._flush_due() <= 0:
+                    self._write()
+            except Exception as err:
+                self._error = err  # NB: Raised on close()
+                self._buffer.clear()
+                self._buffered = 0
+
+
+def read_jsonl_records(file: IO[str]) -> Iterator[dict[str, Any]]:
+    """Read records written by print_recognize_response_jsonl."""
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def record_transcript(record: dict[str, Any]) -> str:
+    return str(record.get("normalized_transcript") or record.get("transcript") or "")
@@ -1,16 +1,83 @@
-import itertools
+import mmap
+import os
+import struct
+import subprocess
+import threading
 import wave
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
+from types import TracebackType
+from typing import BinaryIO, Self
+
+_RIFF_HEADER_SIZE = 12  # "RIFF" + size + "WAVE"
+_CHUNK_HEADER = struct.Struct("<4sI")
+
+
+def _find_data_chunk(file: BinaryIO) -> tuple[int, int]:
+    """Return offset and declared size of PCM payload in RIFF/WAVE file."""
+    file.seek(_RIFF_HEADER_SIZE)
+    while True:
+        header = file.read(_CHUNK_HEADER.size)
+        if len(header) < _CHUNK_HEADER.size:
+            raise wave.Error("data chunk not found")
+
+        chunk_id, chunk_size = _CHUNK_HEADER.unpack(header)
+        if chunk_id == b"data":
+            return file.tell(), chunk_size
+
+        # NB: RIFF chunks are padded to even size
+        file.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
 
 
 class AudioFile:
+    """WAV file with lazily mapped PCM payload.
+
+    Only header is read on creation. Samples are memory-mapped on first access,
+    so they are paged in from disk on demand instead of being copied into memory.
+    """
+
     def __init__(self, path: str) -> None:
         with wave.open(path, "rb") as audio:
-            self._blob = audio.readframes(audio.getnframes())
             self._sample_rate = audio.getframerate()
             self._channels_count = audio.getnchannels()
             self._sample_size = audio.getsampwidth()
 
+        self._path = path
+        self._mmap: mmap.mmap | None = None
+        self._pcm: memoryview | None = None
+
+        with open(path, "rb") as file:
+            data_offset, data_size = _find_data_chunk(file)
+            # NB: Streamed WAVs (eg. ffmpeg pipe output) may declare bogus data size
+            data_size = min(data_size, os.fstat(file.fileno()).st_size - data_offset)
+
+        self._data_offset = data_offset
+        self._frame_count = data_size // self.frame_size
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        try:
+            if self._pcm is not None:
+                self._pcm.release()
+                self._pcm = None
+
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+        except BufferError:
+            # NB: PCM is still referenced by a consumer (eg. chunk slice or numpy array),
+            # mapping will be released together with it
+            pass
+
     @property
     def sample_rate(self) -> int:
         return self._sample_rate
@@ -19,17 +86,106 @@ class AudioFile:
     def channel_count(self) -> int:
         return self._channels_count
 
+    @property
+    def sample_size(self) -> int:
+        return self._sample_size
+
+    @property
+    def frame_size(self) -> int:
+        return self._sample_size * self._channels_count
+
+    @property
+    def frame_count(self) -> int:
+        return self._frame_count
+
+    @property
+    def duration_ms(self) -> int:
+        return self._frame_count * 1000 // self._sample_rate
+
+    @property
+    def pcm(self) -> memoryview:
+        """Zero-copy view of PCM payload, valid until the file is closed."""
+        if self._pcm is None:
+            size = self._frame_count * self.frame_size
+            if size == 0:
+                self._pcm = memoryview(b"")
+            else:
+                with open(self._path, "rb") as file:
+                    self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._pcm = memoryview(self._mmap)[self._data_offset : self._data_offset + size]
+
+        return self._pcm
+
     @property
     def blob(self) -> bytes:
-        return self._blob
+        """Copy of the whole PCM payload (eg. for a single FileRecognizeRequest)."""
+        return self.pcm.tobytes()
 
     def chunks(self, chunk_len_ms: int) -> Iterable[bytes]:
-        sample_rate_ms = self._sample_rate // 1000
-        chunk_len = chunk_len_ms * sample_rate_ms * self._sample_size
-
-        it = iter(self._blob)
-        while True:
-            chunk = bytes(itertools.islice(it, chunk_len))
-            if not chunk:
-                break
-            yield chunk
+        # NB: Chunk length is counted in whole frames (all channels of one sample),
+        # so chunk boundaries never split a sample or a frame
+        frames_per_chunk = max(1, chunk_len_ms * self._sample_rate // 1000)
+        chunk_len = frames_per_chunk * self.frame_size
+
+        view = self.pcm
+        if self._mmap is not None and hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._mmap.madvise(mmap.MADV_SEQUENTIAL)
+
+        for offset in range(0, len(view), chunk_len):
+            yield view[offset : offset + chunk_len].tobytes()
+
+
+def ffmpeg_pcm_chunks(
+    path: str,
+    sample_rate: int,
+    channel_count: int,
+    chunk_len_ms: int,
+) -> Iterator[bytes]:
+    """Decode any ffmpeg-supported file to 16-bit PCM and yield it chunk by chunk.
+
+    Chunks are yielded as soon as ffmpeg produces them, so consumer can start
+    working before the whole file is decoded.
+    """
+    frames_per_chunk = max(1, chunk_len_ms * sample_rate // 1000)
+    chunk_len = frames_per_chunk * channel_count * 2
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-loglevel",
+        "error",
+        "-i",
+        path,
+        "-f",
+        "s16le",
+        "-acodec",
+        "pcm_s16le",
+        "-ac",
+        str(channel_count),
+        "-ar",
+        str(sample_rate),
+        "pipe:1",
+    ]
+
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as process:
+        stdout, stderr = process.stdout, process.stderr
+        assert stdout is not None and stderr is not None  # NB: for type checker, both are piped
+        # NB: Drain stderr concurrently, so verbose ffmpeg never blocks on a full stderr pipe
+        stderr_parts: list[bytes] = []
+        stderr_reader = threading.Thread(target=lambda: stderr_parts.append(stderr.read()))
+        stderr_reader.start()
+
+        decoded = False
+        try:
+            while chunk := stdout.read(chunk_len):
+                yield chunk
+            decoded = True
+        finally:
+            if not decoded:
+                # NB: Consumer stopped early - do not leave ffmpeg blocked on a full pipe
+                process.kill()
+            # NB: ffmpeg may close stdout a moment before it exits - wait for its own exit code
+            returncode = process.wait()
+            stderr_reader.join()
+
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd, stderr=b"".join(stderr_parts))
@@ -1,8 +1,19 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
 from typing import cast
 
 import click
+import grpc
 from keycloak import KeycloakOpenID
 
+# NB: Token is refreshed this long before it expires (but not earlier than halfway through
+# its lifetime), so requests never carry a token that expires in flight
+TOKEN_REFRESH_MARGIN_S = 30.0
+
 
 def get_sso_access_token(
     sso_server_url: str,
@@ -22,7 +33,148 @@ def get_sso_access_token(
     return cast(str, token_info["access_token"])
 
 
-def get_auth_metadata(
+class SSOTokenProvider:
+    """Keycloak access token cached until shortly before it expires.
+
+    Token is fetched with client_credentials grant on first use and reused while
+    it is valid according to its expires_in. If cache_path is given, token is also
+    kept in that file (readable by owner only), so it survives between processes.
+    Thread-safe.
+    """
+
+    def __init__(
+        self,
+        sso_server_url: str,
+        realm_name: str,
+        client_id: str,
+        client_secret: str,
+        verify: bool = True,
+        cache_path: str | Path | None = None,
+    ) -> None:
+        self._sso_connection = KeycloakOpenID(
+            sso_server_url,
+            realm_name,
+            client_id,
+            client_secret,
+            verify=verify,
+        )
+        self._cache_path = Path(cache_path).expanduser() if cache_path else None
+        # NB: One cache file can hold tokens of several clients
+        self._cache_key = hashlib.sha256(
+            f"{sso_server_url}\n{realm_name}\n{client_id}".encode()
+        ).hexdigest()
+
+        self._lock = threading.Lock()
+        self._access_token = ""
+        self._refresh_at = 0.0
+
+    @property
+    def access_token(self) -> str:
+        with self._lock:
+            if time.time() >= self._refresh_at and not self._load_cached_token():
+                self._fetch_token()
+
+            return self._access_token
+
+    def _set_token(self, access_token: str, expires_at: float, fetched_at: float) -> None:
+        margin = min(TOKEN_REFRESH_MARGIN_S, (expires_at - fetched_at) / 2)
+        self._access_token = access_token
+        self._refresh_at = expires_at - margin
+
+    def _fetch_token(self) -> None:
+        fetched_at = time.time()
+        token_info = self._sso_connection.token(grant_type="client_credentials")
+        expires_at = fetched_at + float(token_info.get("expires_in", 0))
+
+        self._set_token(cast(str, token_info["access_token"]), expires_at, fetched_at)
+        self._store_cached_token(expires_at, fetched_at)
+
+    def _read_cache_file(self) -> dict[str, dict[str, str | float]]:
+        if self._cache_path is None:
+            return {}
+
+        try:
+            return cast(dict[str, dict[str, str | float]], json.loads(self._cache_path.read_text()))
+        except (OSError, ValueError):
+            # NB: Missing or corrupted cache only means the token is fetched again
+            return {}
+
+    def _load_cached_token(self) -> bool:
+        entry = self._read_cache_file().get(self._cache_key)
+        if entry is None:
+            return False
+
+        expires_at = float(entry["expires_at"])
+        fetched_at = float(entry["fetched_at"])
+        self._set_token(str(entry["access_token"]), expires_at, fetched_at)
+        return time.time() < self._refresh_at
+
+    def _store_cached_token(self, expires_at: float, fetched_at: float) -> None:
+        if self._cache_path is None:
+            return
+
+        entries = self._read_cache_file()
+        entries = {
+            key: entry for key, entry in entries.items() if float(entry["expires_at"]) > fetched_at
+        }
+        entries[self._cache_key] = {
+            "access_token": self._access_token,
+            "expires_at": expires_at,
+            "fetched_at": fetched_at,
+        }
+
+        self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # NB: Token grants API access - create file as owner-only before writing anything to it
+        tmp_path = self._cache_path.with_name(f"{self._cache_path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as tmp_file:
+            json.dump(entries, tmp_file)
+        os.replace(tmp_path, self._cache_path)
+
+
+class SSOAuthMetadataPlugin(grpc.AuthMetadataPlugin):
+    """Adds SSO access token and IAM credentials to every call on a channel.
+
+    Token is taken from provider on each call, so channels and streams opened for
+    a long time keep working after the token is refreshed.
+    """
+
+    def __init__(
+        self,
+        token_provider: SSOTokenProvider,
+        iam_account: str | None = None,
+        iam_workspace: str | None = None,
+    ) -> None:
+        self._token_provider = token_provider
+        self._iam_account = iam_account
+        self._iam_workspace = iam_workspace
+
+    def metadata(self) -> tuple[tuple[str, str], ...]:
+        result_metadata = [("authorization", f"Bearer {self._token_provider.access_token}")]
+
+        if self._iam_account:
+            result_metadata.append(("x-ai-account", self._iam_account))
+
+        if self._iam_workspace:
+            result_metadata.append(("x-ai-workspace", self._iam_workspace))
+
+        return tuple(result_metadata)
+
+    def __call__(
+        self,
+        context: grpc.AuthMetadataContext,
+        callback: grpc.AuthMetadataPluginCallback,
+    ) -> None:
+        try:
+            metadata = self.metadata()
+        except Exception as e:  # NB: Any error must be reported to gRPC, or the call hangs
+            callback((), e)
+            return
+
+        callback(metadata, None)
+
+
+def make_auth_plugin(
     sso_server_url: str,
     realm_name: str,
     client_id: str,
@@ -30,29 +182,47 @@ def get_auth_metadata(
     iam_account: str | None,
     iam_workspace: str | None,
     verify: bool = True,
-) -> tuple[tuple[str, str], ...]:
-    auth_enabled = client_id and client_secret
+    token_cache_path: str | None = None,
+) -> SSOAuthMetadataPlugin | None:
+    """Create auth plugin, or return None if SSO authorization is disabled."""
+    if not (client_id and client_secret):
+        return None
 
-    if not auth_enabled:
-        click.echo("SSO authorization disabled\n")
-        return ()
+    token_provider = SSOTokenProvider(
+        sso_server_url,
+        realm_name,
+        client_id,
+        client_secret,
+        verify,
+        token_cache_path,
+    )
+    return SSOAuthMetadataPlugin(token_provider, iam_account, iam_workspace)
 
-    result_metadata: list[tuple[str, str]] = []
 
-    click.echo("Fetching SSO access token...\n")
-    access_token = get_sso_access_token(
+def get_auth_metadata(
+    sso_server_url: str,
+    realm_name: str,
+    client_id: str,
+    client_secret: str,
+    iam_account: str | None,
+    iam_workspace: str | None,
+    verify: bool = True,
+    token_cache_path: str | None = None,
+) -> tuple[tuple[str, str], ...]:
+    auth_plugin = make_auth_plugin(
         sso_server_url,
         realm_name,
         client_id,
         client_secret,
+        iam_account,
+        iam_workspace,
         verify,
+        token_cache_path,
     )
-    result_metadata.append(("authorization", f"Bearer {access_token}"))
-
-    if iam_account:
-        result_metadata.append(("x-ai-account", iam_account))
 
-    if iam_workspace:
-        result_metadata.append(("x-ai-workspace", iam_workspace))
+    if auth_plugin is None:
+        click.echo("SSO authorization disabled\n")
+        return ()
 
-    return tuple(result_metadata)
+    click.echo("Fetching SSO access token...\n")
+    return auth_plugin.metadata()
@@ -6,7 +6,11 @@ from typing import Protocol, TypedDict
 import click
 from dynaconf import Dynaconf, Validator
 
-from clients.common_utils.definitions import SETTINGS_TEMPLATE
+from clients.common_utils.definitions import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CACHE_MAX_SIZE_MB,
+    SETTINGS_TEMPLATE,
+)
 
 
 def _bool_validators(name: str) -> list[Validator]:
@@ -158,6 +162,23 @@ _VALIDATORS = [
         },
     ),
     *_default_bool_validators("VERIFY_SSO", True),
+    Validator(
+        "SSO_TOKEN_CACHE_PATH",
+        is_type_of=str,
+        default="",
+    ),
+    Validator(
+        "CACHE_DIR",
+        is_type_of=str,
+        default=DEFAULT_CACHE_DIR,
+    ),
+    Validator(
+        "CACHE_MAX_SIZE_MB",
+        cast=int,
+        gt=0,
+        default=DEFAULT_CACHE_MAX_SIZE_MB,
+        messages={"operations": "Cache size must be > 0, but it is {value}"},
+    ),
 ]
 
 
@@ -190,10 +211,14 @@ class SettingsProtocol(Protocol):
     client_id: str
     client_secret: str
     verify_sso: bool
+    sso_token_cache_path: str
 
     iam_account: str | None
     iam_workspace: str | None
 
+    cache_dir: str
+    cache_max_size_mb: int
+
 
 class Settings(Dynaconf):
     def __init__(self, settings_files: Iterable[str]) -> None:
@@ -238,6 +263,21 @@ class Settings(Dynaconf):
             self.set(key, value)
 
 
+def load_settings(config_path: str | None) -> Settings:
+    """Read and validate settings outside of CLI commands.
+
+    Missing config file is not an error - validation will report absent required keys.
+    """
+    if config_path and Path(config_path).is_file():
+        settings = Settings([config_path])
+    else:
+        settings = Settings([])
+
+    settings.validators.validate()
+
+    return settings
+
+
 @click.command(
     no_args_is_help=True,
     short_help="Generate config file",
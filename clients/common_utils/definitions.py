@@ -3,3 +3,16 @@ from typing import Final
 
 _this_directory = Path(__file__).parent
 SETTINGS_TEMPLATE: Final = _this_directory / "config_files" / "settings_template.ini"
+
+# --- Recognition Cache ---
+DEFAULT_CACHE_DIR: Final = "~/.cache/audio_transcriber/asr"
+DEFAULT_CACHE_MAX_SIZE_MB: Final = 1024
+
+# --- gRPC Channel ---
+# NB: Default gRPC server policy accepts keepalive pings only while calls are active and
+# at most every 5 minutes without data, others are answered with GOAWAY "too_many_pings"
+GRPC_KEEPALIVE_TIME_MS: Final = 300_000
+GRPC_KEEPALIVE_TIMEOUT_MS: Final = 10_000
+# NB: Default 4 MB limit is less than a few minutes of 16 kHz PCM in one FileRecognizeRequest
+GRPC_MAX_MESSAGE_SIZE: Final = 512 * 1024 * 1024
+GRPC_HTTP2_LOOKAHEAD_BYTES: Final = 16 * 1024 * 1024
@@ -1,5 +1,7 @@
+import atexit
 import contextlib
-from collections.abc import Iterator
+import threading
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, Self
@@ -8,6 +10,29 @@ import click
 import grpc
 
 from clients.common_utils.config import SettingsProtocol
+from clients.common_utils.definitions import (
+    GRPC_HTTP2_LOOKAHEAD_BYTES,
+    GRPC_KEEPALIVE_TIME_MS,
+    GRPC_KEEPALIVE_TIMEOUT_MS,
+    GRPC_MAX_MESSAGE_SIZE,
+)
+from clients.common_utils.metrics import instrument_channel
+
+ChannelOptions = Sequence[tuple[str, int | str]]
+
+CHANNEL_OPTIONS: ChannelOptions = (
+    # NB: Ping connections during calls, so NAT/proxies do not drop long quiet streams.
+    # Idle pooled channels are not pinged - default servers do not permit it
+    ("grpc.keepalive_time_ms", GRPC_KEEPALIVE_TIME_MS),
+    ("grpc.keepalive_timeout_ms", GRPC_KEEPALIVE_TIMEOUT_MS),
+    ("grpc.keepalive_permit_without_calls", 0),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.max_send_message_length", GRPC_MAX_MESSAGE_SIZE),
+    ("grpc.max_receive_message_length", GRPC_MAX_MESSAGE_SIZE),
+    # NB: How much data the transport reads ahead per stream (not the HTTP/2 flow-control
+    # window) - larger values help receiving throughput on high-latency links
+    ("grpc.http2.lookahead_bytes", GRPC_HTTP2_LOOKAHEAD_BYTES),
+)
 
 
 @dataclass
@@ -61,22 +86,120 @@ def ssl_creds_from_settings(settings: SettingsProtocol) -> SSLCreds | None:
     )
 
 
-@contextlib.contextmanager
-def open_grpc_channel(address: str, ssl_creds: SSLCreds | None) -> Iterator[grpc.Channel]:
-    """Open either secure or insecure connection to gRPC API."""
+def split_api_address(api_address: str) -> list[str]:
+    """Split comma-separated list of API endpoints (eg. "host1:443, host2:443")."""
+    return [address.strip() for address in api_address.split(",") if address.strip()]
+
+
+def _channel_credentials(ssl_creds: SSLCreds) -> grpc.ChannelCredentials:
+    return grpc.ssl_channel_credentials(
+        root_certificates=ssl_creds.root_certificates,
+        private_key=ssl_creds.private_key,
+        certificate_chain=ssl_creds.certificate_chain,
+    )
+
+
+def create_grpc_channel(
+    address: str,
+    ssl_creds: SSLCreds | None,
+    options: ChannelOptions = CHANNEL_OPTIONS,
+) -> grpc.Channel:
+    """Create either secure or insecure channel to gRPC API.
+
+    Caller owns the channel and must close it when it is no longer needed.
+    """
     if ssl_creds:
-        creds = grpc.ssl_channel_credentials(
-            root_certificates=ssl_creds.root_certificates,
-            private_key=ssl_creds.private_key,
-            certificate_chain=ssl_creds.certificate_chain,
+        return grpc.secure_channel(address, _channel_credentials(ssl_creds), options)
+
+    return grpc.insecure_channel(address, options)
+
+
+def create_aio_channel(
+    address: str,
+    ssl_creds: SSLCreds | None,
+    options: ChannelOptions = CHANNEL_OPTIONS,
+) -> grpc.aio.Channel:
+    """Create either secure or insecure asyncio channel to gRPC API.
+
+    Channel is bound to the running event loop. Caller owns the channel and must
+    close it when it is no longer needed.
+    """
+    if ssl_creds:
+        return grpc.aio.secure_channel(address, _channel_credentials(ssl_creds), options)
+
+    return grpc.aio.insecure_channel(address, options)
+
+
+class ChannelManager:
+    """Pool of long-lived gRPC channels.
+
+    One channel is kept per endpoint and SSL credentials, so consecutive requests
+    reuse established HTTP/2 connection (and TLS session) instead of opening a new
+    one. API address may list several endpoints separated by commas - requests are
+    then distributed between them in round-robin order.
+
+    Channels are owned by the manager and closed by close() only. With instrument
+    set, their connects and RPCs are recorded in clients.common_utils.metrics.
+    """
+
+    def __init__(self, options: ChannelOptions = CHANNEL_OPTIONS, instrument: bool = False) -> None:
+        self._options = options
+        self._instrument = instrument
+        self._lock = threading.Lock()
+        self._channels: dict[tuple[str, bytes | None, bytes | None, bytes | None], grpc.Channel] = (
+            {}
+        )
+        self._next_endpoint: dict[str, int] = {}
+
+    def channel(self, address: str, ssl_creds: SSLCreds | None) -> grpc.Channel:
+        """Return channel to a single endpoint, creating it on first use."""
+        key = (
+            address,
+            ssl_creds.root_certificates if ssl_creds else None,
+            ssl_creds.private_key if ssl_creds else None,
+            ssl_creds.certificate_chain if ssl_creds else None,
         )
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = create_grpc_channel(address, ssl_creds, self._options)
+                if self._instrument:
+                    channel = instrument_channel(channel, address)
+                self._channels[key] = channel
+
+            return channel
+
+    def next_channel(self, api_address: str, ssl_creds: SSLCreds | None) -> grpc.Channel:
+        """Return channel to the next of API endpoints in round-robin order."""
+        addresses = split_api_address(api_address)
+        if not addresses:
+            raise ValueError("gRPC API address is empty")
 
-        channel_ctx = grpc.secure_channel(address, creds)
-    else:
-        channel_ctx = grpc.insecure_channel(address)
+        with self._lock:
+            index = self._next_endpoint.get(api_address, 0)
+            self._next_endpoint[api_address] = (index + 1) % len(addresses)
 
-    with channel_ctx as channel:
-        yield channel
+        return self.channel(addresses[index % len(addresses)], ssl_creds)
+
+    def close(self) -> None:
+        with self._lock:
+            channels = list(self._channels.values())
+            self._channels.clear()
+            self._next_endpoint.clear()
+
+        for channel in channels:
+            channel.close()
+
+
+# NB: Shared by all clients in process, so channels outlive single requests and commands
+channel_manager = ChannelManager(instrument=True)
+atexit.register(channel_manager.close)
+
+
+@contextlib.contextmanager
+def open_grpc_channel(api_address: str, ssl_creds: SSLCreds | None) -> Iterator[grpc.Channel]:
+    """Get either secure or insecure connection to gRPC API from shared channel pool."""
+    yield channel_manager.next_channel(api_address, ssl_creds)
 
 
 def print_metadata(metadata: Iterable[tuple[str, str | bytes]]) -> None:
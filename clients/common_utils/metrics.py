@@ -0,0 +1,437 @@
+import bisect
+import contextlib
+import json
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any, Self
+
+import grpc
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # NB: Tracing is optional, see "tracing" extra
+    otel_trace = None
+
+LabelValues = tuple[tuple[str, str], ...]
+
+# NB: Upper bounds in seconds - from local fake server (ms) to long file recognition (minutes)
+SECONDS_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+BYTES_BUCKETS = tuple(float(4**power) for power in range(4, 16))  # 256B .. 1GB
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds (Prometheus semantics)."""
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # NB: Last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate q-quantile (0..1) by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / bucket_count)
+            seen += bucket_count
+
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe set of labelled histograms and counters.
+
+    Exported as a JSON summary (percentiles estimated from buckets) or in
+    Prometheus text exposition format, e.g. for node_exporter textfile collector.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: dict[str, dict[LabelValues, Histogram]] = {}
+        self._bounds: dict[str, Sequence[float]] = {}
+        self._counters: dict[str, dict[LabelValues, float]] = {}
+        self._help: dict[str, str] = {}
+
+    def histogram(self, name: str, help_text: str, bounds: Sequence[float]) -> None:
+        """Declare histogram, so it is exported even before the first observation."""
+        with self._lock:
+            self._histograms.setdefault(name, {})
+            self._bounds[name] = bounds
+            self._help[name] = help_text
+
+    def counter(self, name: str, help_text: str) -> None:
+        with self._lock:
+            self._counters.setdefault(name, {})
+            self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self._bounds[name])
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0.0) + value
+
+    def clear(self) -> None:
+        """Drop all observations, declared metrics stay."""
+        with self._lock:
+            for series in self._histograms.values():
+                series.clear()
+            for counter_series in self._counters.values():
+                counter_series.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "histograms": {
+                    name: [
+                        {"labels": dict(labels), **histogram.summary()}
+                        for labels, histogram in sorted(series.items())
+                    ]
+                    for name, series in self._histograms.items()
+                },
+                "counters": {
+                    name: [
+                        {"labels": dict(labels), "value": value}
+                        for labels, value in sorted(series.items())
+                    ]
+                    for name, series in self._counters.items()
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in self._histograms.items():
+                lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(
+                        (*histogram.bounds, float("inf")), histogram.counts
+                    ):
+                        cumulative += bucket_count
+                        le = "+Inf" if bound == float("inf") else _format_value(bound)
+                        bucket_labels = _format_labels(labels + (("le", le),))
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                    lines.append(
+                        f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}"
+                    )
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+            for name, counter_series in self._counters.items():
+                lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(counter_series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write metrics to path: Prometheus text for *.prom files, JSON summary otherwise."""
+        if path.endswith(".prom"):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.to_dict(), indent=2) + "\n"
+        Path(path).write_text(content, encoding="utf-8")
+
+
+def _format_value(value: float) -> str:
+    """Exact Prometheus sample value: whole numbers as integers, others in full precision."""
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(labels: LabelValues) -> str:
+    if not labels:
+        return ""
+
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+# NB: Process-wide registry - all clients and channels report here
+metrics = MetricsRegistry()
+
+metrics.histogram(
+    "grpc_client_connect_seconds",
+    "Time a channel takes from CONNECTING to READY state",
+    SECONDS_BUCKETS,
+)
+metrics.histogram(
+    "grpc_client_first_response_seconds",
+    "Time from the start of an RPC to its first response message",
+    SECONDS_BUCKETS,
+)
+metrics.histogram(
+    "grpc_client_duration_seconds",
+    "Total time of an RPC, including sending all requests and receiving all responses",
+    SECONDS_BUCKETS,
+)
+metrics.histogram("grpc_client_sent_bytes", "Serialized request size per RPC", BYTES_BUCKETS)
+metrics.histogram("grpc_client_received_bytes", "Serialized response size per RPC", BYTES_BUCKETS)
+metrics.counter("grpc_client_calls_total", "Finished RPCs by status code")
+metrics.histogram(
+    "stage_duration_seconds",
+    "Duration of processing stages (see span)",
+    SECONDS_BUCKETS,
+)
+
+
+class _RpcTimer:
+    """Timings and sizes of one RPC, recorded to metrics once it is finished."""
+
+    def __init__(self, target: str, method: str) -> None:
+        self._labels = {"target": target, "method": method}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._first_response: float | None = None
+        self._finished = False
+        self.sent_bytes = 0
+        self.received_bytes = 0
+
+    def sent(self, request: Any) -> None:
+        self.sent_bytes += request.ByteSize()
+
+    def received(self, response: Any) -> None:
+        if self._first_response is None:
+            self._first_response = time.perf_counter() - self._started
+        self.received_bytes += response.ByteSize()
+
+    def finish(self, code: grpc.StatusCode | None) -> None:
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+
+        duration = time.perf_counter() - self._started
+        labels = self._labels
+        if self._first_response is not None:
+            metrics.observe("grpc_client_first_response_seconds", self._first_response, **labels)
+        metrics.observe("grpc_client_duration_seconds", duration, **labels)
+        metrics.observe("grpc_client_sent_bytes", self.sent_bytes, **labels)
+        metrics.observe("grpc_client_received_bytes", self.received_bytes, **labels)
+        status = code.name if code is not None else "UNKNOWN"
+        metrics.inc("grpc_client_calls_total", **labels, code=status)
+
+    def done_callback(self, future: Any) -> None:
+        """Finish unary-response RPC from its future (successful or failed)."""
+        code = future.code()
+        if code == grpc.StatusCode.OK:
+            self.received(future.result())
+        self.finish(code)
+
+    def wrap_requests(self, requests: Iterator[Any]) -> Iterator[Any]:
+        for request in requests:
+            self.sent(request)
+            yield request
+
+
+class _ResponseStream:
+    """Response iterator of a server-streaming RPC that times its messages.
+
+    Everything else (initial_metadata(), cancel(), code() ...) is delegated to the call.
+    """
+
+    def __init__(self, call: Any, rpc: _RpcTimer) -> None:
+        self._call = call
+        self._rpc = rpc
+        # NB: Failed or cancelled stream may never be iterated to its end
+        call.add_done_callback(self._done)
+
+    def _done(self, call: Any) -> None:
+        code = call.code()
+        if code != grpc.StatusCode.OK:
+            self._rpc.finish(code)
+
+    def __iter__(self) -> Self:
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            response = next(self._call)
+        except StopIteration:
+            self._rpc.finish(grpc.StatusCode.OK)
+            raise
+        except grpc.RpcError as err:
+            self._rpc.finish(err.code())
+            raise
+
+        self._rpc.received(response)
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._call, name)
+
+
+class _ConnectWatch:
+    """Record how long channel takes to become READY, reconnects included.
+
+    Connectivity is polled by gRPC, so a fast connect may be reported as IDLE -> READY
+    without CONNECTING in between - the RPC that wakes the channel starts timing too.
+    """
+
+    def __init__(self, channel: grpc.Channel, target: str) -> None:
+        self._target = target
+        self._lock = threading.Lock()
+        self._started: float | None = None
+        self._ready = False
+        # NB: Do not try to connect - channel still connects lazily on the first RPC
+        channel.subscribe(self._on_state, try_to_connect=False)
+
+    def call_started(self) -> None:
+        with self._lock:
+            if not self._ready and self._started is None:
+                self._started = time.perf_counter()
+
+    def _on_state(self, state: grpc.ChannelConnectivity) -> None:
+        with self._lock:
+            self._ready = state == grpc.ChannelConnectivity.READY
+            if state == grpc.ChannelConnectivity.CONNECTING and self._started is None:
+                self._started = time.perf_counter()
+            if not self._ready or self._started is None:
+                return
+            elapsed = time.perf_counter() - self._started
+            self._started = None
+
+        metrics.observe("grpc_client_connect_seconds", elapsed, target=self._target)
+
+
+class MetricsInterceptor(
+    grpc.UnaryUnaryClientInterceptor,
+    grpc.UnaryStreamClientInterceptor,
+    grpc.StreamUnaryClientInterceptor,
+    grpc.StreamStreamClientInterceptor,
+):
+    """Record duration, time to first response and message sizes of every RPC.
+
+    Compare grpc_client_first_response_seconds (mostly the server) with stage
+    durations of span() (client side included) to tell where time goes.
+    """
+
+    def __init__(self, target: str, connect: _ConnectWatch | None = None) -> None:
+        self._target = target
+        self._connect = connect
+
+    def _start(self, client_call_details: grpc.ClientCallDetails) -> _RpcTimer:
+        if self._connect is not None:
+            self._connect.call_started()
+        return _RpcTimer(self._target, client_call_details.method)
+
+    def intercept_unary_unary(
+        self, continuation: Callable, client_call_details: grpc.ClientCallDetails, request: Any
+    ) -> Any:
+        rpc = self._start(client_call_details)
+        rpc.sent(request)
+        outcome = continuation(client_call_details, request)
+        outcome.add_done_callback(rpc.done_callback)
+        return outcome
+
+    def intercept_unary_stream(
+        self, continuation: Callable, client_call_details: grpc.ClientCallDetails, request: Any
+    ) -> Any:
+        rpc = self._start(client_call_details)
+        rpc.sent(request)
+        return _ResponseStream(continuation(client_call_details, request), rpc)
+
+    def intercept_stream_unary(
+        self,
+        continuation: Callable,
+        client_call_details: grpc.ClientCallDetails,
+        request_iterator: Iterator[Any],
+    ) -> Any:
+        rpc = self._start(client_call_details)
+        outcome = continuation(client_call_details, rpc.wrap_requests(request_iterator))
+        outcome.add_done_callback(rpc.done_callback)
+        return outcome
+
+    def intercept_stream_stream(
+        self,
+        continuation: Callable,
+        client_call_details: grpc.ClientCallDetails,
+        request_iterator: Iterator[Any],
+    ) -> Any:
+        rpc = self._start(client_call_details)
+        return _ResponseStream(
+            continuation(client_call_details, rpc.wrap_requests(request_iterator)), rpc
+        )
+
+
+def instrument_channel(channel: grpc.Channel, target: str) -> grpc.Channel:
+    """Wrap channel to target, so its connects and RPCs are recorded in metrics."""
+    connect = _ConnectWatch(channel, target)
+    return grpc.intercept_channel(channel, MetricsInterceptor(target, connect))
+
+
+@contextlib.contextmanager
+def span(name: str, attributes: Mapping[str, Any] | None = None) -> Iterator[None]:
+    """Time a processing stage into stage_duration_seconds.
+
+    If opentelemetry-api is installed, the stage is also traced as a span of
+    the current trace (exported by whatever SDK the application configured).
+    """
+    started = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if otel_trace is not None:
+            tracer = otel_trace.get_tracer("audio_transcriber")
+            stack.enter_context(tracer.start_as_current_span(name, attributes=attributes))
+        try:
+            yield
+        finally:
+            metrics.observe("stage_duration_seconds", time.perf_counter() - started, stage=name)
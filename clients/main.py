@@ -6,14 +6,25 @@ from urllib3.exceptions import InsecureRequestWarning
 
 from clients import asr
 from clients.common_utils.config import create_config
+from clients.common_utils.metrics import metrics
 
 # NB (k.zhovnovatiy): Disable warning from unsafe Keycloak connection (--verify-sso false)
 urllib3.disable_warnings(InsecureRequestWarning)
 
 
 @click.group()
-def main() -> None:
-    pass
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="save gRPC timings (connect, first response, total) and message sizes on exit: "
+    "Prometheus text format if path ends with .prom, JSON summary otherwise",
+    metavar="<path>",
+)
+@click.pass_context
+def main(ctx: click.Context, metrics_file: str | None) -> None:
+    if metrics_file:
+        ctx.call_on_close(lambda: metrics.write(metrics_file))
 
 
 @click.group(
@@ -32,13 +43,24 @@ def models_group() -> None:
     pass
 
 
+@click.group(
+    "bench",
+    help="Load testing commands",
+)
+def bench_group() -> None:
+    pass
+
+
 asr_group.add_command(asr.file_recognize, "file")
 asr_group.add_command(asr.recognize, "stream")
 
 models_group.add_command(asr.get_models_info, "recognize")
 
+bench_group.add_command(asr.bench_stream, "stream")
+
 main.add_command(asr_group)
 main.add_command(models_group)
+main.add_command(bench_group)
 main.add_command(create_config, "create-config")
 
 
@@ -1,8 +1,8 @@
 import argparse
 import os
-from pathlib import Path
 from audio_transcriber.audio_processor import AudioProcessor
 from audio_transcriber.summarization import TranscriptionSummarizer
+from clients.common_utils.metrics import metrics
 
 def main():
     """Process audio/video file and generate transcription.
@@ -10,51 +10,60 @@ def main():
     Supports mp4, mp3, and wav files.
     """
     parser = argparse.ArgumentParser(description='Process audio/video file and generate transcription.')
-    parser.add_argument('input_file', type=str, help='Path to the input audio/video file')
+    parser.add_argument('input_file', type=str, nargs='?', help='Path to the input audio/video file (optional with --resume)')
     parser.add_argument('--output-dir', default='output', help='Directory to save the transcription results')
     parser.add_argument('--add-summarization', action='store_true', help='Generate a summary of the transcription using GPT-4o')
+    parser.add_argument('--stream-summary', action='store_true', help='Print and save the summary as it is generated')
     parser.add_argument('--config', default='config.ini', help='Path to the configuration file')
+    parser.add_argument('--parallel', type=int, default=1, help='Number of chunks to transcribe concurrently')
+    parser.add_argument('--keep-intermediate', action='store_true', help='Save decoded input.wav and chunk_N.wav files for debugging')
+    parser.add_argument('--stream', action='store_true', help='Stream audio to recognition while ffmpeg decodes it')
+    parser.add_argument('--no-cache', action='store_true', help='Always send audio to the server, ignoring cached results')
+    parser.add_argument('--resume', metavar='JOB', help='Continue an interrupted job: transcription_<timestamp> directory in output dir or its path')
+    parser.add_argument('--metrics-file', metavar='PATH', help='Save gRPC and stage timings on exit: Prometheus text if PATH ends with .prom, JSON otherwise')
     
     args = parser.parse_args()
     
     # Validate input file exists
-    if not os.path.exists(args.input_file):
+    if not args.input_file and not args.resume:
+        parser.error("input_file is required unless --resume is given")
+    if args.input_file and not os.path.exists(args.input_file):
         parser.error(f"Input file does not exist: {args.input_file}")
+    if args.stream and args.resume:
+        parser.error("--stream jobs can not be resumed")
     
-    processor = AudioProcessor(args.input_file, args.output_dir)
+    try:
+        processor = AudioProcessor(args.input_file, args.output_dir, args.config,
+                                   keep_intermediate=args.keep_intermediate,
+                                   use_cache=not args.no_cache, resume_job=args.resume)
+    except FileNotFoundError as e:
+        parser.error(str(e))
     
-    # Convert to WAV if needed
-    if not args.input_file.lower().endswith('.wav'):
-        wav_path = str(Path(args.output_dir) / "input.wav")
-        processor._convert_to_wav(args.input_file, wav_path)
-        args.input_file = wav_path
-    
-    # Split if necessary and transcribe
-    audio_chunks = processor.split_audio(args.input_file)
-    processor.transcribe_audio(audio_chunks)
+    try:
+        if args.stream:
+            # Decode and recognize concurrently through one Recognize stream
+            processor.stream_transcribe()
+        else:
+            # Decode, split if necessary and transcribe - all in memory
+            processor.process(parallel=args.parallel)
+    finally:
+        # Timings of a failed run are the most interesting ones
+        if args.metrics_file:
+            metrics.write(args.metrics_file)
+            print(f"Metrics saved to: {args.metrics_file}")
     
     # If summarization is requested
     if args.add_summarization:
         try:
-            # Find the merged transcription file
-            transcription_files = [f for f in os.listdir(args.output_dir) if f.startswith("merged_transcription_")]
-            if not transcription_files:
+            transcription_path = processor.merged_file
+            if not transcription_path:
                 print("No merged transcription found. Cannot generate summary.")
                 return
-                
-            # Sort by modification time to get the most recent one
-            latest_file = sorted(
-                transcription_files,
-                key=lambda x: os.path.getmtime(os.path.join(args.output_dir, x)),
-                reverse=True
-            )[0]
-            
-            transcription_path = os.path.join(args.output_dir, latest_file)
             
             # Generate summary
             print("Generating summary using OpenAI...")
             summarizer = TranscriptionSummarizer(transcription_path, args.output_dir, args.config)
-            summarizer.summarize()
+            summarizer.summarize(stream=args.stream_summary)
             
         except Exception as e:
             print(f"Error during summarization: {str(e)}")
@@ -1,7 +1,79 @@
-import os
 import sys
+import wave
 from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
 
 # Add the project root directory to Python path
 project_root = str(Path(__file__).parent.parent)
-sys.path.insert(0, project_root) 
\ No newline at end of file
+sys.path.insert(0, project_root)
+
+SAMPLE_RATE = 16000
+
+
+class FakeClock:
+    """Clock that only moves on sleep() or when now is advanced."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock():
+    """Clock to patch over time functions of the module under test."""
+    return FakeClock()
+
+
+@pytest.fixture
+def pcm():
+    """Silent mono 16-bit PCM of given duration, ms."""
+
+    def make(duration_ms):
+        return b"\x00\x00" * (SAMPLE_RATE * duration_ms // 1000)
+
+    return make
+
+
+@pytest.fixture
+def write_wav(pcm):
+    """Write silent mono 16-bit WAV file of given duration, ms, and return its path."""
+
+    def write(path, duration_ms=100):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with wave.open(str(path), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(pcm(duration_ms))
+        return str(path)
+
+    return write
+
+
+@pytest.fixture
+def stt_settings():
+    """Settings of an insecure STT client without authentication to given address."""
+
+    def make(api_address):
+        return SimpleNamespace(
+            api_address=api_address,
+            use_ssl=False,
+            timeout=10,
+            sso_url="",
+            realm="",
+            client_id="",
+            client_secret="",
+            verify_sso=True,
+            sso_token_cache_path="",
+            iam_account="",
+            iam_workspace="",
+        )
+
+    return make
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from clients.asr.aio_client import AsyncSTTClient
+from clients.asr.client import STTClient
+from clients.asr.fake_server import FakeSTTServicer, serve_fake_stt
+from clients.asr.utils.request import RecognitionOptions
+from clients.common_utils.grpc import ChannelManager
+from clients.genproto import stt_pb2
+
+SAMPLE_RATE = 16000
+
+
+@pytest.fixture
+def servicer():
+    return FakeSTTServicer(utterance_ms=1000)
+
+
+@pytest.fixture
+def api_address(servicer):
+    with serve_fake_stt(servicer) as address:
+        yield address
+
+
+def test_file_recognize_concurrently(api_address, stt_settings, pcm):
+    """Test that many concurrent FileRecognize calls share one aio client."""
+    config = RecognitionOptions(enable_word_time_offsets=True).recognition_config(SAMPLE_RATE, 1)
+
+    async def run():
+        async with AsyncSTTClient(stt_settings(api_address)) as client:
+            return await asyncio.gather(
+                *(client.file_recognize(pcm(2500), config) for _ in range(50))
+            )
+
+    results = asyncio.run(run())
+
+    assert len(results) == 50
+    for responses in results:
+        assert [r.hypothesis.transcript for r in responses] == [
+            "utterance 1",
+            "utterance 2",
+            "utterance 3",
+        ]
+        assert responses[-1].hypothesis.end_time_ms == 2500
+        assert responses[0].hypothesis.words[0].word == "utterance"
+
+
+def test_recognize_streams_async_chunks(api_address, stt_settings, pcm):
+    """Test that async iterator of audio produces interim and final stream responses."""
+    config = stt_pb2.StreamRecognitionConfig(
+        config=RecognitionOptions().recognition_config(SAMPLE_RATE, 1),
+        interim_results=True,
+    )
+
+    async def audio_chunks():
+        for _ in range(6):
+            yield pcm(500)
+
+    async def run():
+        async with AsyncSTTClient(stt_settings(api_address)) as client:
+            return [response async for response in client.recognize(audio_chunks(), config)]
+
+    responses = asyncio.run(run())
+
+    finals = [r for r in responses if r.is_final]
+    assert [r.hypothesis.transcript for r in finals] == [
+        "utterance 1",
+        "utterance 2",
+        "utterance 3",
+    ]
+    assert [(r.hypothesis.start_time_ms, r.hypothesis.end_time_ms) for r in finals][-1] == (
+        2000,
+        3000,
+    )
+    assert any(not r.is_final for r in responses)
+
+
+def test_sync_client_against_fake_server(api_address, servicer, stt_settings, pcm):
+    """Test that blocking client gets the same results from pooled channel."""
+    config = RecognitionOptions().recognition_config(SAMPLE_RATE, 1)
+    channels = ChannelManager()
+
+    with STTClient(stt_settings(api_address), channels=channels) as client:
+        first = client.file_recognize(pcm(1500), config)
+        second = client.file_recognize(pcm(1500), config)
+
+    channels.close()
+    assert len(first) == len(second) == 2
+    assert len(servicer.call_metadata) == 2
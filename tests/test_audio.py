@@ -0,0 +1,98 @@
+import subprocess
+import sys
+import wave
+
+import pytest
+
+from clients.common_utils.audio import AudioFile, ffmpeg_pcm_chunks
+
+
+@pytest.fixture
+def stereo_wav(tmp_path):
+    """Create a 2.5 s stereo 8 kHz WAV with distinct bytes per frame."""
+    path = tmp_path / "stereo.wav"
+    frames = 8000 * 5 // 2
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(bytes(i % 251 for i in range(frames * 4)))
+    return str(path)
+
+
+def test_chunks_are_frame_aligned(stereo_wav):
+    """Test that every chunk except the last covers exactly chunk_len_ms of frames."""
+    audio = AudioFile(stereo_wav)
+
+    chunks = list(audio.chunks(1000))
+
+    assert [len(chunk) for chunk in chunks] == [8000 * 4, 8000 * 4, 4000 * 4]
+    assert all(isinstance(chunk, bytes) for chunk in chunks)
+    assert b"".join(chunks) == audio.blob
+
+
+def test_header_is_read_without_mapping_samples(stereo_wav):
+    """Test that metadata is available before PCM is mapped and close releases it."""
+    audio = AudioFile(stereo_wav)
+
+    assert audio._mmap is None
+    assert (audio.sample_rate, audio.channel_count, audio.sample_size) == (8000, 2, 2)
+    assert audio.frame_count == 20000
+    assert audio.duration_ms == 2500
+
+    with audio:
+        assert len(audio.pcm) == 20000 * 4
+    assert audio._mmap is None
+
+
+def _fake_ffmpeg(mocker, script):
+    """Replace ffmpeg with a python process running script."""
+    popen = subprocess.Popen
+    return mocker.patch(
+        "subprocess.Popen",
+        side_effect=lambda cmd, **kwargs: popen([sys.executable, "-c", script], **kwargs),
+    )
+
+
+def test_ffmpeg_pcm_chunks_yields_decoder_output_incrementally(mocker):
+    """Test that decoder stdout is cut into chunk_len_ms chunks."""
+    mock_popen = _fake_ffmpeg(mocker, "import sys; sys.stdout.buffer.write(bytes(80000))")
+
+    chunks = list(ffmpeg_pcm_chunks("input.mp4", 16000, 1, 1000))
+
+    assert [len(chunk) for chunk in chunks] == [32000, 32000, 16000]
+    cmd = mock_popen.call_args[0][0]
+    assert cmd[cmd.index("-f") + 1] == "s16le"
+    assert cmd[-1] == "pipe:1"
+
+
+def test_ffmpeg_pcm_chunks_raises_on_decoder_failure(mocker):
+    """Test that decoder failure is reported after its output is consumed."""
+    _fake_ffmpeg(mocker, "import sys; sys.stderr.write('bad input'); sys.exit(1)")
+
+    with pytest.raises(subprocess.CalledProcessError) as exc_info:
+        list(ffmpeg_pcm_chunks("input.mp4", 16000, 1, 1000))
+
+    assert exc_info.value.stderr == b"bad input"
+
+
+def test_ffmpeg_pcm_chunks_waits_for_decoder_exit(mocker):
+    """Test that decoder exiting after closing stdout, with verbose stderr, is a success."""
+    _fake_ffmpeg(
+        mocker,
+        "import sys, time; sys.stderr.write('x' * 1000000); sys.stderr.flush(); "
+        "sys.stdout.buffer.write(bytes(40000)); sys.stdout.close(); time.sleep(0.05)",
+    )
+
+    chunks = list(ffmpeg_pcm_chunks("input.mp4", 16000, 1, 1000))
+
+    assert [len(chunk) for chunk in chunks] == [32000, 8000]
+
+
+def test_ffmpeg_pcm_chunks_stops_decoder_when_consumer_stops(mocker):
+    """Test that decoder is killed when its output is not read to the end."""
+    _fake_ffmpeg(mocker, "import sys; sys.stdout.buffer.write(bytes(10000000))")
+
+    chunks = ffmpeg_pcm_chunks("input.mp4", 16000, 1, 1000)
+    assert len(next(chunks)) == 32000
+    chunks.close()
@@ -57,22 +57,266 @@ def test_split_audio_small_file(audio_processor, mocker):
 
 def test_merge_transcriptions(audio_processor, temp_output_dir):
     """Test merging transcription files."""
+    import json
+
     # Create test transcription files
     for i in range(1, 4):
-        file_path = os.path.join(audio_processor.transcription_dir, f"transcription_{i}.txt")
+        file_path = os.path.join(audio_processor.transcription_dir, f"transcription_{i}.jsonl")
         with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(f"Speaker 1: Test content {i}\n")
+            for text, is_final in [(f"Test content {i}", True), ("interim", False)]:
+                record = {"is_final": is_final, "channel": 0, "speaker_id": 1,
+                          "transcript": text, "normalized_transcript": text,
+                          "start_time_ms": (i - 1) * 1000, "end_time_ms": i * 1000}
+                f.write(json.dumps(record) + "\n")
     
     audio_processor.merge_transcriptions()
     
     # Check that merged file exists and contains content
     merged_files = [f for f in os.listdir(temp_output_dir) 
-                   if f.startswith("merged_transcription_")]
+                   if f.startswith("merged_transcription_") and f.endswith(".txt")]
     assert len(merged_files) == 1
     
     merged_path = os.path.join(temp_output_dir, merged_files[0])
     with open(merged_path, 'r', encoding='utf-8') as f:
         content = f.read()
-        assert "Speaker 1: Test content 1" in content
-        assert "Speaker 1: Test content 2" in content
-        assert "Speaker 1: Test content 3" in content 
\ No newline at end of file
+        assert content.splitlines() == [
+            'Speaker 1. (00.00s-01.00s): "Test content 1"',
+            'Speaker 1. (01.00s-02.00s): "Test content 2"',
+            'Speaker 1. (02.00s-03.00s): "Test content 3"',
+        ]
+        assert "interim" not in content
+
+def test_transcribe_audio_reuses_one_client(audio_processor, temp_output_dir, tmp_path, mocker, write_wav):
+    """Test that all chunks go through one in-process STT client."""
+    from clients.genproto import stt_pb2
+
+    mocker.patch('audio_transcriber.audio_processor.load_settings')
+    mock_client_cls = mocker.patch('audio_transcriber.audio_processor.STTClient')
+    client = mock_client_cls.return_value.__enter__.return_value
+    client.file_recognize.side_effect = lambda audio, config: [
+        stt_pb2.RecognizeResponse(
+            hypothesis=stt_pb2.SpeechRecognitionHypothesis(
+                normalized_transcript="Привет", start_time_ms=0, end_time_ms=900
+            ),
+            speaker_info=stt_pb2.SpeakerInfo(speaker_id=1),
+        )
+    ]
+    chunks = [write_wav(tmp_path / f"chunk_{i}.wav") for i in range(1, 4)]
+    audio_processor.chunk_offsets_ms[chunks[1]] = 30000
+    audio_processor.chunk_offsets_ms[chunks[2]] = 60000
+
+    audio_processor.transcribe_audio(chunks)
+
+    mock_client_cls.assert_called_once()
+    assert client.file_recognize.call_count == 3
+    config = client.file_recognize.call_args[0][1]
+    assert config.model == "e2e-v3"
+    assert config.punctuation_config.enable
+    assert config.sample_rate_hertz == 16000
+
+    merged_files = [f for f in os.listdir(temp_output_dir)
+                   if f.startswith("merged_transcription_") and f.endswith(".txt")]
+    with open(os.path.join(temp_output_dir, merged_files[0]), 'r', encoding='utf-8') as f:
+        content = f.read()
+    assert content.splitlines() == [
+        'Speaker 1. (00.00s-00.90s): "Привет"',
+        'Speaker 1. (30.00s-30.90s): "Привет"',
+        'Speaker 1. (60.00s-60.90s): "Привет"',
+    ]
+
+def test_transcribe_audio_parallel_retries_failed_chunk(audio_processor, temp_output_dir, tmp_path, mocker, write_wav):
+    """Test that a transiently failing chunk is retried and merge order is kept."""
+    import grpc
+    from clients.genproto import stt_pb2
+
+    class UnavailableError(grpc.RpcError):
+        def code(self):
+            return grpc.StatusCode.UNAVAILABLE
+
+    failures = {"chunk_2.wav": 1}
+
+    def fake_recognize_chunk_side_effect(path):
+        name = os.path.basename(path)
+        if failures.get(name):
+            failures[name] -= 1
+            raise UnavailableError()
+        return [
+            stt_pb2.RecognizeResponse(
+                hypothesis=stt_pb2.SpeechRecognitionHypothesis(normalized_transcript=name)
+            )
+        ]
+
+    mocker.patch('audio_transcriber.audio_processor.load_settings')
+    mocker.patch('audio_transcriber.audio_processor.RETRY_BACKOFF_S', 0)
+    mock_client_cls = mocker.patch('audio_transcriber.audio_processor.STTClient')
+    client = mock_client_cls.return_value.__enter__.return_value
+    paths = [write_wav(tmp_path / f"chunk_{i}.wav", duration_ms=10 * i) for i in range(1, 5)]
+    by_size = {os.path.getsize(p) - 44: p for p in paths}
+    client.file_recognize.side_effect = (
+        lambda audio, config: fake_recognize_chunk_side_effect(by_size[len(audio)])
+    )
+
+    audio_processor.transcribe_audio(paths, parallel=3)
+
+    assert client.file_recognize.call_count == 5
+    merged_files = [f for f in os.listdir(temp_output_dir)
+                   if f.startswith("merged_transcription_") and f.endswith(".txt")]
+    with open(os.path.join(temp_output_dir, merged_files[0]), 'r', encoding='utf-8') as f:
+        content = f.read()
+    positions = [content.index(f'"chunk_{i}.wav"') for i in range(1, 5)]
+    assert positions == sorted(positions)
+
+def test_split_audio_cuts_in_pauses_and_records_offsets(audio_processor, tmp_path, mocker, monkeypatch):
+    """Test that chunks start in pauses and their absolute offsets are kept."""
+    import wave
+    import numpy as np
+
+    monkeypatch.setenv('CHUNK_OVERLAP_SEC', '0')
+    rng = np.random.default_rng(0)
+    samples = rng.integers(-8000, 8000, size=16000 * 30, dtype=np.int16)
+    samples[int(9.5 * 16000):int(9.8 * 16000)] = 0
+    samples[int(20.6 * 16000):int(20.9 * 16000)] = 0
+    audio_path = str(tmp_path / "long.wav")
+    with wave.open(audio_path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(samples.tobytes())
+
+    mocker.patch('audio_transcriber.audio_processor.os.path.getsize', return_value=45 * 1024 * 1024)
+    mock_run = mocker.patch('subprocess.run')
+
+    chunks = audio_processor.split_audio(audio_path)
+
+    assert len(chunks) == 3
+    offsets = [audio_processor.chunk_offsets_ms[chunk] for chunk in chunks]
+    assert offsets[0] == 0
+    assert 9500 <= offsets[1] <= 9800
+    assert 20600 <= offsets[2] <= 20900
+    mock_run.assert_not_called()
+    pieces = []
+    for chunk, offset in zip(chunks, offsets):
+        with wave.open(chunk, 'rb') as wav:
+            assert wav.getframerate() == 16000
+            pieces.append(wav.readframes(wav.getnframes()))
+        assert 0 <= len(b''.join(pieces[:-1])) // 2 - offset * 16 < 16
+    assert b''.join(pieces) == samples.tobytes()
+
+def test_process_keeps_chunks_in_memory(audio_processor, temp_output_dir, tmp_path, mocker, monkeypatch, write_wav):
+    """Test that in-memory pipeline sends every chunk without writing chunk files."""
+    monkeypatch.setenv('MAX_CHUNK_SIZE_MB', '1')
+    audio_processor.input_file = write_wav(tmp_path / "input.wav", duration_ms=50000)
+    mocker.patch('audio_transcriber.audio_processor.load_settings')
+    mock_client_cls = mocker.patch('audio_transcriber.audio_processor.STTClient')
+    client = mock_client_cls.return_value.__enter__.return_value
+    client.file_recognize.return_value = []
+
+    audio_processor.process()
+
+    sent = [call[0][0] for call in client.file_recognize.call_args_list]
+    assert len(sent) == 2
+    # First chunk runs 2s (default CHUNK_OVERLAP_SEC) into the second one
+    assert sum(len(blob) for blob in sent) == (50000 + 2000) * 16 * 2
+    assert sent[0][-2000 * 16 * 2:] == sent[1][:2000 * 16 * 2]
+    windows = audio_processor._manifest_windows()
+    assert windows[1][1] - windows[2][0] == 2000
+    assert not [f for f in os.listdir(temp_output_dir) if f.endswith('.wav')]
+
+def test_decode_audio_pipes_raw_pcm(audio_processor, temp_output_dir, mocker):
+    """Test that non-WAV input is decoded by ffmpeg to stdout and optionally persisted."""
+    mock_run = mocker.patch('subprocess.run')
+    mock_run.return_value.returncode = 0
+    mock_run.return_value.stdout = b'\x01\x00' * 160
+    audio_processor.keep_intermediate = True
+
+    pcm = audio_processor.decode_audio("test.mp4")
+
+    assert pcm == b'\x01\x00' * 160
+    args = mock_run.call_args[0][0]
+    assert args[args.index('-f') + 1] == 's16le'
+    assert args[-1] == 'pipe:1'
+    assert os.path.exists(os.path.join(temp_output_dir, "input.wav"))
+
+def test_resume_transcribes_only_failed_chunks(audio_processor, temp_output_dir, tmp_path, mocker, monkeypatch, write_wav):
+    """Test that a resumed job skips chunks recorded as done in the job manifest."""
+    import json
+    import grpc
+
+    class InvalidArgumentError(grpc.RpcError):
+        def code(self):
+            return grpc.StatusCode.INVALID_ARGUMENT
+
+    monkeypatch.setenv('MAX_CHUNK_SIZE_MB', '1')
+    audio_processor.input_file = write_wav(tmp_path / "input.wav", duration_ms=80000)
+    mocker.patch('audio_transcriber.audio_processor.load_settings')
+    mock_client_cls = mocker.patch('audio_transcriber.audio_processor.STTClient')
+    client = mock_client_cls.return_value.__enter__.return_value
+    client.file_recognize.side_effect = [[], InvalidArgumentError(), []]
+
+    audio_processor.process()
+
+    with open(os.path.join(audio_processor.transcription_dir, "job.json"), encoding='utf-8') as f:
+        manifest = json.load(f)
+    statuses = {chunk['index']: chunk['status'] for chunk in manifest['chunks']}
+    failed = [index for index, status in statuses.items() if status == 'failed']
+    assert len(statuses) == 3 and len(failed) == 1
+
+    client.file_recognize.reset_mock(side_effect=True)
+    client.file_recognize.return_value = []
+    job = os.path.basename(audio_processor.transcription_dir)
+    resumed = AudioProcessor(None, output_dir=temp_output_dir, resume_job=job)
+
+    resumed.process()
+
+    assert resumed.input_file == os.path.abspath(audio_processor.input_file)
+    assert resumed.transcription_dir == audio_processor.transcription_dir
+    assert client.file_recognize.call_count == 1
+    assert all(chunk.status == 'done' for chunk in resumed.manifest.chunks)
+
+def test_resume_records_rechunked_audio(audio_processor, temp_output_dir, tmp_path, mocker, monkeypatch, write_wav):
+    """Test that chunks re-transcribed after an overlap change are not redone on next resume."""
+    monkeypatch.setenv('MAX_CHUNK_SIZE_MB', '1')
+    audio_processor.input_file = write_wav(tmp_path / "input.wav", duration_ms=80000)
+    mocker.patch('audio_transcriber.audio_processor.load_settings')
+    mock_client_cls = mocker.patch('audio_transcriber.audio_processor.STTClient')
+    client = mock_client_cls.return_value.__enter__.return_value
+    client.file_recognize.return_value = []
+
+    audio_processor.process()
+    job = os.path.basename(audio_processor.transcription_dir)
+    chunk_count = client.file_recognize.call_count
+
+    monkeypatch.setenv('CHUNK_OVERLAP_SEC', '1')
+    client.file_recognize.reset_mock()
+    AudioProcessor(None, output_dir=temp_output_dir, resume_job=job).process()
+    assert 0 < client.file_recognize.call_count < chunk_count
+
+    client.file_recognize.reset_mock()
+    AudioProcessor(None, output_dir=temp_output_dir, resume_job=job).process()
+    assert client.file_recognize.call_count == 0
+
+def test_merge_large_transcript_is_fast(audio_processor):
+    """Test that merging 10 000 structured utterances does not re-parse text output."""
+    import io
+    import time
+    from clients.asr.utils.response import print_recognize_response_jsonl
+    from clients.genproto import stt_pb2
+
+    output = io.StringIO()
+    for i in range(10000):
+        print_recognize_response_jsonl(stt_pb2.RecognizeResponse(
+            hypothesis=stt_pb2.SpeechRecognitionHypothesis(
+                normalized_transcript=f"Фраза {i}", start_time_ms=i * 1000, end_time_ms=i * 1000 + 900
+            ),
+            speaker_info=stt_pb2.SpeakerInfo(speaker_id=i % 3 + 1),
+        ), True, file=output)
+    with open(os.path.join(audio_processor.transcription_dir, "transcription_1.jsonl"), 'w', encoding='utf-8') as f:
+        f.write(output.getvalue())
+
+    started = time.perf_counter()
+    merged_file = audio_processor.merge_transcriptions()
+    elapsed = time.perf_counter() - started
+
+    with open(merged_file, 'r', encoding='utf-8') as f:
+        assert sum(1 for line in f if line.startswith("Speaker")) == 10000
+    assert elapsed < 1.0
@@ -0,0 +1,109 @@
+import os
+import stat
+
+import pytest
+
+from clients.asr.client import STTClient
+from clients.asr.fake_server import FakeSTTServicer, serve_fake_stt
+from clients.asr.utils.request import RecognitionOptions
+from clients.common_utils import auth
+from clients.common_utils.auth import SSOAuthMetadataPlugin, SSOTokenProvider
+from clients.common_utils.grpc import ChannelManager
+from clients.genproto import stt_pb2
+
+
+@pytest.fixture
+def clock(monkeypatch, fake_clock):
+    monkeypatch.setattr(auth.time, "time", fake_clock.time)
+    return fake_clock
+
+
+@pytest.fixture
+def keycloak(mocker):
+    keycloak_cls = mocker.patch("clients.common_utils.auth.KeycloakOpenID")
+    tokens = iter(f"token-{i}" for i in range(1, 100))
+    keycloak_cls.return_value.token.side_effect = lambda grant_type: {
+        "access_token": next(tokens),
+        "expires_in": 300,
+    }
+    return keycloak_cls.return_value
+
+
+def test_token_is_reused_and_refreshed_ahead_of_expiry(clock, keycloak):
+    """Test that token is fetched once and refreshed before it expires."""
+    provider = SSOTokenProvider("https://sso", "realm", "client", "secret")
+
+    assert provider.access_token == "token-1"
+    clock.now += 300 - auth.TOKEN_REFRESH_MARGIN_S - 1
+    assert provider.access_token == "token-1"
+    assert keycloak.token.call_count == 1
+
+    clock.now += 1
+    assert provider.access_token == "token-2"
+    assert keycloak.token.call_count == 2
+
+
+def test_token_file_cache_is_shared_and_private(clock, keycloak, tmp_path):
+    """Test that cached token survives provider restart and file is owner-only."""
+    cache_path = tmp_path / "sso" / "token.json"
+
+    first = SSOTokenProvider("https://sso", "realm", "client", "secret", cache_path=cache_path)
+    assert first.access_token == "token-1"
+    assert stat.S_IMODE(os.stat(cache_path).st_mode) == 0o600
+
+    second = SSOTokenProvider("https://sso", "realm", "client", "secret", cache_path=cache_path)
+    other = SSOTokenProvider("https://sso", "realm", "other", "secret", cache_path=cache_path)
+    assert second.access_token == "token-1"
+    assert other.access_token == "token-2"
+
+    clock.now += 300
+    assert second.access_token == "token-3"
+
+
+def test_plugin_passes_metadata_and_errors_to_grpc(clock, keycloak, mocker):
+    """Test that plugin reports either full metadata or fetch error to gRPC callback."""
+    provider = SSOTokenProvider("https://sso", "realm", "client", "secret")
+    plugin = SSOAuthMetadataPlugin(provider, iam_account="demo")
+    callback = mocker.Mock()
+
+    plugin(mocker.Mock(), callback)
+    callback.assert_called_once_with(
+        (("authorization", "Bearer token-1"), ("x-ai-account", "demo")), None
+    )
+
+    error = ConnectionError("SSO is down")
+    keycloak.token.side_effect = error
+    clock.now += 300
+    callback.reset_mock()
+    plugin(mocker.Mock(), callback)
+    callback.assert_called_once_with((), error)
+
+
+def test_every_call_gets_fresh_token(keycloak, stt_settings, pcm):
+    """Test that stream, models and file calls of one STTClient each send a fresh token."""
+    tokens = iter(f"token-{i}" for i in range(1, 100))
+    # NB: Token expires at once - every call must fetch a new one (gRPC deadlines need real time)
+    keycloak.token.side_effect = lambda grant_type: {"access_token": next(tokens), "expires_in": 0}
+    servicer = FakeSTTServicer()
+    config = stt_pb2.StreamRecognitionConfig(
+        config=RecognitionOptions().recognition_config(16000, 1)
+    )
+    channels = ChannelManager()
+
+    with serve_fake_stt(servicer) as address:
+        settings = stt_settings(address)
+        settings.client_id, settings.client_secret = "client", "secret"
+        with STTClient(settings, channels=channels) as client:
+            call = client.recognize_call([pcm(1000)], config)
+            assert call.initial_metadata() is not None
+            assert len(list(call)) == 1
+
+            response, _ = client.get_models_info_with_call()
+            assert response.models
+
+            for _ in range(2):
+                client.file_recognize(pcm(500), config.config)
+    channels.close()
+
+    sent = [metadata["authorization"] for metadata in servicer.call_metadata]
+    assert sent == [f"Bearer token-{i}" for i in range(1, 5)]
@@ -0,0 +1,77 @@
+import json
+import os
+
+import pytest
+
+from audio_transcriber.batch import BatchTranscriber, collect_inputs
+from clients.asr.fake_server import serve_fake_stt
+
+
+def test_collect_inputs_from_directory_and_manifest(tmp_path, write_wav):
+    """Test that inputs are found recursively or read from a manifest."""
+    write_wav(tmp_path / "calls" / "a.wav", 100)
+    write_wav(tmp_path / "calls" / "day2" / "a.wav", 100)
+    (tmp_path / "calls" / "notes.txt").write_text("not audio")
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text(
+        "# nightly\ncalls/a.wav\n\n" + str(tmp_path / "calls" / "day2" / "a.wav") + "\n"
+    )
+
+    from_dir = collect_inputs(str(tmp_path / "calls"))
+    from_manifest = collect_inputs(str(manifest))
+
+    assert [name for _, name in from_dir] == ["a_wav", os.path.join("day2", "a_wav")]
+    assert [path for path, _ in from_manifest] == [
+        str(tmp_path / "calls" / "a.wav"),
+        str(tmp_path / "calls" / "day2" / "a.wav"),
+    ]
+
+
+def test_manifest_inputs_outside_its_directory_get_unique_names(tmp_path, write_wav):
+    """Test that same-named files of different directories do not share an output directory."""
+    first = write_wav(tmp_path / "m" / "a" / "call.wav", 100)
+    second = write_wav(tmp_path / "m" / "b" / "call.wav", 100)
+    manifest = tmp_path / "lists" / "nightly.txt"
+    manifest.parent.mkdir()
+    manifest.write_text(f"{first}\n{second}\n{first}\n")
+
+    inputs = collect_inputs(str(manifest))
+
+    assert [path for path, _ in inputs] == [first, second]
+    names = [name for _, name in inputs]
+    assert len(set(names)) == 2
+    assert all(name.startswith("call_wav_") for name in names)
+
+
+def test_batch_transcribes_every_file(tmp_path, monkeypatch, write_wav):
+    """Test that all files are transcribed through shared pools and throughput is reported."""
+    monkeypatch.setenv("MAX_CHUNK_SIZE_MB", "1")
+    inputs_dir = tmp_path / "inputs"
+    for i, duration_ms in enumerate([1500, 40000, 2500]):
+        write_wav(inputs_dir / f"call_{i}.wav", duration_ms)
+    write_wav(inputs_dir / "broken.wav", 10)
+    (inputs_dir / "broken.wav").write_bytes(b"RIFF")
+    output_dir = tmp_path / "output"
+
+    with serve_fake_stt() as address:
+        config = tmp_path / "config.ini"
+        config.write_text(f'api_address = "{address}"\nuse_ssl = false\nclient_id = ""\n')
+        transcriber = BatchTranscriber(
+            str(output_dir), str(config), cpu_workers=2, max_requests=4, use_cache=False
+        )
+        summary = transcriber.run(collect_inputs(str(inputs_dir)))
+
+    assert summary.failed == 1
+    assert summary.audio_s == pytest.approx(44.0)
+    assert summary.audio_hours_per_wall_hour > 0
+    assert [stats.name for stats in summary.stages] == ["convert", "split", "recognize", "report"]
+    assert [stats.items for stats in summary.stages] == [4, 4, 4, 4]
+    merged = [
+        name
+        for name in os.listdir(output_dir / "call_1_wav")
+        if name.startswith("merged_transcription_")
+    ]
+    with open(output_dir / "call_1_wav" / merged[0], encoding="utf-8") as f:
+        assert "utterance" in f.read()
+    with open(output_dir / "batch_summary.json", encoding="utf-8") as f:
+        assert json.load(f)["failed"] == 1
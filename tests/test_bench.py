@@ -0,0 +1,68 @@
+import json
+
+from click.testing import CliRunner
+
+from clients.asr.bench import run_bench
+from clients.asr.fake_server import FakeSTTServicer, serve_fake_stt
+from clients.asr.utils.request import percentile
+from clients.main import main
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile(values[:10], 90) == 9.0
+    assert percentile(values[:1], 0) == 1.0
+    assert percentile([], 90) == 0.0
+
+
+def test_bench_measures_every_stream(tmp_path, write_wav, stt_settings):
+    audio_files = [write_wav(tmp_path / "a.wav", 2000), write_wav(tmp_path / "b.wav", 1000)]
+    servicer = FakeSTTServicer(utterance_ms=500, latency_s=0.01)
+
+    with serve_fake_stt(servicer) as address:
+        report = run_bench(
+            stt_settings(address), audio_files, streams=4, speed=10, interim_results=True
+        )
+
+    assert report.failed == 0
+    assert len(servicer.call_metadata) == 4
+    latency = report.to_dict()["latency_ms"]
+    # NB: Streams alternate between files: 2 x 4 + 2 x 2 utterances
+    assert latency["time to final"]["count"] == 12
+    assert latency["time to first response"]["count"] == 4
+    assert latency["end of stream"]["count"] == 4
+    # NB: Fake server answers every audio message after latency_s
+    assert latency["time to first response"]["p50"] >= 10
+    assert report.to_dict()["audio_s"] == 6.0
+
+
+def test_bench_command_against_fake_server(tmp_path, write_wav):
+    audio_file = write_wav(tmp_path / "a.wav", 1000)
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "bench",
+            "stream",
+            "--api-address",
+            "fake",
+            "--secure",
+            "false",
+            "--audio-file",
+            audio_file,
+            "--streams",
+            "2",
+            "--speed",
+            "20",
+            "--json",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.output)
+    assert report["streams"] == 2
+    assert report["failed"] == 0
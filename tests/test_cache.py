@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from clients.asr.client import STTClient
+from clients.asr.utils.cache import RecognitionCache
+from clients.genproto import stt_pb2
+
+
+def _response(text, padding=0):
+    return stt_pb2.FileRecognizeResponse(
+        response=[
+            stt_pb2.RecognizeResponse(
+                hypothesis=stt_pb2.SpeechRecognitionHypothesis(transcript=text + " " * padding)
+            )
+        ]
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return RecognitionCache(tmp_path / "cache", max_size_mb=1)
+
+
+def test_key_depends_on_audio_and_config():
+    """Test that both PCM content and recognition config change the key."""
+    config = stt_pb2.RecognitionConfig(model="e2e-v3")
+    other_config = stt_pb2.RecognitionConfig(model="e2e-v1")
+
+    key = RecognitionCache.make_key(b"\x00\x01", config)
+
+    assert key == RecognitionCache.make_key(b"\x00\x01", stt_pb2.RecognitionConfig(model="e2e-v3"))
+    assert key != RecognitionCache.make_key(b"\x00\x02", config)
+    assert key != RecognitionCache.make_key(b"\x00\x01", other_config)
+
+
+def test_get_returns_stored_response(cache):
+    """Test cache roundtrip and miss."""
+    cache.put("ab" * 32, _response("hello"))
+
+    assert cache.get("ab" * 32) == _response("hello")
+    assert cache.get("cd" * 32) is None
+
+
+def test_corrupt_entry_is_a_miss(cache):
+    """Test that truncated entry is dropped instead of failing recognition."""
+    cache.put("ab" * 32, _response("hello", padding=100))
+    path = cache._entry_path("ab" * 32)
+    path.write_bytes(path.read_bytes()[:20])
+
+    assert cache.get("ab" * 32) is None
+    assert not path.exists()
+
+
+def test_unwritable_cache_does_not_fail_recognition(tmp_path, mocker, caplog):
+    """Test that a failed cache write is logged and the recognized response still returned."""
+    # NB: Directory under a regular file cannot be created even by root, unlike chmod 0o500
+    (tmp_path / "home").write_text("")
+    cache = RecognitionCache(tmp_path / "home" / "cache")
+    config = stt_pb2.RecognitionConfig(model="e2e-v3")
+    mocker.patch.object(STTClient, "_connect")
+    mocker.patch.object(STTClient, "_call_metadata", return_value=())
+    stub = STTClient._connect.return_value
+    stub.FileRecognize.with_call.return_value = (_response("hello"), mocker.Mock())
+
+    with STTClient(mocker.Mock(timeout=10), cache=cache) as client:
+        response, call = client.file_recognize_with_call(b"\x00\x01", config)
+
+    assert response == _response("hello")
+    assert call is not None
+    assert "Failed to write recognition cache" in caplog.text
+    assert cache.get(RecognitionCache.make_key(b"\x00\x01", config)) is None
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    """Test that total size stays bounded and recently read entries survive."""
+    keys = [f"{i:02d}" * 32 for i in range(3)]
+    cache.put(keys[0], _response("first", padding=400 * 1024))
+    cache.put(keys[1], _response("second", padding=400 * 1024))
+    past = os.path.getmtime(cache._entry_path(keys[1])) - 10
+    os.utime(cache._entry_path(keys[0]), (past, past))
+    os.utime(cache._entry_path(keys[1]), (past + 1, past + 1))
+    assert cache.get(keys[0]) is not None  # Refresh first entry
+
+    cache.put(keys[2], _response("third", padding=400 * 1024))
+
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
+
+
+def test_cache_hit_skips_grpc_call(cache, mocker):
+    """Test that STTClient does not connect when result is cached."""
+    connect = mocker.patch.object(STTClient, "_connect")
+    settings = mocker.Mock(timeout=10)
+    config = stt_pb2.RecognitionConfig(model="e2e-v3")
+    cache.put(RecognitionCache.make_key(b"\x00\x01", config), _response("cached"))
+
+    with STTClient(settings, cache=cache) as client:
+        response, call = client.file_recognize_with_call(b"\x00\x01", config)
+
+    assert call is None
+    assert response == _response("cached")
+    connect.assert_not_called()
@@ -0,0 +1,44 @@
+from clients.common_utils import grpc as grpc_utils
+from clients.common_utils.grpc import CHANNEL_OPTIONS, ChannelManager, split_api_address
+
+
+def test_split_api_address():
+    """Test that comma-separated endpoints are split and blanks are dropped."""
+    assert split_api_address("host1:443, host2:443,") == ["host1:443", "host2:443"]
+    assert split_api_address("0.0.0.0:23333") == ["0.0.0.0:23333"]
+
+
+def test_channels_are_pooled_and_tuned(mocker):
+    """Test that one channel per endpoint is created with keepalive and message limits."""
+    insecure_channel = mocker.patch.object(
+        grpc_utils.grpc, "insecure_channel", side_effect=lambda address, options: mocker.Mock()
+    )
+    manager = ChannelManager()
+
+    first = manager.channel("host1:443", None)
+    assert manager.channel("host1:443", None) is first
+    assert manager.channel("host2:443", None) is not first
+
+    assert insecure_channel.call_count == 2
+    options = dict(insecure_channel.call_args.args[1])
+    assert options == dict(CHANNEL_OPTIONS)
+    assert options["grpc.max_send_message_length"] > 4 * 1024 * 1024
+    # NB: Default server ping policy - no pings without calls, 5 minutes between pings
+    assert options["grpc.keepalive_permit_without_calls"] == 0
+    assert options["grpc.keepalive_time_ms"] >= 300_000
+
+    manager.close()
+    first.close.assert_called_once()
+    assert manager.channel("host1:443", None) is not first
+
+
+def test_next_channel_round_robin(mocker):
+    """Test that requests are distributed between all listed endpoints."""
+    mocker.patch.object(
+        grpc_utils.grpc, "insecure_channel", side_effect=lambda address, options: address
+    )
+    manager = ChannelManager()
+
+    picked = [manager.next_channel("host1:443,host2:443", None) for _ in range(4)]
+
+    assert picked == ["host1:443", "host2:443", "host1:443", "host2:443"]
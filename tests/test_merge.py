@@ -0,0 +1,161 @@
+from audio_transcriber.merge import ChunkTranscript, Utterance, merge_chunks
+
+
+def _chunk(index, start_ms, end_ms, *utterances):
+    return ChunkTranscript(
+        index,
+        [
+            Utterance(start, end, text, speaker_id=speaker)
+            for start, end, text, speaker in utterances
+        ],
+        start_ms,
+        end_ms,
+    )
+
+
+def test_merge_is_one_sorted_timeline():
+    """Test that utterances of all chunks are merged in time order."""
+    timeline = merge_chunks(
+        [
+            _chunk(2, 30000, 60000, (31000, 32000, "third", 1), (30100, 30900, "second", 1)),
+            _chunk(1, 0, 30000, (1000, 2000, "first", 1)),
+        ]
+    )
+
+    assert [u.transcript for u in timeline] == ["first", "second", "third"]
+    assert [u.chunk for u in timeline] == [1, 2, 2]
+
+
+def test_merge_keeps_uncut_copy_of_boundary_utterance():
+    """Test that speech recognized by two overlapping chunks is kept once, from the chunk it is not cut by."""
+    timeline = merge_chunks(
+        [
+            _chunk(
+                1,
+                0,
+                32000,
+                (25000, 28000, "before", 1),
+                (29500, 31800, "hello world there", 1),
+                (31900, 32000, "and", 1),
+            ),
+            _chunk(
+                2, 30000, 60000, (30000, 31800, "world there", 1), (31900, 33000, "and then", 1)
+            ),
+        ]
+    )
+
+    assert [u.transcript for u in timeline] == ["before", "hello world there", "and then"]
+
+
+def test_merge_reconciles_speakers_across_chunks():
+    """Test that chunk speaker labels are matched by speech both chunks recognized."""
+    timeline = merge_chunks(
+        [
+            _chunk(1, 0, 32000, (28000, 29000, "question", 1), (30000, 31500, "answer", 2)),
+            # Second chunk numbered speakers in order of appearance
+            _chunk(
+                2,
+                30000,
+                60000,
+                (30000, 31500, "answer", 1),
+                (40000, 41000, "reply", 2),
+                (50000, 51000, "new voice", 3),
+            ),
+        ]
+    )
+
+    assert [(u.transcript, u.speaker_id) for u in timeline] == [
+        ("question", 1),
+        ("answer", 2),
+        ("reply", 1),
+        ("new voice", 3),
+    ]
+
+
+def _word(text, start_ms, end_ms, confidence=1.0):
+    return {
+        "word": text,
+        "start_time_ms": start_ms,
+        "end_time_ms": end_ms,
+        "confidence": confidence,
+    }
+
+
+def test_merge_splices_words_in_chunk_overlap():
+    """Test that words heard by both overlapping chunks are kept once, joining the cut utterance."""
+    previous = Utterance(
+        28000,
+        32000,
+        "so we agree on frid",
+        speaker_id=1,
+        words=[
+            _word("so", 28000, 28400),
+            _word("we", 28500, 29000),
+            _word("agree", 29100, 30600),
+            # "on" is right at the cut (31s, middle of the overlap): both chunks keep it
+            _word("on", 30800, 31150, 0.4),
+            _word("frid", 31500, 32000, 0.3),
+        ],
+    )
+    current = Utterance(
+        30000,
+        33000,
+        "ee on friday then",
+        speaker_id=1,
+        words=[
+            _word("ee", 30000, 30500, 0.2),
+            _word("on", 30850, 31200, 0.9),
+            _word("friday", 31300, 32200),
+            _word("then", 32300, 33000),
+        ],
+    )
+
+    timeline = merge_chunks(
+        [
+            ChunkTranscript(1, [previous], 0, 32000),
+            ChunkTranscript(2, [current], 30000, 60000),
+        ]
+    )
+
+    assert [(u.transcript, u.start_ms, u.end_ms) for u in timeline] == [
+        ("so we agree on friday then", 28000, 33000),
+    ]
+    assert timeline[0].words[3]["confidence"] == 0.9
+
+
+def test_spliced_utterance_keeps_normalized_text():
+    """Test that punctuation and capitals of both chunks survive the overlap splice."""
+    previous = Utterance(
+        28000,
+        32000,
+        "So, we agree on frid",
+        speaker_id=1,
+        words=[
+            _word("so", 28000, 28400),
+            _word("we", 28500, 29000),
+            _word("agree", 29100, 30600),
+            _word("on", 30800, 31150, 0.4),
+            _word("frid", 31500, 32000, 0.3),
+        ],
+    )
+    current = Utterance(
+        30000,
+        33000,
+        "ee on Friday, then.",
+        speaker_id=1,
+        words=[
+            _word("ee", 30000, 30500, 0.2),
+            _word("on", 30850, 31200, 0.9),
+            _word("friday", 31300, 32200),
+            _word("then", 32300, 33000),
+        ],
+    )
+
+    timeline = merge_chunks(
+        [
+            ChunkTranscript(1, [previous], 0, 32000),
+            ChunkTranscript(2, [current], 30000, 60000),
+        ]
+    )
+
+    assert [u.transcript for u in timeline] == ["So, we agree on Friday, then."]
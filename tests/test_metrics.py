@@ -0,0 +1,145 @@
+import json
+import time
+
+import grpc
+import pytest
+
+from clients.asr.client import STTClient
+from clients.asr.fake_server import FakeSTTServicer, serve_fake_stt
+from clients.asr.utils.request import RecognitionOptions
+from clients.common_utils.grpc import ChannelManager
+from clients.common_utils.metrics import Histogram, MetricsRegistry, metrics, span
+from clients.genproto import stt_pb2
+
+FILE_RECOGNIZE = "/mts.ai.audiogram.stt.v3.STT/FileRecognize"
+RECOGNIZE = "/mts.ai.audiogram.stt.v3.STT/Recognize"
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.clear()
+    yield
+    metrics.clear()
+
+
+def _series(name, **labels):
+    return [
+        series
+        for series in metrics.to_dict()["histograms"][name]
+        if labels.items() <= series["labels"].items()
+    ]
+
+
+def test_histogram_quantiles_and_prometheus_export():
+    histogram = Histogram((0.1, 1.0, 10.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [1, 2, 1, 0]
+    assert 0.1 <= histogram.quantile(0.5) <= 1.0
+    assert histogram.quantile(1.0) == 5.0
+
+    registry = MetricsRegistry()
+    registry.histogram("rpc_seconds", "RPC time", (0.1, 1.0))
+    registry.counter("rpc_total", "RPCs")
+    registry.observe("rpc_seconds", 0.5, method="/a")
+    registry.inc("rpc_total", method="/a", code="OK")
+
+    assert registry.to_prometheus().splitlines() == [
+        "# HELP rpc_seconds RPC time",
+        "# TYPE rpc_seconds histogram",
+        'rpc_seconds_bucket{method="/a",le="0.1"} 0',
+        'rpc_seconds_bucket{method="/a",le="1"} 1',
+        'rpc_seconds_bucket{method="/a",le="+Inf"} 1',
+        'rpc_seconds_sum{method="/a"} 0.5',
+        'rpc_seconds_count{method="/a"} 1',
+        "# HELP rpc_total RPCs",
+        "# TYPE rpc_total counter",
+        'rpc_total{code="OK",method="/a"} 1',
+    ]
+
+
+def test_prometheus_export_keeps_large_values_exact():
+    registry = MetricsRegistry()
+    registry.histogram("size_bytes", "Size", (4.0**15,))
+    registry.counter("bytes_total", "Bytes")
+    registry.observe("size_bytes", 1234567.25)
+    registry.inc("bytes_total", 1234567)
+    registry.inc("bytes_total", 0.5, kind="partial")
+
+    lines = registry.to_prometheus().splitlines()
+    assert 'size_bytes_bucket{le="1073741824"} 1' in lines
+    assert "size_bytes_sum 1234567.25" in lines
+    assert "bytes_total 1234567" in lines
+    assert 'bytes_total{kind="partial"} 0.5' in lines
+
+
+def test_instrumented_channel_records_rpcs(stt_settings, pcm):
+    """Test that unary and streaming RPCs are timed and sized, failed ones are counted."""
+    servicer = FakeSTTServicer(utterance_ms=500, latency_s=0.02)
+    config = RecognitionOptions().recognition_config(16000, 1)
+    channels = ChannelManager(instrument=True)
+
+    with serve_fake_stt(servicer) as address:
+        with STTClient(stt_settings(address), channels=channels) as client:
+            client.file_recognize(pcm(1000), config)
+            stream_config = stt_pb2.StreamRecognitionConfig(config=config)
+            responses = client.recognize((pcm(250) for _ in range(4)), stream_config)
+            assert len(list(responses)) == 2
+
+        with pytest.raises(grpc.RpcError):
+            with STTClient(stt_settings("127.0.0.1:1"), channels=channels) as client:
+                client.file_recognize(pcm(100), config)
+
+        # NB: Connectivity callbacks are delivered on a gRPC thread
+        deadline = time.monotonic() + 5
+        while not _series("grpc_client_connect_seconds", target=address):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    channels.close()
+
+    (unary,) = _series("grpc_client_duration_seconds", target=address, method=FILE_RECOGNIZE)
+    assert unary["count"] == 1
+    assert unary["sum"] >= 0.02
+    (sent,) = _series("grpc_client_sent_bytes", method=FILE_RECOGNIZE, target=address)
+    assert sent["sum"] > len(pcm(1000))
+
+    (first_response,) = _series("grpc_client_first_response_seconds", method=RECOGNIZE)
+    (stream,) = _series("grpc_client_duration_seconds", method=RECOGNIZE)
+    assert 0.02 <= first_response["sum"] <= stream["sum"]
+    (received,) = _series("grpc_client_received_bytes", method=RECOGNIZE)
+    assert received["count"] == 1 and received["sum"] > 0
+
+    calls = {
+        (c["labels"]["method"], c["labels"]["code"]): c["value"]
+        for c in metrics.to_dict()["counters"]["grpc_client_calls_total"]
+    }
+    assert calls == {
+        (FILE_RECOGNIZE, "OK"): 1,
+        (RECOGNIZE, "OK"): 1,
+        (FILE_RECOGNIZE, "UNAVAILABLE"): 1,
+    }
+
+
+def test_span_records_stage_and_metrics_are_written(tmp_path):
+    @span("merge")
+    def merge():
+        time.sleep(0.01)
+
+    merge()
+    with pytest.raises(ValueError):
+        with span("convert", {"file": "a.mp4"}):
+            raise ValueError("broken input")
+
+    stages = {s["labels"]["stage"]: s for s in _series("stage_duration_seconds")}
+    assert stages["merge"]["count"] == 1 and stages["merge"]["sum"] >= 0.01
+    assert stages["convert"]["count"] == 1
+
+    metrics.write(str(tmp_path / "metrics.json"))
+    metrics.write(str(tmp_path / "metrics.prom"))
+
+    summary = json.loads((tmp_path / "metrics.json").read_text())
+    assert summary["histograms"]["stage_duration_seconds"][0]["labels"] == {"stage": "convert"}
+    prometheus = (tmp_path / "metrics.prom").read_text()
+    assert 'stage_duration_seconds_count{stage="merge"} 1' in prometheus
+    assert "# TYPE grpc_client_duration_seconds histogram" in prometheus
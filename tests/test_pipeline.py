@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from audio_transcriber.pipeline import Pipeline, Stage
+
+
+def test_stages_overlap_and_report_utilization():
+    """Test that different items are in different stages at the same time."""
+    active = set()
+    overlaps = []
+    lock = threading.Lock()
+
+    def step(name, duration):
+        def run(item):
+            with lock:
+                active.add(name)
+                overlaps.append(len(active))
+            time.sleep(duration)
+            with lock:
+                active.discard(name)
+            return item + [name]
+
+        return run
+
+    pipeline = Pipeline(
+        [
+            Stage("convert", step("convert", 0.02)),
+            Stage("recognize", step("recognize", 0.05)),
+            Stage("summarize", step("summarize", 0.01)),
+        ],
+        queue_size=1,
+    )
+
+    results = pipeline.run([[i] for i in range(6)])
+
+    assert sorted(results) == [[i, "convert", "recognize", "summarize"] for i in range(6)]
+    assert max(overlaps) > 1
+    # Serial run would take 6 * 0.08s
+    assert pipeline.wall_s < 6 * 0.08
+    assert [stats.items for stats in pipeline.stats] == [6, 6, 6]
+    assert pipeline.bottleneck().name == "recognize"
+    assert 0.5 < pipeline.stats[1].utilization(pipeline.wall_s) <= 1.0
+
+
+def test_bounded_queue_holds_back_fast_stage():
+    """Test that a fast stage runs at most queue_size items ahead of a slow one."""
+    converted = []
+    ahead = []
+
+    def convert(item):
+        converted.append(item)
+        return item
+
+    def recognize(item):
+        ahead.append(len(converted) - item)
+        time.sleep(0.01)
+        return item
+
+    Pipeline([Stage("convert", convert), Stage("recognize", recognize)], queue_size=2).run(
+        range(10)
+    )
+
+    # In queue, in hand-off to the queue and being converted
+    assert max(ahead) <= 2 + 2
+
+
+def test_stage_error_is_raised_after_other_items():
+    """Test that a raising stage does not block the pipeline."""
+
+    def fail_on_three(item):
+        if item == 3:
+            raise ValueError("broken item")
+        return item
+
+    pipeline = Pipeline([Stage("check", fail_on_three, workers=2), Stage("pass", lambda x: x)])
+
+    with pytest.raises(ValueError, match="broken item"):
+        pipeline.run(range(5))
+    assert pipeline.stats[1].items == 4
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from clients.asr.utils import request as request_module
+from clients.asr.utils.request import (
+    PacingStats,
+    StreamPacer,
+    async_stream_request_iterator,
+    stream_request_iterator,
+)
+from clients.genproto import stt_pb2
+
+
+@pytest.fixture
+def clock(monkeypatch, fake_clock):
+    monkeypatch.setattr(request_module.time, "monotonic", fake_clock.time)
+    monkeypatch.setattr(request_module.time, "sleep", fake_clock.sleep)
+    return fake_clock
+
+
+def test_list_of_chunks_is_sent_once():
+    chunks = [b"a", b"b", b"c"]
+
+    requests = list(stream_request_iterator(stt_pb2.StreamRecognitionConfig(), chunks, 0))
+
+    assert requests[0].HasField("config")
+    assert [request.audio for request in requests[1:]] == chunks
+
+
+def test_pacing_does_not_drift(clock):
+    """Time spent sending chunks is absorbed by the schedule instead of adding up."""
+    stats = PacingStats()
+    sent_at = []
+
+    iterator = stream_request_iterator(
+        stt_pb2.StreamRecognitionConfig(), [b"x"] * 10, 100, speed=2.0, stats=stats
+    )
+    next(iterator)
+    for _ in iterator:
+        sent_at.append(clock.now)
+        clock.now += 0.03  # NB: Serialization and network time
+
+    assert [t - sent_at[0] for t in sent_at] == pytest.approx([0.05 * i for i in range(10)])
+    assert stats.max_lag_ms == 0.0
+    assert len(stats.lags_ms) == 10
+
+
+def test_late_chunk_lag_is_recorded_and_caught_up(clock):
+    pacer = StreamPacer(100, stats=PacingStats())
+
+    assert pacer.delay_s(0) == 0.0
+    pacer.record(0)
+    clock.now += 0.25  # NB: Stalled for 2.5 chunks
+    assert pacer.delay_s(1) == 0.0
+    pacer.record(1)
+    assert pacer.delay_s(3) == pytest.approx(0.05)
+
+    assert pacer.stats.lags_ms == [0.0, pytest.approx(150.0)]
+    assert "max 150.0 ms" in pacer.stats.summary()
+
+
+def test_async_iterator_is_paced(clock, monkeypatch):
+    async def fake_sleep(seconds: float) -> None:
+        clock.sleep(seconds)
+
+    monkeypatch.setattr(request_module.asyncio, "sleep", fake_sleep)
+
+    async def collect() -> list[float]:
+        sent_at = []
+        iterator = async_stream_request_iterator(
+            stt_pb2.StreamRecognitionConfig(), [b"x"] * 4, 200, speed=4.0
+        )
+        async for request in iterator:
+            if not request.HasField("config"):
+                sent_at.append(clock.now)
+        return sent_at
+
+    sent_at = asyncio.run(collect())
+
+    assert [t - sent_at[0] for t in sent_at] == pytest.approx([0.0, 0.05, 0.1, 0.15])
+
+
+def test_speed_must_be_positive():
+    with pytest.raises(ValueError):
+        StreamPacer(100, speed=0)
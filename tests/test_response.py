@@ -0,0 +1,215 @@
+import io
+import json
+import time
+
+import pytest
+
+from clients.asr.utils import response as response_module
+from clients.asr.utils.response import (
+    InterimCoalescer,
+    ResponseRenderer,
+    format_recognize_response,
+    print_recognize_response,
+    print_recognize_response_jsonl,
+    read_jsonl_records,
+    recognize_response_record,
+)
+from clients.genproto import stt_pb2
+
+
+def test_record_keeps_times_words_and_speaker():
+    """Test that structured record carries everything the text output drops."""
+    response = stt_pb2.RecognizeResponse(
+        hypothesis=stt_pb2.SpeechRecognitionHypothesis(
+            transcript="привет",
+            normalized_transcript="Привет.",
+            start_time_ms=1200,
+            end_time_ms=1900,
+            words=[
+                stt_pb2.SpeechRecognitionHypothesis.WordInfo(
+                    word="привет", start_time_ms=1200, end_time_ms=1900, confidence=0.5
+                )
+            ],
+        ),
+        channel=1,
+        speaker_info=stt_pb2.SpeakerInfo(speaker_id=2),
+        va_marks=[stt_pb2.VoiceActivityMark(offset_ms=1100)],
+    )
+
+    record = recognize_response_record(response, consider_final=True)
+
+    assert record["is_final"] is True
+    assert record["channel"] == 1
+    assert record["speaker_id"] == 2
+    assert (record["start_time_ms"], record["end_time_ms"]) == (1200, 1900)
+    assert record["words"] == [
+        {"word": "привет", "start_time_ms": 1200, "end_time_ms": 1900, "confidence": 0.5}
+    ]
+    assert record["va_marks"][0]["offset_ms"] == 1100
+    assert "genderage" not in record
+
+
+def test_jsonl_round_trip():
+    """Test that every response becomes one JSON line that reads back as the same record."""
+    responses = [
+        stt_pb2.RecognizeResponse(
+            hypothesis=stt_pb2.SpeechRecognitionHypothesis(transcript=f"фраза {i}"),
+            is_final=i % 2 == 0,
+        )
+        for i in range(3)
+    ]
+    output = io.StringIO()
+
+    for response in responses:
+        print_recognize_response_jsonl(response, file=output)
+
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 3
+    assert json.loads(lines[0])["transcript"] == "фраза 0"
+    records = list(read_jsonl_records(io.StringIO(output.getvalue())))
+    assert records == [recognize_response_record(response) for response in responses]
+
+
+class _CountingOutput(io.StringIO):
+    def __init__(self, fail=False):
+        super().__init__()
+        self.writes = 0
+        self.fail = fail
+
+    def write(self, text):
+        if self.fail:
+            raise BrokenPipeError("stdout closed")
+        self.writes += 1
+        return super().write(text)
+
+
+def _word_response(i):
+    words = [
+        stt_pb2.SpeechRecognitionHypothesis.WordInfo(
+            word=f"w{j}", start_time_ms=i * 1000 + j * 100, end_time_ms=i * 1000 + j * 100 + 90
+        )
+        for j in range(10)
+    ]
+    return stt_pb2.RecognizeResponse(
+        hypothesis=stt_pb2.SpeechRecognitionHypothesis(
+            transcript=" ".join(word.word for word in words), words=words
+        ),
+        va_marks=[stt_pb2.VoiceActivityMark(offset_ms=i * 1000)],
+        is_final=True,
+    )
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_renderer_writes_responses_in_blocks(background):
+    """Test that buffered output is the same text as printed per response, in few writes."""
+    responses = [_word_response(i) for i in range(100)]
+    expected = io.StringIO()
+    for response in responses:
+        print_recognize_response(response, file=expected)
+    output = _CountingOutput()
+
+    with ResponseRenderer(
+        output, buffer_size=4096, flush_interval_s=60, background=background
+    ) as r:
+        for response in responses:
+            r.render(response)
+
+    assert output.getvalue() == expected.getvalue()
+    assert expected.getvalue().count("\n") == 100 * 13
+    assert output.writes <= len(expected.getvalue()) // 4096 + 1
+    assert format_recognize_response(stt_pb2.RecognizeResponse()) == ""
+
+
+def test_background_renderer_flushes_on_timer_and_reports_broken_output():
+    """Test that rendered text shows up without waiting for more responses, and errors surface."""
+    output = _CountingOutput()
+    renderer = ResponseRenderer(output, flush_interval_s=0.02, background=True)
+    renderer.render(_word_response(0))
+
+    deadline = time.monotonic() + 5
+    while not output.getvalue():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    renderer.close()
+    assert output.getvalue() == format_recognize_response(_word_response(0))
+
+    renderer = ResponseRenderer(_CountingOutput(fail=True), flush_interval_s=0, background=True)
+    for i in range(10):
+        renderer.render(_word_response(i))
+    with pytest.raises(BrokenPipeError):
+        renderer.close()
+
+
+def _partial(transcript, end_time_ms, is_final=False, channel=0):
+    return stt_pb2.RecognizeResponse(
+        hypothesis=stt_pb2.SpeechRecognitionHypothesis(
+            transcript=transcript, start_time_ms=0, end_time_ms=end_time_ms
+        ),
+        is_final=is_final,
+        channel=channel,
+    )
+
+
+def test_interim_results_are_coalesced(monkeypatch):
+    """Test that partials print as word diffs at limited rate, while finals print right away."""
+    now = [0.0]
+    monkeypatch.setattr(response_module.time, "monotonic", lambda: now[0])
+    coalescer = InterimCoalescer(rate=2)
+
+    def feed(response, at):
+        now[0] = at
+        return coalescer(response)
+
+    assert feed(_partial("we", 500), 0.0) == 'Interim (00.00s-00.50s), keep 0: "we"\n'
+    assert feed(_partial("we", 500), 0.2) == ""  # NB: Repeated
+    assert feed(_partial("we agree", 900), 0.3) == ""  # NB: Throttled
+    assert (
+        feed(_partial("we agree on", 1200), 1.1) == 'Interim (00.00s-01.20s), keep 1: "agree on"\n'
+    )
+    assert feed(_partial("we agreed", 1300), 1.7) == 'Interim (00.00s-01.30s), keep 1: "agreed"\n'
+    assert feed(_partial("other channel", 1300, channel=1), 1.7).endswith(
+        'keep 0: "other channel"\n'
+    )
+
+    final = _partial("we agreed on friday", 2000, is_final=True)
+    assert feed(final, 1.8) == format_recognize_response(final)
+    assert feed(_partial("next", 2500), 1.9) == 'Interim (00.00s-02.50s), keep 0: "next"\n'
+    assert coalescer.summary() == "Interim results printed: 5 of 7"
+
+
+def test_throttled_partial_is_printed_once_due(monkeypatch):
+    """Test that the last partial held back by the rate limit is not lost without a next one."""
+    now = [0.0]
+    monkeypatch.setattr(response_module.time, "monotonic", lambda: now[0])
+    coalescer = InterimCoalescer(rate=2)
+
+    coalescer(_partial("we", 500))
+    now[0] = 0.3
+    assert coalescer(_partial("we agree", 900)) == ""
+    assert coalescer.pending_due() == pytest.approx(0.2)
+    assert coalescer.flush_pending() == ""
+
+    now[0] = 0.6
+    assert coalescer(_partial("other", 900, channel=1)).startswith(
+        'Interim (00.00s-00.90s), keep 1: "agree"\n'
+    )
+    assert coalescer.pending_due() is None
+    assert coalescer.summary() == "Interim results printed: 3 of 3"
+
+    monkeypatch.undo()
+    output = io.StringIO()
+    renderer = ResponseRenderer(
+        output, formatter=InterimCoalescer(rate=20), flush_interval_s=0.01, background=True
+    )
+    renderer.render(_partial("we", 500))
+    renderer.render(_partial("we agree", 900))
+
+    deadline = time.monotonic() + 5
+    while "agree" not in output.getvalue():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    renderer.close()
+    assert output.getvalue().splitlines() == [
+        'Interim (00.00s-00.50s), keep 0: "we"',
+        'Interim (00.00s-00.90s), keep 1: "agree"',
+    ]
@@ -0,0 +1,41 @@
+import numpy as np
+
+from audio_transcriber.silence import find_split_points, window_energy
+
+
+def _noise_with_pauses(sample_rate, duration_s, pauses):
+    """Loud noise with silent (start_s, end_s) pauses as int16 PCM."""
+    rng = np.random.default_rng(0)
+    samples = rng.integers(-8000, 8000, size=sample_rate * duration_s, dtype=np.int16)
+    for start, end in pauses:
+        samples[int(start * sample_rate) : int(end * sample_rate)] = 0
+    return samples
+
+
+def test_window_energy_ignores_trailing_window():
+    """Test that energy is computed per full window."""
+    samples = np.array([[1], [1], [2], [2], [5]], dtype=np.int16)
+
+    assert window_energy(samples, 2).tolist() == [1.0, 4.0]
+
+
+def test_split_points_move_into_pauses():
+    """Test that cuts land in the pause closest to the equal-duration position."""
+    sample_rate = 8000
+    samples = _noise_with_pauses(sample_rate, 30, [(8.2, 8.6), (21.0, 21.3)])
+
+    offsets = find_split_points(memoryview(samples.tobytes()), sample_rate, 1, 3, tolerance_ms=3000)
+
+    assert offsets[0] == 0
+    assert 8.2 <= offsets[1] / sample_rate <= 8.6
+    assert 21.0 <= offsets[2] / sample_rate <= 21.3
+
+
+def test_split_points_without_pause_stay_within_tolerance():
+    """Test that cuts never move further than tolerance from equal-duration position."""
+    sample_rate = 8000
+    samples = _noise_with_pauses(sample_rate, 20, [(2.0, 3.0)])
+
+    offsets = find_split_points(memoryview(samples.tobytes()), sample_rate, 1, 2, tolerance_ms=1000)
+
+    assert abs(offsets[1] / sample_rate - 10) <= 1
@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from audio_transcriber.summarization import TranscriptionSummarizer, estimate_tokens, split_sections
+
+
+class _StubCompletions:
+    """Local stand-in for the OpenAI chat-completions endpoint.
+
+    Answers every request with "summary <N>" after delay_s, keeping prompts and
+    the highest number of requests served at once. Stream requests get it word by
+    word, broken off after break_after words if set.
+    """
+
+    def __init__(self, delay_s=0.0, break_after=None):
+        self.delay_s = delay_s
+        self.break_after = break_after
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub.lock:
+                    stub.prompts.append(body["messages"][-1]["content"])
+                    number = len(stub.prompts)
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                time.sleep(stub.delay_s)
+                with stub.lock:
+                    stub.active -= 1
+
+                content = f"summary {number}"
+                if body.get("stream"):
+                    self._stream(body, number, content.split(" "))
+                    return
+                data = json.dumps(
+                    {
+                        "id": f"chatcmpl-{number}",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": body["model"],
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": content},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                    }
+                ).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, body, number, words):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                for i, word in enumerate(words):
+                    if i == stub.break_after:
+                        self.wfile.write(b'data: {"broken\n\n')
+                        return
+                    chunk = json.dumps(
+                        {
+                            "id": f"chatcmpl-{number}",
+                            "object": "chat.completion.chunk",
+                            "created": 0,
+                            "model": body["model"],
+                            "choices": [
+                                {
+                                    "index": 0,
+                                    "delta": {"content": word if i == 0 else " " + word},
+                                    "finish_reason": None,
+                                }
+                            ],
+                        }
+                    )
+                    self.wfile.write(f"data: {chunk}\n\n".encode())
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@contextmanager
+def _serve(stub):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), stub.handler())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _summarizer(tmp_path, monkeypatch, base_url, transcription, section_tokens, parallel):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", base_url)
+    monkeypatch.setenv("SUMMARY_SECTION_TOKENS", str(section_tokens))
+    monkeypatch.setenv("SUMMARY_PARALLEL", str(parallel))
+    transcription_file = tmp_path / "merged_transcription.txt"
+    transcription_file.write_text(transcription, encoding="utf-8")
+    return TranscriptionSummarizer(
+        str(transcription_file), str(tmp_path / "output"), str(tmp_path / "missing.ini")
+    )
+
+
+def test_split_sections_ends_on_speaker_turns():
+    """Test that sections fit the token budget and only oversized turns are cut."""
+    turns = [
+        f'Speaker {i % 2 + 1}. ({i:05.2f}s-{i + 1:05.2f}s): "Реплика номер {i}"' for i in range(40)
+    ]
+    long_turn = 'Speaker 1. (40.00s-99.00s): "' + " ".join(["слово"] * 200) + '"'
+    transcription = "\n".join(turns + [long_turn]) + "\n"
+
+    sections = split_sections(transcription, 100)
+
+    assert all(estimate_tokens(section) <= 100 for section in sections)
+    lines = "\n".join(sections).splitlines()
+    assert lines[:40] == turns
+    assert " ".join(lines[40:]) == long_turn
+    assert len(lines) > 41
+
+
+def test_short_transcription_is_one_request(tmp_path, monkeypatch):
+    """Test that a transcription within the budget is summarized in one request."""
+    stub = _StubCompletions()
+    with _serve(stub) as base_url:
+        summarizer = _summarizer(
+            tmp_path,
+            monkeypatch,
+            base_url,
+            'Speaker 1. (00.00s-01.00s): "Привет"\n',
+            section_tokens=1000,
+            parallel=2,
+        )
+        summary_file = summarizer.summarize()
+
+    assert len(stub.prompts) == 1
+    assert stub.prompts[0].endswith('Speaker 1. (00.00s-01.00s): "Привет"\n')
+    with open(summary_file, encoding="utf-8") as f:
+        assert f.read() == "summary 1"
+
+
+def test_long_transcription_is_map_reduced(tmp_path, monkeypatch):
+    """Test that sections are summarized concurrently within the limit and then combined."""
+    turns = [
+        f'Speaker {i % 3 + 1}. ({i:05.2f}s-{i + 1:05.2f}s): "Обсуждаем пункт {i} повестки"'
+        for i in range(60)
+    ]
+    stub = _StubCompletions(delay_s=0.05)
+    with _serve(stub) as base_url:
+        summarizer = _summarizer(
+            tmp_path, monkeypatch, base_url, "\n".join(turns), section_tokens=200, parallel=3
+        )
+        summary_file = summarizer.summarize()
+
+    sections = split_sections("\n".join(turns), 200)
+    assert len(sections) > 3
+    assert len(stub.prompts) == len(sections) + 1
+    assert stub.max_active == 3
+    assert all(f"summary {i}" in stub.prompts[-1] for i in range(1, len(sections) + 1))
+    with open(summary_file, encoding="utf-8") as f:
+        assert f.read() == f"summary {len(sections) + 1}"
+
+
+def test_stream_summary_is_written_as_it_arrives(tmp_path, monkeypatch, capsys):
+    """Test that streamed summary goes to file and console, and survives a broken stream."""
+    stub = _StubCompletions()
+    with _serve(stub) as base_url:
+        summarizer = _summarizer(
+            tmp_path,
+            monkeypatch,
+            base_url,
+            'Speaker 1. (00.00s-01.00s): "Привет"\n',
+            section_tokens=1000,
+            parallel=2,
+        )
+        summary_file = summarizer.summarize(stream=True)
+
+    with open(summary_file, encoding="utf-8") as f:
+        assert f.read() == "summary 1"
+    assert "summary 1\n" in capsys.readouterr().out
+
+    stub = _StubCompletions(break_after=1)
+    with _serve(stub) as base_url:
+        summarizer = _summarizer(
+            tmp_path,
+            monkeypatch,
+            base_url,
+            'Speaker 1. (00.00s-01.00s): "Привет"\n',
+            section_tokens=1000,
+            parallel=2,
+        )
+        with pytest.raises(json.JSONDecodeError, match="Unterminated string"):
+            summarizer.summarize(stream=True)
+
+    with open(
+        os.path.join(summarizer.output_dir, f"summary_{summarizer.timestamp}.txt"), encoding="utf-8"
+    ) as f:
+        assert f.read() == "summary"